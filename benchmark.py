@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for every Lambda route
+
+Replays the sample requests from api_sample_payloads.json through lambda_handler
+against the in-process fakes in fake_backends.py, with configurable injected
+backend latency. Reports per-route p50/p95/p99 latency, allocations per request
+and the exact number of backend round trips per request, in two modes:
+
+  warm - container state (clients, pools, caches) kept between requests
+  cold - container state reset before every request
+
+Runs on a plain Linux box with no network. With --check it exits non-zero when a
+route exceeds its round-trip budget, so N+1 regressions fail before deploy.
+
+Usage:
+  python3 benchmark.py
+  python3 benchmark.py --latency-ms 20 --jitter-ms 5 --iterations 200 --check
+  python3 benchmark.py --routes get_tutorials,batch_app_launch --json
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import fake_backends
+
+# Upper bounds on backend round trips per request; --check fails above these
+ROUND_TRIP_BUDGETS = {
+    'warm': {
+        'rider_info': 0,
+        'training_progress': 1,
+        'get_tutorials': 1,
+        'tutorial_state': 1,
+        'tutorials_get': 0,
+        'tutorials_get_all': 0,
+        'module_started': 1,
+        'module_completed': 1,
+        'update_progress': 1,
+        'day_hub_mappings_get': 0,
+        'day_hub_mappings_get_all': 0,
+        'batch_app_launch': 2,
+    },
+    'cold': {
+        'rider_info': 2,
+        'training_progress': 1,
+        'get_tutorials': 7,
+        'tutorial_state': 1,
+        'tutorials_get': 4,
+        'tutorials_get_all': 4,
+        'module_started': 1,
+        'module_completed': 1,
+        'update_progress': 1,
+        'day_hub_mappings_get': 4,
+        'day_hub_mappings_get_all': 4,
+        'batch_app_launch': 8,
+    },
+}
+
+# (route name, endpoint key in api_sample_payloads.json, request key)
+SAMPLE_REQUESTS = [
+    ('rider_info', 'rider_info', 'sample_request'),
+    ('training_progress', 'training_progress', 'sample_request'),
+    ('get_tutorials', 'get_tutorials', 'sample_request'),
+    ('tutorial_state', 'tutorial_state', 'sample_request'),
+    ('tutorials_get', 'tutorials', 'get_tutorial_request'),
+    ('tutorials_get_all', 'tutorials', 'get_all_tutorials_request'),
+    ('module_started', 'module_started', 'sample_request'),
+    ('module_completed', 'module_completed', 'sample_request'),
+    ('update_progress', 'update_progress', 'sample_request'),
+    ('day_hub_mappings_get', 'day_hub_mappings', 'get_mapping_request'),
+    ('day_hub_mappings_get_all', 'day_hub_mappings', 'get_all_mappings_request'),
+]
+
+def load_events(payloads_path):
+    """Build API Gateway proxy events from the sample payloads"""
+    with open(payloads_path) as f:
+        endpoints = json.load(f)['endpoints']
+
+    events = {}
+    for name, endpoint_key, request_key in SAMPLE_REQUESTS:
+        endpoint = endpoints[endpoint_key]
+        request = endpoint[request_key]
+        events[name] = {
+            'httpMethod': request.get('method', endpoint['method']),
+            'path': endpoint['endpoint'],
+            'headers': dict(request.get('headers', {})),
+            'queryStringParameters': request.get('query_parameters'),
+            'body': json.dumps(request['body']) if 'body' in request else None,
+        }
+
+    # The three calls the app makes on launch, as one /batch request
+    rider_id = endpoints['get_tutorials']['sample_request']['query_parameters']['rider_id']
+    events['batch_app_launch'] = {
+        'httpMethod': 'POST',
+        'path': '/batch',
+        'headers': {'Content-Type': 'application/json'},
+        'queryStringParameters': None,
+        'body': json.dumps({'requests': [
+            {'path': '/rider-info', 'query': {'rider_id': rider_id}},
+            {'path': '/training-progress', 'query': {'rider_id': rider_id}},
+            {'path': '/get-tutorials', 'query': {'rider_id': rider_id}},
+        ]}),
+    }
+    return events
+
+def reset_container_state(lambda_function):
+    """Simulate a fresh container: new clients, empty pools and caches"""
+    lambda_function.connection_manager = lambda_function.ConnectionManager()
+    lambda_function.tutorial_catalog.invalidate()
+    lambda_function.rider_info_cache.clear()
+    lambda_function.idempotency_store.clear()
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+def run_route(lambda_function, event, mode, iterations):
+    """Time one route; returns latency samples, round trips per request and status codes"""
+    # Prime once so warm mode measures steady state
+    lambda_function.lambda_handler(json.loads(json.dumps(event)), None)
+
+    latencies_ms = []
+    round_trips = []
+    status_codes = set()
+    for _ in range(iterations):
+        if mode == 'cold':
+            reset_container_state(lambda_function)
+        request = json.loads(json.dumps(event))
+        fake_backends.reset_round_trips()
+        started = time.perf_counter()
+        response = lambda_function.lambda_handler(request, None)
+        latencies_ms.append((time.perf_counter() - started) * 1000)
+        round_trips.append(fake_backends.total_round_trips())
+        status_codes.add(response['statusCode'])
+    return latencies_ms, round_trips, status_codes
+
+def measure_allocations(lambda_function, event, mode, iterations):
+    """Average bytes allocated and peak traced memory per request"""
+    tracemalloc.start()
+    try:
+        allocated = []
+        peaks = []
+        for _ in range(iterations):
+            if mode == 'cold':
+                reset_container_state(lambda_function)
+            request = json.loads(json.dumps(event))
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            snapshot_before = tracemalloc.take_snapshot()
+            lambda_function.lambda_handler(request, None)
+            snapshot_after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            allocated.append(sum(stat.size_diff for stat in snapshot_after.compare_to(snapshot_before, 'filename') if stat.size_diff > 0))
+            peaks.append(peak - before)
+        return statistics.mean(allocated), statistics.mean(peaks)
+    finally:
+        tracemalloc.stop()
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description='Offline per-route benchmark with simulated backend latency')
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--alloc-iterations', type=int, default=10, help='requests traced with tracemalloc per route')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='injected latency per backend round trip')
+    parser.add_argument('--jitter-ms', type=float, default=1.0, help='random extra latency per round trip')
+    parser.add_argument('--tutorials-per-day', type=int, default=12)
+    parser.add_argument('--modes', default='warm,cold')
+    parser.add_argument('--routes', help='comma-separated route names (default: all)')
+    parser.add_argument('--payloads', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api_sample_payloads.json'))
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    parser.add_argument('--check', action='store_true', help='exit non-zero if a route exceeds its round-trip budget')
+    args = parser.parse_args()
+
+    fake_backends.install(args.latency_ms, args.jitter_ms, args.tutorials_per_day)
+    logging.getLogger().setLevel(logging.WARNING)
+    import lambda_function
+    logging.getLogger().setLevel(logging.WARNING)
+
+    events = load_events(args.payloads)
+    routes = args.routes.split(',') if args.routes else list(events)
+    modes = args.modes.split(',')
+
+    results = []
+    over_budget = []
+    for mode in modes:
+        for route in routes:
+            event = events[route]
+            latencies_ms, round_trips, status_codes = run_route(lambda_function, event, mode, args.iterations)
+            allocated, peak = measure_allocations(lambda_function, event, mode, args.alloc_iterations)
+            result = {
+                'route': route,
+                'mode': mode,
+                'status_codes': sorted(status_codes),
+                'p50_ms': round(percentile(latencies_ms, 0.50), 2),
+                'p95_ms': round(percentile(latencies_ms, 0.95), 2),
+                'p99_ms': round(percentile(latencies_ms, 0.99), 2),
+                'round_trips': max(round_trips),
+                'round_trips_min': min(round_trips),
+                'allocated_kb': round(allocated / 1024, 1),
+                'peak_kb': round(peak / 1024, 1),
+            }
+            budget = ROUND_TRIP_BUDGETS.get(mode, {}).get(route)
+            if budget is not None and result['round_trips'] > budget:
+                over_budget.append(f"{mode}/{route}: {result['round_trips']} round trips (budget {budget})")
+            results.append(result)
+
+    if args.json:
+        print(json.dumps({'latency_ms': args.latency_ms, 'jitter_ms': args.jitter_ms, 'results': results}, indent=2))
+    else:
+        print(f"Backend latency {args.latency_ms} ms + up to {args.jitter_ms} ms jitter, {args.iterations} requests per route")
+        print(f"{'mode':5s} {'route':26s} {'status':8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'trips':>6s} {'alloc KB':>9s} {'peak KB':>8s}")
+        for result in results:
+            status = ','.join(str(code) for code in result['status_codes'])
+            trips = str(result['round_trips']) if result['round_trips'] == result['round_trips_min'] else f"{result['round_trips_min']}-{result['round_trips']}"
+            print(f"{result['mode']:5s} {result['route']:26s} {status:8s} {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} "
+                  f"{result['p99_ms']:8.2f} {trips:>6s} {result['allocated_kb']:9.1f} {result['peak_kb']:8.1f}")
+
+    if over_budget:
+        print("\n❌ Round-trip budget exceeded:", file=sys.stderr)
+        for line in over_budget:
+            print(f"   {line}", file=sys.stderr)
+        if args.check:
+            return False
+    elif args.check:
+        print("\n✅ All routes within their round-trip budgets", file=sys.stderr)
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+In-process fake Supabase and psycopg2 backends
+
+Used by benchmark.py (and the local server) to exercise lambda_function.py without
+network access. install() registers fake `supabase` and `psycopg2` modules in
+sys.modules, so it must run before the handlers first touch a backend. Every
+backend call sleeps for the configured latency and is counted as one round trip.
+"""
+
+import copy
+import random
+import sys
+import threading
+import time
+import types
+
+# Shared by both fakes; reset per request by the benchmark
+_lock = threading.Lock()
+round_trips = {'supabase': 0, 'replica': 0}
+latency = {'base_ms': 0.0, 'jitter_ms': 0.0}
+
+def _simulate_round_trip(backend):
+    with _lock:
+        round_trips[backend] += 1
+    delay_ms = latency['base_ms'] + random.uniform(0, latency['jitter_ms'])
+    if delay_ms > 0:
+        time.sleep(delay_ms / 1000)
+
+def reset_round_trips():
+    with _lock:
+        for backend in round_trips:
+            round_trips[backend] = 0
+
+def total_round_trips():
+    with _lock:
+        return sum(round_trips.values())
+
+# ---------------------------------------------------------------------------
+# Seed data
+# ---------------------------------------------------------------------------
+
+RIDERS = {
+    '12345': ('central_hub', 1),
+    '67890': ('quick_hub', 2),
+    '11111': ('lm_hub', 3),
+}
+
+# Numeric rider IDs from this value up are synthesised, so load tests can use many riders
+SYNTHETIC_RIDER_ID_START = 100000
+_NODE_TYPES = ('central_hub', 'franchise_hub', 'lm_hub', 'quick_hub')
+
+def lookup_rider(rider_id):
+    """(node_type, rider_age) for a seeded or synthetic rider, or None if unknown"""
+    rider_id = str(rider_id)
+    if rider_id in RIDERS:
+        return RIDERS[rider_id]
+    if rider_id.isdigit() and int(rider_id) >= SYNTHETIC_RIDER_ID_START:
+        number = int(rider_id)
+        return _NODE_TYPES[number % len(_NODE_TYPES)], number % 3 + 1
+    return None
+
+def build_seed_tables(tutorials_per_day=12):
+    """Tutorial catalog and progress rows shaped like the production tables"""
+    timestamp = '2024-01-01T00:00:00+00:00'
+    tutorials = []
+    mappings = []
+    mapping_id = 1
+    for hub_type in ('lm_hub', 'quick_hub'):
+        for day in (1, 2, 3):
+            for index in range(tutorials_per_day):
+                tutorial_id = f'{hub_type}_day{day}_tutorial_{index}'
+                tutorials.append({
+                    'id': tutorial_id,
+                    'title': f'Day {day} tutorial {index}',
+                    'subtitle': f'How to handle step {index} at a {hub_type}',
+                    'description': 'Step-by-step walkthrough of the flow. ' * 8,
+                    'created_at': timestamp,
+                    'updated_at': timestamp,
+                })
+                mappings.append({
+                    'id': mapping_id,
+                    'day': day,
+                    'hub_type': hub_type,
+                    'tutorial_id': tutorial_id,
+                    'order_index': index,
+                    'created_at': timestamp,
+                    'updated_at': timestamp,
+                })
+                mapping_id += 1
+    tutorials.append({
+        'id': 'delivery_flow',
+        'title': 'Learn how to deliver',
+        'subtitle': 'The tutorial shows how to deliver an order',
+        'description': 'Complete guide to delivery process',
+        'created_at': timestamp,
+        'updated_at': timestamp,
+    })
+
+    training_progress = []
+    for progress_id, rider_id in enumerate(RIDERS, start=1):
+        training_progress.append({
+            'id': progress_id,
+            'rider_id': rider_id,
+            'tutorial_state': {
+                'lm_hub_day1_tutorial_0': {'id': 'lm_hub_day1_tutorial_0', 'isDone': True},
+                'delivery_flow': {'id': 'delivery_flow', 'isDone': False},
+            },
+            'module_started_day1': '2024-01-15T09:00:00Z',
+            'module_started_day2': None,
+            'module_started_day3': None,
+            'module_completed_day1': None,
+            'module_completed_day2': None,
+            'module_completed_day3': None,
+            'created_at': '2024-01-15T08:45:00Z',
+            'updated_at': '2024-01-15T08:45:00Z',
+        })
+
+    return {
+        'tutorials': tutorials,
+        'day_hub_tutorial_mappings': mappings,
+        'training_progress': training_progress,
+    }
+
+# ---------------------------------------------------------------------------
+# Fake Supabase (postgrest query builder subset used by lambda_function.py)
+# ---------------------------------------------------------------------------
+
+# Columns of the Supabase tables; reads and writes naming anything else fail like PostgREST
+TABLE_COLUMNS = {
+    'tutorials': ('id', 'title', 'subtitle', 'description', 'created_at', 'updated_at'),
+    'day_hub_tutorial_mappings': ('id', 'day', 'hub_type', 'tutorial_id', 'order_index', 'created_at', 'updated_at'),
+    'training_progress': (
+        'id', 'rider_id', 'tutorial_state',
+        'module_started_day1', 'module_started_day2', 'module_started_day3',
+        'module_completed_day1', 'module_completed_day2', 'module_completed_day3',
+        'created_at', 'updated_at',
+    ),
+}
+
+# Keys merge_training_progress accepts in p_columns (supabase_migrations.sql)
+MERGE_PROGRESS_COLUMNS = frozenset((
+    'module_started_day1', 'module_started_day2', 'module_started_day3',
+    'module_completed_day1', 'module_completed_day2', 'module_completed_day3',
+))
+
+class FakeAPIError(Exception):
+    pass
+
+def check_columns(table, columns):
+    """Raise like PostgREST's schema cache check when a column does not exist"""
+    known = TABLE_COLUMNS.get(table)
+    if known is None:
+        return
+    for column in columns:
+        if column not in known:
+            raise FakeAPIError(f"Could not find the '{column}' column of '{table}' in the schema cache")
+
+class FakeAPIResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+class FakeQuery:
+    def __init__(self, database, table):
+        self._database = database
+        self._table = table
+        self._operation = 'select'
+        self._columns = '*'
+        self._count = None
+        self._filters = []
+        self._orders = []
+        self._limit = None
+        self._payload = None
+        self._on_conflict = None
+
+    def select(self, columns='*', count=None, **kwargs):
+        self._operation = 'select'
+        self._columns = columns
+        self._count = count
+        return self
+
+    def eq(self, column, value):
+        self._filters.append(lambda row: _loose_equal(row.get(column), value))
+        return self
+
+    def gt(self, column, value):
+        self._filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self
+
+    def in_(self, column, values):
+        values = list(values)
+        self._filters.append(lambda row: any(_loose_equal(row.get(column), value) for value in values))
+        return self
+
+    def or_(self, filters, **kwargs):
+        conditions = [_parse_logic_condition(term) for term in _split_logic_terms(filters)]
+        self._filters.append(lambda row: any(condition(row) for condition in conditions))
+        return self
+
+    def order(self, column, desc=False, **kwargs):
+        self._orders.append((column, desc))
+        return self
+
+    def limit(self, size, **kwargs):
+        self._limit = size
+        return self
+
+    def insert(self, payload, **kwargs):
+        self._operation = 'insert'
+        self._payload = payload
+        return self
+
+    def update(self, payload, **kwargs):
+        self._operation = 'update'
+        self._payload = payload
+        return self
+
+    def upsert(self, payload, on_conflict='', **kwargs):
+        self._operation = 'upsert'
+        self._payload = payload
+        self._on_conflict = on_conflict or 'id'
+        return self
+
+    def delete(self, **kwargs):
+        self._operation = 'delete'
+        return self
+
+    def execute(self):
+        _simulate_round_trip('supabase')
+        if self._operation == 'select' and self._columns.strip() != '*':
+            check_columns(self._table, [column.strip() for column in self._columns.split(',')])
+        elif self._operation in ('insert', 'update', 'upsert'):
+            payload = self._payload if isinstance(self._payload, list) else [self._payload]
+            check_columns(self._table, {column for item in payload for column in item})
+        with self._database.lock:
+            return getattr(self, f'_execute_{self._operation}')(self._database.tables.setdefault(self._table, []))
+
+    def _matching(self, rows):
+        return [row for row in rows if all(condition(row) for condition in self._filters)]
+
+    def _execute_select(self, rows):
+        matched = self._matching(rows)
+        for column, desc in reversed(self._orders):
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        total = len(matched)
+        if self._limit is not None:
+            matched = matched[:self._limit]
+        if self._columns.strip() != '*':
+            columns = [column.strip() for column in self._columns.split(',')]
+            matched = [{column: row.get(column) for column in columns} for row in matched]
+        return FakeAPIResponse(copy.deepcopy(matched), total if self._count else None)
+
+    def _execute_insert(self, rows):
+        payload = self._payload if isinstance(self._payload, list) else [self._payload]
+        inserted = [self._database.with_defaults(self._table, item) for item in payload]
+        rows.extend(inserted)
+        return FakeAPIResponse(copy.deepcopy(inserted))
+
+    def _execute_update(self, rows):
+        matched = self._matching(rows)
+        for row in matched:
+            row.update(copy.deepcopy(self._payload))
+        return FakeAPIResponse(copy.deepcopy(matched))
+
+    def _execute_upsert(self, rows):
+        payload = self._payload if isinstance(self._payload, list) else [self._payload]
+        keys = [key.strip() for key in self._on_conflict.split(',')]
+        written = []
+        for item in payload:
+            existing = next((row for row in rows if all(_loose_equal(row.get(key), item.get(key)) for key in keys)), None)
+            if existing is not None:
+                existing.update(copy.deepcopy(item))
+                written.append(existing)
+            else:
+                row = self._database.with_defaults(self._table, item)
+                rows.append(row)
+                written.append(row)
+        return FakeAPIResponse(copy.deepcopy(written))
+
+    def _execute_delete(self, rows):
+        matched = self._matching(rows)
+        for row in matched:
+            rows.remove(row)
+        return FakeAPIResponse(copy.deepcopy(matched))
+
+class FakeRPC:
+    def __init__(self, database, function, params):
+        self._database = database
+        self._function = function
+        self._params = params
+
+    def execute(self):
+        _simulate_round_trip('supabase')
+        handler = getattr(self._database, f'rpc_{self._function}', None)
+        if handler is None:
+            raise Exception(f"Could not find the function public.{self._function}")
+        with self._database.lock:
+            return FakeAPIResponse(handler(**self._params))
+
+class FakeDatabase:
+    """In-memory tables plus the Postgres functions from supabase_migrations.sql"""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.lock = threading.RLock()
+        self._next_id = 100000
+
+    def with_defaults(self, table, item):
+        row = copy.deepcopy(item)
+        if table != 'tutorials':
+            row.setdefault('id', self._allocate_id())
+        now = time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime())
+        row.setdefault('created_at', now)
+        row.setdefault('updated_at', now)
+        return row
+
+    def _allocate_id(self):
+        self._next_id += 1
+        return self._next_id
+
+    def rpc_set_tutorial_states(self, p_rider_id, p_states):
+        rows = self.tables.setdefault('training_progress', [])
+        row = next((row for row in rows if _loose_equal(row.get('rider_id'), p_rider_id)), None)
+        if row is None:
+            row = self.with_defaults('training_progress', {'rider_id': p_rider_id, 'tutorial_state': {}})
+            rows.append(row)
+        state = row.get('tutorial_state') or {}
+        state.update(copy.deepcopy(p_states))
+        row['tutorial_state'] = state
+        return True
+
+    def rpc_merge_training_progress(self, p_rider_id, p_columns, p_states):
+        unknown = sorted(set(p_columns or {}) - MERGE_PROGRESS_COLUMNS)
+        if unknown:
+            raise FakeAPIError(f"merge_training_progress cannot set columns: {', '.join(unknown)}")
+        self.rpc_set_tutorial_states(p_rider_id, p_states or {})
+        row = next(row for row in self.tables['training_progress'] if _loose_equal(row.get('rider_id'), p_rider_id))
+        row.update({column: value for column, value in (p_columns or {}).items() if value is not None})
+        row['updated_at'] = time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime())
+        return True
+
+    def rpc_replace_day_hub_mappings(self, p_day, p_hub_type, p_tutorial_ids):
+        rows = self.tables.setdefault('day_hub_tutorial_mappings', [])
+        rows[:] = [row for row in rows if not (_loose_equal(row.get('day'), p_day) and row.get('hub_type') == p_hub_type)]
+        for order_index, tutorial_id in enumerate(p_tutorial_ids):
+            rows.append(self.with_defaults('day_hub_tutorial_mappings', {
+                'day': p_day, 'hub_type': p_hub_type, 'tutorial_id': tutorial_id, 'order_index': order_index}))
+        return len(p_tutorial_ids)
+
+class FakeSupabaseClient:
+    def __init__(self, database):
+        self._database = database
+
+    def table(self, name):
+        return FakeQuery(self._database, name)
+
+    def from_(self, name):
+        return FakeQuery(self._database, name)
+
+    def rpc(self, function, params=None):
+        return FakeRPC(self._database, function, params or {})
+
+def _loose_equal(left, right):
+    # PostgREST compares through text, so '1' matches 1
+    return left == right or (left is not None and right is not None and str(left) == str(right))
+
+def _split_logic_terms(text):
+    """Split a PostgREST logic expression on top-level commas"""
+    terms, depth, quoted, start = [], 0, False, 0
+    for index, char in enumerate(text):
+        if char == '"' and (index == 0 or text[index - 1] != '\\'):
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and char == ',':
+            terms.append(text[start:index])
+            start = index + 1
+    terms.append(text[start:])
+    return [term.strip() for term in terms if term.strip()]
+
+def _parse_logic_condition(term):
+    """Predicate for `and(...)`, `or(...)` or `column.op.value` as used in or_() filters"""
+    for combinator, combine in (('and(', all), ('or(', any)):
+        if term.startswith(combinator) and term.endswith(')'):
+            conditions = [_parse_logic_condition(inner) for inner in _split_logic_terms(term[len(combinator):-1])]
+            return lambda row: combine(condition(row) for condition in conditions)
+
+    column, operator, value = term.split('.', 2)
+    if value.startswith('"') and value.endswith('"'):
+        value = value[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    comparisons = {
+        'eq': lambda left, right: left == right,
+        'gt': lambda left, right: left > right,
+        'gte': lambda left, right: left >= right,
+        'lt': lambda left, right: left < right,
+        'lte': lambda left, right: left <= right,
+    }
+    compare = comparisons[operator]
+
+    def condition(row):
+        current = row.get(column)
+        if current is None:
+            return False
+        right = type(current)(value) if isinstance(current, (int, float)) and not isinstance(current, bool) else value
+        return compare(current if not isinstance(right, str) else str(current), right)
+    return condition
+
+# ---------------------------------------------------------------------------
+# Fake psycopg2 (read replica)
+# ---------------------------------------------------------------------------
+
+class FakeCursor:
+    def __init__(self, connection):
+        self._connection = connection
+        self._result = None
+
+    def execute(self, query, params=None):
+        if self._connection.closed:
+            raise FakeInterfaceError('connection already closed')
+        _simulate_round_trip('replica')
+        if 'FROM rider r' in query:
+            rider = lookup_rider(params[0]) if params else None
+            self._result = (str(params[0]), rider[0], rider[1]) if rider else None
+        else:
+            self._result = (1,)
+
+    def fetchone(self):
+        return self._result
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+class FakeOperationalError(Exception):
+    pass
+
+class FakeInterfaceError(Exception):
+    pass
+
+def _fake_connect(**kwargs):
+    _simulate_round_trip('replica')
+    return FakeConnection()
+
+# ---------------------------------------------------------------------------
+# Installation
+# ---------------------------------------------------------------------------
+
+database = None
+
+def install(latency_ms=0.0, jitter_ms=0.0, tutorials_per_day=12):
+    """Register the fakes as `supabase` and `psycopg2` and set the environment the Lambda expects."""
+    global database
+    import os
+
+    latency['base_ms'] = latency_ms
+    latency['jitter_ms'] = jitter_ms
+    database = FakeDatabase(build_seed_tables(tutorials_per_day))
+
+    supabase_module = types.ModuleType('supabase')
+    supabase_module.create_client = lambda url, key, options=None: FakeSupabaseClient(database)
+    supabase_module.Client = FakeSupabaseClient
+    sys.modules['supabase'] = supabase_module
+
+    psycopg2_module = types.ModuleType('psycopg2')
+    psycopg2_module.connect = _fake_connect
+    psycopg2_module.Error = Exception
+    psycopg2_module.OperationalError = FakeOperationalError
+    psycopg2_module.InterfaceError = FakeInterfaceError
+    sys.modules['psycopg2'] = psycopg2_module
+
+    for name, value in {
+        'SUPABASE_URL': 'https://fake.supabase.co',
+        'SUPABASE_ANON_KEY': 'fake-anon-key',
+        'DB_HOST': 'fake-replica',
+        'DB_NAME': 'fake',
+        'DB_USER': 'fake',
+        'DB_PASSWORD': 'fake',
+    }.items():
+        os.environ.setdefault(name, value)
+    return database
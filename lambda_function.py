@@ -8,77 +8,778 @@ This Lambda function handles:
 """
 
 import json
-import psycopg2
-from supabase import create_client, Client
 import os
-from datetime import datetime
+import base64
+import gzip
+import hashlib
+import hmac
+import importlib.util
+import random
+import contextvars
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 import logging
-from mock_data import get_mock_rider_info, get_mock_training_progress
+
+# psycopg2, supabase (httpx, postgrest, gotrue, realtime, storage3...) and mock_data
+# are imported on first use so OPTIONS preflights and routes that never touch a
+# backend do not pay for them during cold start.
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Connection reuse configuration
+SUPABASE_CLIENT_MAX_AGE_SECONDS = int(os.environ.get('SUPABASE_CLIENT_MAX_AGE_SECONDS', '3600'))
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '2'))
+DB_HEALTH_CHECK_IDLE_SECONDS = int(os.environ.get('DB_HEALTH_CHECK_IDLE_SECONDS', '30'))
+
+# Read replica fail-fast configuration
+DB_CONNECT_TIMEOUT_SECONDS = int(os.environ.get('DB_CONNECT_TIMEOUT_SECONDS', '3'))
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', '5000'))
+DB_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('DB_BREAKER_FAILURE_THRESHOLD', '3'))
+DB_BREAKER_COOLDOWN_SECONDS = int(os.environ.get('DB_BREAKER_COOLDOWN_SECONDS', '30'))
+
+# Per-request deadline: the Lambda's remaining time minus a margin for building the response
+DEADLINE_SAFETY_MARGIN_MS = int(os.environ.get('DEADLINE_SAFETY_MARGIN_MS', '300'))
+SUPABASE_HTTP_TIMEOUT_SECONDS = float(os.environ.get('SUPABASE_HTTP_TIMEOUT_SECONDS', '10'))
+# Below this much remaining budget, optional work (catalog prefetch, probes and loads) is skipped
+LOW_BUDGET_SECONDS = float(os.environ.get('LOW_BUDGET_SECONDS', '1.0'))
+
+# Per-invocation backend instrumentation, emitted as one CloudWatch Embedded Metric Format line
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'BlitzNowTraining')
+# Paths served by route_request; any other path is reported as Route "other", so
+# scanners cannot create new CloudWatch metric series
+METRIC_ROUTES = frozenset((
+    '/rider-info', '/training-progress', '/update-progress', '/module-started', '/module-completed',
+    '/get-tutorials', '/tutorial-state', '/tutorials', '/day-hub-mappings', '/metrics', '/batch',
+))
+
+# Tutorial catalog cache configuration (TTL of 0 disables the cache)
+CATALOG_CACHE_TTL_SECONDS = int(os.environ.get('CATALOG_CACHE_TTL_SECONDS', '300'))
+CATALOG_CACHE_MAX_ROWS = int(os.environ.get('CATALOG_CACHE_MAX_ROWS', '5000'))
+# A snapshot older than this is reloaded even if the version probe sees no change,
+# which bounds staleness for edits the probe cannot detect (0 disables)
+CATALOG_CACHE_MAX_AGE_SECONDS = int(os.environ.get('CATALOG_CACHE_MAX_AGE_SECONDS', '3600'))
+
+# Conditional GET: how long clients may reuse catalog responses without revalidating.
+# Rider-specific reads are always revalidated with If-None-Match.
+CATALOG_CACHE_CONTROL_MAX_AGE_SECONDS = int(os.environ.get('CATALOG_CACHE_CONTROL_MAX_AGE_SECONDS', '300'))
+RIDER_CACHE_CONTROL = 'private, no-cache'
+
+# Columns clients may ask for through the `fields` parameter
+TRAINING_PROGRESS_FIELDS = (
+    'id', 'rider_id', 'tutorial_state',
+    'module_started_day1', 'module_started_day2', 'module_started_day3',
+    'module_completed_day1', 'module_completed_day2', 'module_completed_day3',
+    'created_at', 'updated_at',
+)
+TUTORIAL_FIELDS = ('id', 'title', 'subtitle', 'description', 'created_at', 'updated_at')
+
+# What /get-tutorials reads from the catalog when it is not cached
+TUTORIAL_LIST_FIELDS = ('id', 'title', 'subtitle')
+MAPPING_LIST_FIELDS = ('tutorial_id', 'order_index')
+
+# Bulk catalog import (/tutorials action=import): rows per upsert and rows per request
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', '500'))
+IMPORT_MAX_ROWS = int(os.environ.get('IMPORT_MAX_ROWS', '10000'))
+
+# Keyset pagination of the unfiltered /tutorials and /day-hub-mappings listings
+CATALOG_PAGE_DEFAULT_LIMIT = int(os.environ.get('CATALOG_PAGE_DEFAULT_LIMIT', '100'))
+CATALOG_PAGE_MAX_LIMIT = int(os.environ.get('CATALOG_PAGE_MAX_LIMIT', '500'))
+
+# Response compression: bodies smaller than COMPRESSION_MIN_BYTES go out as plain JSON
+# (0 disables compression). Brotli is used when the optional `brotli` package is installed.
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+GZIP_COMPRESS_LEVEL = int(os.environ.get('GZIP_COMPRESS_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '5'))
+
+# Where rider age reads the node's first tour date: 'lateral' (indexed lookup) or 'summary' (node_first_tour)
+RIDER_AGE_SOURCE = os.environ.get('RIDER_AGE_SOURCE', 'lateral')
+
+# On-demand profiling: sample a fraction of invocations, or profile requests carrying a
+# valid X-Profile-Token header ("<unix_ts>:<hex HMAC-SHA256 of unix_ts keyed by PROFILING_SECRET>")
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_SECRET = os.environ.get('PROFILING_SECRET', '')
+PROFILING_TOP_N = int(os.environ.get('PROFILING_TOP_N', '25'))
+PROFILING_DUMP_DIR = os.environ.get('PROFILING_DUMP_DIR', '')
+
+# /metrics is only served to requests carrying a valid X-Metrics-Token header, signed
+# like X-Profile-Token but with METRICS_SECRET; unset, the route answers 404
+METRICS_SECRET = os.environ.get('METRICS_SECRET', '')
+
+# How long an X-Profile-Token or X-Metrics-Token stays valid after its timestamp
+# (PROFILING_TOKEN_MAX_AGE_SECONDS is still read as the fallback)
+SIGNED_TOKEN_MAX_AGE_SECONDS = int(os.environ.get('SIGNED_TOKEN_MAX_AGE_SECONDS', os.environ.get('PROFILING_TOKEN_MAX_AGE_SECONDS', '300')))
+
+# Opt-in: create clients and preload the tutorial catalog during Lambda's init phase
+WARM_UP_ON_INIT = os.environ.get('WARM_UP_ON_INIT', 'false').lower() in ('1', 'true', 'yes')
+
+# Worker threads for overlapping independent backend calls (1 runs them inline)
+IO_MAX_CONCURRENCY = int(os.environ.get('IO_MAX_CONCURRENCY', '4'))
+
+# Maximum number of sub-requests accepted by /batch
+BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', '10'))
+
+# Rider info cache configuration (max size of 0 disables the cache). Entries expire at
+# the next midnight in RIDER_CACHE_TIMEZONE, which should match the replica's timezone
+# so that cached rider_age flips on the same day boundary as CURRENT_DATE.
+RIDER_CACHE_MAX_SIZE = int(os.environ.get('RIDER_CACHE_MAX_SIZE', '10000'))
+RIDER_NEGATIVE_CACHE_TTL_SECONDS = int(os.environ.get('RIDER_NEGATIVE_CACHE_TTL_SECONDS', '60'))
+RIDER_CACHE_TIMEZONE = os.environ.get('RIDER_CACHE_TIMEZONE', 'UTC')
+
+# Idempotency-Key support on write endpoints: responses are remembered per container
+# for IDEMPOTENCY_TTL_SECONDS (max size of 0 disables it)
+IDEMPOTENCY_MAX_KEYS = int(os.environ.get('IDEMPOTENCY_MAX_KEYS', '10000'))
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '3600'))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+# Write-behind for progress events. '' writes synchronously; 'sqs' sends them to the FIFO
+# queue at PROGRESS_QUEUE_URL, drained by this function's SQS trigger; 'sqlite' keeps them
+# in a local file at PROGRESS_QUEUE_PATH, drained by a background thread (local runs/tests).
+PROGRESS_QUEUE = os.environ.get('PROGRESS_QUEUE', '').lower()
+PROGRESS_QUEUE_URL = os.environ.get('PROGRESS_QUEUE_URL', '')
+PROGRESS_QUEUE_PATH = os.environ.get('PROGRESS_QUEUE_PATH', '/tmp/progress_queue.sqlite3')
+# Longest an event waits in the sqlite queue before it is written
+PROGRESS_FLUSH_INTERVAL_SECONDS = float(os.environ.get('PROGRESS_FLUSH_INTERVAL_SECONDS', '1.0'))
+PROGRESS_DRAIN_BATCH_SIZE = int(os.environ.get('PROGRESS_DRAIN_BATCH_SIZE', '500'))
+# Claimed sqlite events return to the queue if not acknowledged within this time
+PROGRESS_VISIBILITY_TIMEOUT_SECONDS = int(os.environ.get('PROGRESS_VISIBILITY_TIMEOUT_SECONDS', '30'))
+# The only columns a queued event may set; merge_training_progress rejects any other key
+PROGRESS_EVENT_COLUMNS = frozenset((
+    'module_started_day1', 'module_started_day2', 'module_started_day3',
+    'module_completed_day1', 'module_completed_day2', 'module_completed_day3',
+))
+
+class DeadlineExceeded(Exception):
+    """Raised when the invocation's time budget runs out before a backend call completes."""
+
+# Absolute time.monotonic() deadline of the current invocation; None when unbounded (local runs)
+_deadline = contextvars.ContextVar('deadline', default=None)
+
+def deadline_from_context(context):
+    """Turn the Lambda context's remaining time into a monotonic deadline."""
+    get_remaining = getattr(context, 'get_remaining_time_in_millis', None)
+    if get_remaining is None:
+        return None
+    return time.monotonic() + (get_remaining() - DEADLINE_SAFETY_MARGIN_MS) / 1000
+
+def remaining_budget_seconds():
+    """Seconds left before the current deadline, or None when there is no deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+def check_deadline(operation):
+    """Raise DeadlineExceeded if there is no budget left to start `operation`."""
+    remaining = remaining_budget_seconds()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"No time left for {operation}")
+
+def deadline_passed():
+    remaining = remaining_budget_seconds()
+    return remaining is not None and remaining <= 0
+
+def budget_is_low():
+    """Whether so little budget is left that optional backend work should be skipped."""
+    remaining = remaining_budget_seconds()
+    return remaining is not None and remaining < LOW_BUDGET_SECONDS
+
+def on_backend_error(error):
+    """Error hook for Supabase helpers: reset a broken client and surface deadline overruns."""
+    connection_manager.on_supabase_error(error)
+    if isinstance(error, DeadlineExceeded):
+        raise error
+    if deadline_passed():
+        raise DeadlineExceeded(f"Backend call ran past the deadline: {str(error)}") from error
+
+class RequestTrace:
+    """Backend calls made during one invocation, summarised into a single EMF log line."""
+
+    def __init__(self, route):
+        self.route = route
+        self.started = time.perf_counter()
+        self.calls = []  # (operation, duration_ms, rows, error); list.append is thread-safe
+
+    def record(self, operation, duration_ms, rows, error):
+        self.calls.append((operation, duration_ms, rows, error))
+
+    def summary(self, status_code):
+        operations = {}
+        for operation, duration_ms, rows, error in self.calls:
+            entry = operations.setdefault(operation, {'count': 0, 'ms': 0.0, 'rows': 0, 'errors': 0})
+            entry['count'] += 1
+            entry['ms'] += duration_ms
+            entry['rows'] += rows
+            entry['errors'] += int(error)
+        for entry in operations.values():
+            entry['ms'] = round(entry['ms'], 2)
+
+        summary = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': [['Route']],
+                    'Metrics': [
+                        {'Name': 'Latency', 'Unit': 'Milliseconds'},
+                        {'Name': 'RoundTrips', 'Unit': 'Count'},
+                        {'Name': 'BackendErrors', 'Unit': 'Count'},
+                    ] + [{'Name': f'{operation}.ms', 'Unit': 'Milliseconds'} for operation in operations]
+                }]
+            },
+            'Route': self.route,
+            'StatusCode': status_code,
+            'Latency': round((time.perf_counter() - self.started) * 1000, 2),
+            'RoundTrips': len(self.calls),
+            'BackendErrors': sum(1 for call in self.calls if call[3]),
+            'operations': operations,
+        }
+        for operation, entry in operations.items():
+            summary[f'{operation}.ms'] = entry['ms']
+        return summary
+
+_request_trace = contextvars.ContextVar('request_trace', default=None)
+
+class _BackendCall:
+    __slots__ = ('trace', 'operation', 'started', 'rows')
+
+    def __init__(self, trace, operation):
+        self.trace = trace
+        self.operation = operation
+        self.rows = 0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace.record(self.operation, (time.perf_counter() - self.started) * 1000, self.rows, exc_type is not None)
+        return False
+
+class _NoopBackendCall:
+    __slots__ = ('rows',)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_BACKEND_CALL = _NoopBackendCall()
+
+def backend_call(operation):
+    """Context manager timing one backend round trip; set `.rows` on it to record rows returned."""
+    trace = _request_trace.get()
+    if trace is None:
+        return _NOOP_BACKEND_CALL
+    return _BackendCall(trace, operation)
+
+def execute_query(operation, query):
+    """Execute a Supabase query builder, recording it in the request trace."""
+    with backend_call(operation) as call:
+        result = query.execute()
+        data = result.data
+        call.rows = len(data) if isinstance(data, list) else int(data is not None)
+    return result
+
+class ConnectionManager:
+    """Keeps one Supabase client and a small psycopg2 pool alive across warm invocations."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._supabase = None
+        self._supabase_created_at = 0.0
+        self._idle_connections = []  # (conn, last_used) pairs, most recently used last
+        self.stats = {
+            'supabase_hits': 0,
+            'supabase_new': 0,
+            'supabase_resets': 0,
+            'db_hits': 0,
+            'db_new': 0,
+            'db_stale_discarded': 0,
+            'db_dropped_retries': 0,
+        }
+
+    def get_supabase(self):
+        """Return the cached Supabase client, creating it on first use or after expiry."""
+        with self._lock:
+            now = time.monotonic()
+            if self._supabase is not None and now - self._supabase_created_at < SUPABASE_CLIENT_MAX_AGE_SECONDS:
+                self.stats['supabase_hits'] += 1
+                return self._supabase
+
+            supabase_url = os.environ.get('SUPABASE_URL')
+            supabase_key = os.environ.get('SUPABASE_ANON_KEY')
+
+            if not supabase_url or not supabase_key:
+                raise Exception("SUPABASE_URL and SUPABASE_ANON_KEY environment variables must be set")
+
+            from supabase import create_client
+
+            self._supabase = create_client(supabase_url, supabase_key)
+            self._supabase_created_at = now
+            self.stats['supabase_new'] += 1
+            return self._supabase
+
+    def on_supabase_error(self, error):
+        """Drop the cached client after a transport failure so the next call reconnects."""
+        if not _is_connection_error(error):
+            return
+        with self._lock:
+            if self._supabase is not None:
+                logger.info(f"Resetting Supabase client after connection error: {str(error)}")
+                self._supabase = None
+                self.stats['supabase_resets'] += 1
+
+    def checkout_db(self, fresh=False):
+        """Return (conn, reused): a healthy pooled connection, or a new one.
+        
+        With fresh=True the pool is bypassed, e.g. to retry after a pooled
+        connection turned out to be dropped.
+        """
+        while not fresh:
+            with self._lock:
+                if not self._idle_connections:
+                    break
+                conn, last_used = self._idle_connections.pop()
+
+            if self._is_healthy(conn, last_used):
+                with self._lock:
+                    self.stats['db_hits'] += 1
+                return conn, True
+
+            with self._lock:
+                self.stats['db_stale_discarded'] += 1
+            _close_quietly(conn)
+
+        import psycopg2
+
+        with backend_call('replica.connect'):
+            conn = psycopg2.connect(
+                host=os.environ['DB_HOST'],
+                database=os.environ['DB_NAME'],
+                user=os.environ['DB_USER'],
+                password=os.environ['DB_PASSWORD'],
+                port=os.environ.get('DB_PORT', '5432'),
+                connect_timeout=_bounded_connect_timeout(),
+                options=f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}'
+            )
+        with self._lock:
+            self.stats['db_new'] += 1
+        return conn, False
+
+    def on_db_dropped(self):
+        """Count a reused connection that failed mid-query and was replaced."""
+        with self._lock:
+            self.stats['db_dropped_retries'] += 1
+
+    def release_db(self, conn, discard=False):
+        """Return a connection to the pool, or close it if broken or the pool is full."""
+        if conn is None:
+            return
+        if discard or conn.closed:
+            _close_quietly(conn)
+            return
+        try:
+            # End the read transaction so the connection does not sit idle in transaction
+            conn.rollback()
+        except Exception:
+            _close_quietly(conn)
+            return
+        with self._lock:
+            if len(self._idle_connections) < DB_POOL_SIZE:
+                self._idle_connections.append((conn, time.monotonic()))
+                return
+        _close_quietly(conn)
+
+    def _is_healthy(self, conn, last_used):
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < DB_HEALTH_CHECK_IDLE_SECONDS:
+            return True
+        try:
+            cursor = conn.cursor()
+            with backend_call('replica.health_check'):
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            cursor.close()
+            conn.rollback()
+            return True
+        except Exception as e:
+            logger.info(f"Discarding stale database connection: {str(e)}")
+            return False
+
+    def get_stats(self):
+        """Return a snapshot of the reuse counters."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['supabase_connected'] = self._supabase is not None
+            stats['db_idle_connections'] = len(self._idle_connections)
+        return stats
+
+def _bounded_connect_timeout():
+    # libpq takes whole seconds and treats values below 2 as 2
+    remaining = remaining_budget_seconds()
+    if remaining is None:
+        return DB_CONNECT_TIMEOUT_SECONDS
+    return max(2, min(DB_CONNECT_TIMEOUT_SECONDS, int(remaining)))
+
+def statement_timeout_ms():
+    """Replica statement_timeout for the next query, bounded by the request deadline."""
+    remaining = remaining_budget_seconds()
+    if remaining is None:
+        return DB_STATEMENT_TIMEOUT_MS
+    return max(1, min(DB_STATEMENT_TIMEOUT_MS, int(remaining * 1000)))
+
+def _is_connection_error(error):
+    """Best-effort check for network-level failures (httpx / socket errors)."""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return type(error).__name__ in (
+        'ConnectError', 'ConnectTimeout', 'ReadError', 'ReadTimeout', 'WriteError',
+        'RemoteProtocolError', 'PoolTimeout', 'NetworkError', 'TransportError',
+    )
+
+def _is_dropped_connection(conn, error):
+    """Whether a replica query failed because the connection itself is gone.
+    
+    Errors the server reports (statement timeouts, SQL errors) carry a pgcode;
+    a connection closed by the server or a NAT does not.
+    """
+    if conn is not None and conn.closed:
+        return True
+    import psycopg2
+    return isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError)) and getattr(error, 'pgcode', None) is None
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+# Module-level so the client and pool survive across warm invocations
+connection_manager = ConnectionManager()
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker held in container state.
+    
+    After `failure_threshold` consecutive failures the breaker opens and callers skip
+    the backend for `cooldown_seconds`. Then a single probe is let through
+    (half-open): success closes the breaker, failure re-opens it. A probe that never
+    reports back is replaced after another cool-down.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold, cooldown_seconds):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._changed_at = 0.0
+        self.stats = {
+            'opened': 0,
+            'short_circuited': 0,
+            'failures': 0,
+        }
+
+    def allow_request(self):
+        """Return True if the caller may try the backend now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if time.monotonic() - self._changed_at >= self.cooldown_seconds:
+                # Let one probe through; others keep failing fast until it reports
+                self._state = self.HALF_OPEN
+                self._changed_at = time.monotonic()
+                return True
+            self.stats['short_circuited'] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit breaker {self.name} closed")
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self.stats['failures'] += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.stats['opened'] += 1
+                    logger.error(f"Circuit breaker {self.name} opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._changed_at = time.monotonic()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['state'] = self._state
+            stats['consecutive_failures'] = self._failures
+        return stats
+
+replica_breaker = CircuitBreaker('read_replica', DB_BREAKER_FAILURE_THRESHOLD, DB_BREAKER_COOLDOWN_SECONDS)
+
 # Supabase configuration
 def get_supabase_client():
-    """Initialize and return Supabase client."""
+    """Return the shared Supabase client, with each HTTP call's timeout bounded by its request's deadline."""
+    check_deadline('Supabase request')
     try:
-        supabase_url = os.environ.get('SUPABASE_URL')
-        supabase_key = os.environ.get('SUPABASE_ANON_KEY')
-        
-        if not supabase_url or not supabase_key:
-            raise Exception("SUPABASE_URL and SUPABASE_ANON_KEY environment variables must be set")
-        
-        supabase: Client = create_client(supabase_url, supabase_key)
+        supabase = connection_manager.get_supabase()
+        _install_deadline_timeout(supabase)
         return supabase
         
     except Exception as e:
         logger.error(f"Error initializing Supabase client: {str(e)}")
         raise
 
-def get_database_connection():
-    """Get database connection to read replica."""
+def supabase_http_timeout():
+    """HTTP timeout for a Supabase call made now, bounded by the current request's deadline."""
+    remaining = remaining_budget_seconds()
+    return SUPABASE_HTTP_TIMEOUT_SECONDS if remaining is None else max(0.1, min(SUPABASE_HTTP_TIMEOUT_SECONDS, remaining))
+
+def _deadline_timeout_hook(request):
+    # httpx request hook: runs in the calling thread, so the deadline contextvar is the caller's
+    timeout = supabase_http_timeout()
+    request.extensions['timeout'] = {'connect': timeout, 'read': timeout, 'write': timeout, 'pool': timeout}
+
+def _install_deadline_timeout(supabase):
+    """Hook the shared client's HTTP session once, instead of setting one timeout for every request in flight."""
+    session = getattr(getattr(supabase, 'postgrest', None), 'session', None)
+    event_hooks = getattr(session, 'event_hooks', None)
+    if event_hooks is not None and _deadline_timeout_hook not in event_hooks['request']:
+        session.event_hooks = dict(event_hooks, request=event_hooks['request'] + [_deadline_timeout_hook])
+
+def get_database_connection(fresh=False):
+    """Get (conn, reused) for the read replica; conn is None while the breaker is open or on failure."""
+    check_deadline('read replica connection')
+    if not replica_breaker.allow_request():
+        logger.info("Read replica circuit breaker is open, skipping connection attempt")
+        return None, False
     try:
-        conn = psycopg2.connect(
-            host=os.environ['DB_HOST'],
-            database=os.environ['DB_NAME'],
-            user=os.environ['DB_USER'],
-            password=os.environ['DB_PASSWORD'],
-            port=os.environ.get('DB_PORT', '5432')
-        )
-        return conn
+        return connection_manager.checkout_db(fresh=fresh)
     except Exception as e:
+        replica_breaker.record_failure()
         logger.error(f"Error connecting to database: {str(e)}")
         # Don't raise the exception, return None instead for fallback
-        return None
+        return None, False
 
-def get_rider_info(rider_id):
-    """Get rider information from database with fallback to mock data."""
-    conn = None
-    try:
-        conn = get_database_connection()
-        if conn is None:
-            logger.info(f"Database connection failed, using mock data for rider_id: {rider_id}")
-            return get_mock_rider_info(rider_id)
-        
-        cursor = conn.cursor()
-        
-        # Execute the query with fallback to created_at
-        query = """
-        WITH tour_min AS (
-  SELECT node_id, MIN(tour_date)::date AS min_tour_date
-  FROM tour
-  GROUP BY node_id
-)
+def release_database_connection(conn, discard=False):
+    """Return a connection obtained from get_database_connection to the pool."""
+    connection_manager.release_db(conn, discard=discard)
+
+class TutorialCatalogCache:
+    """Warm-container snapshot of the tutorials and day_hub_tutorial_mappings tables.
+
+    Writes made through this container invalidate the snapshot immediately. Once the
+    TTL elapses, a cheap version probe (row count and latest updated_at per table,
+    kept current by the triggers in supabase_migrations.sql) decides whether the
+    snapshot is still current, which bounds staleness for writes made by other
+    containers. A snapshot older than max_age_seconds is reloaded regardless. A
+    failed probe or load is not retried until the TTL elapses either; meanwhile the
+    existing snapshot keeps being served, or callers query Supabase directly if
+    there is none. With less than
+    LOW_BUDGET_SECONDS left, the current snapshot is served without a probe, even
+    past its TTL, and an empty cache is not loaded. Returned rows are shared and
+    must be treated as read-only.
+    """
+
+    def __init__(self, ttl_seconds, max_rows, max_age_seconds=0):
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = None
+        self._checked_at = None
+        self._loaded_at = None
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'loads': 0,
+            'revalidations': 0,
+            'invalidations': 0,
+            'oversize': 0,
+            'errors': 0,
+            'stale_serves': 0,
+            'expired_reloads': 0,
+            'low_budget_skips': 0,
+        }
+
+    def get(self):
+        """Return the current snapshot, or None when the caller should query Supabase directly."""
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            if self._checked_at is not None and now - self._checked_at < self.ttl_seconds:
+                if self._snapshot is not None:
+                    self.stats['hits'] += 1
+                    return self._snapshot
+                # Catalog too large to hold, or the last probe failed; skip re-probing until the TTL elapses
+                self.stats['misses'] += 1
+                return None
+            if budget_is_low():
+                # No time for a probe or load: serve what we have, or let the caller query directly
+                self.stats['low_budget_skips'] += 1
+                return self._snapshot
+
+            expired = self._snapshot is not None and self.max_age_seconds > 0 and now - self._loaded_at >= self.max_age_seconds
+            try:
+                version = self._fetch_version()
+                if self._snapshot is not None and version == self._version and not expired:
+                    self.stats['revalidations'] += 1
+                    self.stats['hits'] += 1
+                    self._checked_at = now
+                    return self._snapshot
+
+                self.stats['misses'] += 1
+                if any(count is not None and count > self.max_rows for count, _ in version):
+                    logger.info(f"Tutorial catalog exceeds CATALOG_CACHE_MAX_ROWS ({self.max_rows}), not caching")
+                    self.stats['oversize'] += 1
+                    self._snapshot = None
+                    self._version = version
+                    self._checked_at = now
+                    return None
+
+                if expired and version == self._version:
+                    self.stats['expired_reloads'] += 1
+                self._load(now)
+                self._version = version
+                self._checked_at = now
+                return self._snapshot
+
+            except Exception as e:
+                connection_manager.on_supabase_error(e)
+                logger.error(f"Error loading tutorial catalog cache: {str(e)}")
+                self.stats['errors'] += 1
+                self._checked_at = now
+                if self._snapshot is not None:
+                    # Better a snapshot one TTL older than every request going to Supabase
+                    self.stats['stale_serves'] += 1
+                return self._snapshot
+
+    def invalidate(self):
+        """Drop the snapshot after a catalog write in this container."""
+        with self._lock:
+            if self._snapshot is not None:
+                self.stats['invalidations'] += 1
+            self._snapshot = None
+            self._version = None
+            self._checked_at = None
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['cached'] = self._snapshot is not None
+            stats['templates'] = len(self._snapshot['tutorial_templates']) if self._snapshot is not None else 0
+            stats['ttl_seconds'] = self.ttl_seconds
+        return stats
+
+    def _fetch_version(self):
+        supabase = get_supabase_client()
+        version = []
+        for table in ('tutorials', 'day_hub_tutorial_mappings'):
+            result = execute_query(f'{table}.version', supabase.table(table).select('updated_at', count='exact').order('updated_at', desc=True).limit(1))
+            latest = result.data[0].get('updated_at') if result.data else None
+            version.append((result.count, latest))
+        return tuple(version)
+
+    def _load(self, now):
+        supabase = get_supabase_client()
+        tutorial_rows = execute_query('tutorials.load', supabase.table('tutorials').select('*').order('id')).data or []
+        mapping_rows = execute_query('mappings.load', supabase.table('day_hub_tutorial_mappings').select('*').order('day').order('hub_type').order('order_index').order('id')).data or []
+
+        mappings_by_day_hub = {}
+        for mapping in mapping_rows:
+            mappings_by_day_hub.setdefault(_day_hub_key(mapping['day'], mapping['hub_type']), []).append(mapping)
+        for mappings in mappings_by_day_hub.values():
+            mappings.sort(key=lambda m: m.get('order_index') or 0)
+        tutorials_by_id = {tutorial['id']: tutorial for tutorial in tutorial_rows}
+
+        self._snapshot = {
+            'tutorials': tutorial_rows,
+            'tutorials_by_id': tutorials_by_id,
+            'tutorial_positions': {_tutorial_sort_key(tutorial): index for index, tutorial in enumerate(tutorial_rows)},
+            'mappings': mapping_rows,
+            'mappings_by_day_hub': mappings_by_day_hub,
+            'mapping_positions': {_mapping_sort_key(mapping): index for index, mapping in enumerate(mapping_rows)},
+            'tutorial_templates': {
+                key: build_tutorial_template(mappings, tutorials_by_id)
+                for key, mappings in mappings_by_day_hub.items()
+            },
+        }
+        self._loaded_at = now
+        self.stats['loads'] += 1
+        logger.info(f"Loaded tutorial catalog cache: {len(tutorial_rows)} tutorials, {len(mapping_rows)} mappings")
+
+def build_tutorial_template(mappings, tutorials_by_id):
+    """/get-tutorials entries for one (day, hub_type), in mapping order, without isDone.
+    
+    Each entry is {'id', 'title', 'subtitle'}; a rider's list is the template
+    with their flags added (see apply_tutorial_states). Mappings whose tutorial
+    no longer exists are left out.
+    """
+    template = []
+    for mapping in mappings:
+        tutorial_id = mapping['tutorial_id']
+        tutorial_info = tutorials_by_id.get(tutorial_id)
+        if tutorial_info:
+            template.append({
+                'id': tutorial_id,
+                'title': tutorial_info['title'],
+                'subtitle': tutorial_info.get('subtitle', '')
+            })
+    return template
+
+def apply_tutorial_states(template, tutorial_states):
+    """A rider's tutorial list: copies of the template entries with their isDone flags."""
+    return [
+        dict(entry, isDone=tutorial_states.get(entry['id'], {}).get('isDone', False))
+        for entry in template
+    ]
+
+def _tutorial_sort_key(tutorial):
+    return (tutorial['id'],)
+
+def _mapping_sort_key(mapping):
+    # id breaks ties in case a (day, hub_type) set repeats an order_index
+    return (mapping['day'], mapping['hub_type'], mapping['order_index'], mapping['id'])
+
+def _day_hub_key(day, hub_type):
+    # Query parameters arrive as strings while rows carry integers
+    return (str(day), hub_type)
+
+tutorial_catalog = TutorialCatalogCache(CATALOG_CACHE_TTL_SECONDS, CATALOG_CACHE_MAX_ROWS, CATALOG_CACHE_MAX_AGE_SECONDS)
+
+# Rider age is counted from the node's first tour, falling back to the rider's
+# created_at. The first-tour lookup only touches the rider's own node and is served
+# by the tour (node_id, tour_date) index documented in replica_schema.sql.
+_RIDER_INFO_QUERY_TEMPLATE = """
 SELECT
   r.rider_id,
   n.node_type,
   CASE
-    WHEN tm.min_tour_date IS NOT NULL THEN
+    WHEN ft.min_tour_date IS NOT NULL THEN
       CASE
-        WHEN (tm.min_tour_date - CURRENT_DATE) = 0 THEN 1
-        WHEN (tm.min_tour_date - CURRENT_DATE) = 1 THEN 2
-        WHEN (tm.min_tour_date - CURRENT_DATE) = 2 THEN 3
+        WHEN (ft.min_tour_date - CURRENT_DATE) = 0 THEN 1
+        WHEN (ft.min_tour_date - CURRENT_DATE) = 1 THEN 2
+        WHEN (ft.min_tour_date - CURRENT_DATE) = 2 THEN 3
         ELSE NULL
       END
     ELSE
@@ -92,37 +793,541 @@ SELECT
 FROM rider r
 JOIN node n
   ON r.node_node_id = n.node_id
-LEFT JOIN tour_min tm
-  ON tm.node_id = n.node_id
+{first_tour_join}
 WHERE r.rider_id = %s;
-        """
-        
-        cursor.execute(query, (rider_id,))
-        result = cursor.fetchone()
+"""
+
+_FIRST_TOUR_LOOKUP = """(
+    SELECT t.tour_date::date
+    FROM tour t
+    WHERE t.node_id = n.node_id
+      AND t.tour_date IS NOT NULL
+    ORDER BY t.tour_date
+    LIMIT 1
+  )"""
+
+RIDER_INFO_QUERY = _RIDER_INFO_QUERY_TEMPLATE.format(
+    first_tour_join=f"LEFT JOIN LATERAL (\n  SELECT {_FIRST_TOUR_LOOKUP} AS min_tour_date\n) ft ON TRUE"
+)
+
+# Reads the node_first_tour summary maintained by refresh_node_first_tour.py, with the
+# indexed lookup as a fallback for nodes added since the last refresh.
+RIDER_INFO_SUMMARY_QUERY = _RIDER_INFO_QUERY_TEMPLATE.format(
+    first_tour_join=f"LEFT JOIN node_first_tour nft\n  ON nft.node_id = n.node_id\nLEFT JOIN LATERAL (\n  SELECT COALESCE(nft.min_tour_date, {_FIRST_TOUR_LOOKUP}) AS min_tour_date\n) ft ON TRUE"
+)
+
+class RiderInfoCache:
+    """Per-container LRU of rider info that expires at the next local midnight.
+
+    Unknown riders are cached as None for a short negative TTL so retrying clients
+    do not reach the replica on every attempt.
+    """
+
+    def __init__(self, max_size, negative_ttl_seconds, timezone):
+        self.max_size = max_size
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.timezone = ZoneInfo(timezone)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # rider_id -> (rider_info or None, expires_at)
+        self.stats = {
+            'hits': 0,
+            'negative_hits': 0,
+            'misses': 0,
+            'expirations': 0,
+            'evictions': 0,
+        }
+
+    def get(self, rider_id):
+        """Return (found, rider_info); rider_info is None for a cached unknown rider."""
+        key = str(rider_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return False, None
+
+            rider_info, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            if rider_info is None:
+                self.stats['negative_hits'] += 1
+                return True, None
+            self.stats['hits'] += 1
+            return True, dict(rider_info)
+
+    def contains(self, rider_id):
+        """Whether an unexpired entry (known or unknown rider) is cached, without touching the stats."""
+        with self._lock:
+            entry = self._entries.get(str(rider_id))
+            return entry is not None and time.time() < entry[1]
+
+    def put(self, rider_id, rider_info):
+        if self.max_size <= 0:
+            return
+        expires_at = self._next_midnight()
+        if rider_info is None:
+            expires_at = min(expires_at, time.time() + self.negative_ttl_seconds)
+
+        key = str(rider_id)
+        with self._lock:
+            self._entries[key] = (dict(rider_info) if rider_info is not None else None, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['size'] = len(self._entries)
+            stats['max_size'] = self.max_size
+        lookups = stats['hits'] + stats['negative_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['negative_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _next_midnight(self):
+        now = datetime.now(self.timezone)
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=self.timezone)
+        return midnight.timestamp()
+
+rider_info_cache = RiderInfoCache(RIDER_CACHE_MAX_SIZE, RIDER_NEGATIVE_CACHE_TTL_SECONDS, RIDER_CACHE_TIMEZONE)
+
+class IdempotencyStore:
+    """Per-container LRU of recent Idempotency-Keys and the responses they produced.
+
+    Each entry keeps a fingerprint of the original request, so a key reused for a
+    different request is rejected instead of replaying the wrong response. Only the
+    status code and body are stored; headers come from the replaying request.
+    """
+
+    def __init__(self, max_size, ttl_seconds):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (fingerprint, (status_code, body) or None while in flight, expires_at)
+        self.stats = {
+            'replays': 0,
+            'misses': 0,
+            'conflicts': 0,
+            'mismatches': 0,
+            'evictions': 0,
+            'full': 0,
+        }
+
+    def begin(self, key, fingerprint):
+        """Claim a key: ('new', None), ('replay', (status_code, body)), ('in_progress', None), ('mismatch', None) or ('full', None)."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now >= entry[2]:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                if len(self._entries) >= self.max_size and not self._evict_one(now):
+                    self.stats['full'] += 1
+                    return 'full', None
+                self.stats['misses'] += 1
+                self._entries[key] = (fingerprint, None, now + self.ttl_seconds)
+                return 'new', None
+
+            stored_fingerprint, stored_response, _ = entry
+            if stored_fingerprint != fingerprint:
+                self.stats['mismatches'] += 1
+                return 'mismatch', None
+            if stored_response is None:
+                self.stats['conflicts'] += 1
+                return 'in_progress', None
+            self._entries.move_to_end(key)
+            self.stats['replays'] += 1
+            return 'replay', stored_response
+
+    def _evict_one(self, now):
+        """Drop the oldest completed or expired entry; False if every entry is still in flight.
         
-        if result:
-            return {
-                'rider_id': result[0],
-                'node_type': result[1],
-                'rider_age': result[2]
-            }
+        In-flight keys are never evicted, since a retry would then run the write a second time.
+        """
+        for key, (_, response, expires_at) in self._entries.items():
+            if response is not None or now >= expires_at:
+                del self._entries[key]
+                self.stats['evictions'] += 1
+                return True
+        return False
+
+    def complete(self, key, fingerprint, status_code, body):
+        """Remember the response for a key claimed with begin()."""
+        with self._lock:
+            self._entries[key] = (fingerprint, (status_code, body), time.time() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+
+    def release(self, key):
+        """Forget a claimed key so the client can retry, e.g. after a 5xx."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is None:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['size'] = len(self._entries)
+            stats['max_size'] = self.max_size
+        return stats
+
+idempotency_store = IdempotencyStore(IDEMPOTENCY_MAX_KEYS, IDEMPOTENCY_TTL_SECONDS)
+
+progress_queue_stats = {
+    'enqueued': 0,
+    'enqueue_errors': 0,
+    'drained_events': 0,
+    'rider_writes': 0,
+    'write_failures': 0,
+}
+_progress_stats_lock = threading.Lock()
+
+def count_progress(stat, amount=1):
+    with _progress_stats_lock:
+        progress_queue_stats[stat] += amount
+
+class SQSProgressQueue:
+    """Progress events on an SQS FIFO queue, grouped by rider so each rider's events stay in order.
+
+    Draining happens through the queue's Lambda trigger (see drain_sqs_event).
+    """
+
+    def __init__(self, queue_url):
+        import boto3
+        self.queue_url = queue_url
+        self._client = boto3.client('sqs')
+
+    def send(self, event):
+        message = {
+            'QueueUrl': self.queue_url,
+            'MessageBody': json.dumps(event, default=str),
+        }
+        if self.queue_url.endswith('.fifo'):
+            message['MessageGroupId'] = str(event['rider_id'])
+            # Identical events (e.g. toggling a tutorial back) must not be deduplicated away
+            message['MessageDeduplicationId'] = event['event_id']
+        self._client.send_message(**message)
+
+class SQLiteProgressQueue:
+    """File-backed stand-in for the SQS queue, for local runs and tests.
+
+    receive() claims the oldest events of riders that have nothing in flight, so
+    several drainers can share the file without reordering a rider's events.
+    Claims expire after the visibility timeout, like SQS, if a drainer dies.
+    """
+
+    def __init__(self, path):
+        import sqlite3
+        self.path = path
+        self._local = threading.local()
+        self._sqlite3 = sqlite3
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS progress_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    rider_id TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    enqueued_at REAL NOT NULL,
+                    claimed_until REAL NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS progress_events_rider_idx ON progress_events (rider_id, claimed_until)")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def send(self, event):
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO progress_events (rider_id, payload, enqueued_at) VALUES (?, ?, ?)",
+            (str(event['rider_id']), json.dumps(event, default=str), time.time())
+        )
+
+    def receive(self, max_events):
+        """Claim up to max_events events in queue order; returns [(event_id, event)]."""
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute("""
+                SELECT id, payload FROM progress_events
+                WHERE claimed_until <= ?
+                  AND rider_id NOT IN (SELECT rider_id FROM progress_events WHERE claimed_until > ?)
+                ORDER BY id
+                LIMIT ?
+            """, (now, now, max_events)).fetchall()
+            if rows:
+                conn.executemany(
+                    "UPDATE progress_events SET claimed_until = ? WHERE id = ?",
+                    [(now + PROGRESS_VISIBILITY_TIMEOUT_SECONDS, row[0]) for row in rows]
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [(row[0], json.loads(row[1])) for row in rows]
+
+    def ack(self, event_ids):
+        if event_ids:
+            self._connect().executemany("DELETE FROM progress_events WHERE id = ?", [(event_id,) for event_id in event_ids])
+
+    def release(self, event_ids):
+        if event_ids:
+            self._connect().executemany("UPDATE progress_events SET claimed_until = 0 WHERE id = ?", [(event_id,) for event_id in event_ids])
+
+    def depth(self):
+        return self._connect().execute("SELECT COUNT(*) FROM progress_events").fetchone()[0]
+
+_progress_queue = None
+_progress_drainer = None
+_progress_queue_lock = threading.Lock()
+
+def get_progress_queue_stats():
+    with _progress_stats_lock:
+        stats = dict(progress_queue_stats)
+    stats['mode'] = PROGRESS_QUEUE or 'sync'
+    return stats
+
+def get_progress_queue():
+    """The configured write-behind queue, or None when progress is written synchronously."""
+    global _progress_queue, _progress_drainer
+    if not PROGRESS_QUEUE:
+        return None
+    with _progress_queue_lock:
+        if _progress_queue is None:
+            if PROGRESS_QUEUE == 'sqs':
+                _progress_queue = SQSProgressQueue(PROGRESS_QUEUE_URL)
+            elif PROGRESS_QUEUE == 'sqlite':
+                _progress_queue = SQLiteProgressQueue(PROGRESS_QUEUE_PATH)
+                _progress_drainer = threading.Thread(target=run_progress_drainer, args=(_progress_queue,), name='progress-drainer', daemon=True)
+                _progress_drainer.start()
+            else:
+                raise ValueError(f"Unknown PROGRESS_QUEUE: {PROGRESS_QUEUE}")
+    return _progress_queue
+
+def check_progress_queue_config():
+    """Fail at init, rather than on the first write, when PROGRESS_QUEUE cannot work here.
+    
+    boto3 is provided by the Lambda Python runtime and is not in requirements.txt.
+    The sqlite queue lives in one container's /tmp, so it is refused on Lambda.
+    """
+    if not PROGRESS_QUEUE:
+        return
+    if PROGRESS_QUEUE == 'sqs':
+        if not PROGRESS_QUEUE_URL:
+            raise ValueError("PROGRESS_QUEUE=sqs needs PROGRESS_QUEUE_URL")
+        if importlib.util.find_spec('boto3') is None:
+            raise RuntimeError("PROGRESS_QUEUE=sqs needs boto3; it ships with the Lambda runtime, elsewhere pip install boto3")
+    elif PROGRESS_QUEUE == 'sqlite':
+        if os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+            raise ValueError("PROGRESS_QUEUE=sqlite is for local runs only; use sqs on Lambda")
+    else:
+        raise ValueError(f"Unknown PROGRESS_QUEUE: {PROGRESS_QUEUE}")
+
+check_progress_queue_config()
+
+def enqueue_progress_event(rider_id, columns=None, states=None):
+    """Queue a progress change for write-behind; False means the caller should write it now."""
+    try:
+        queue = get_progress_queue()
+        if queue is None:
+            return False
+        queue.send({
+            'event_id': uuid.uuid4().hex,
+            'rider_id': rider_id,
+            'columns': columns or {},
+            'states': states or {},
+            'enqueued_at': datetime.now().isoformat(),
+        })
+        count_progress('enqueued')
+        return True
+    except Exception as e:
+        count_progress('enqueue_errors')
+        logger.error(f"Error queueing progress event, writing synchronously: {str(e)}")
+        return False
+
+def coalesce_progress_events(events):
+    """Merge events per rider, in order; later values win. Returns {rider_key: (rider_id, columns, states, [ids])}."""
+    merged = {}
+    for event_id, event in events:
+        rider_key = str(event['rider_id'])
+        if rider_key not in merged:
+            merged[rider_key] = (event['rider_id'], {}, {}, [])
+        _, columns, states, event_ids = merged[rider_key]
+        columns.update(event.get('columns') or {})
+        states.update(event.get('states') or {})
+        event_ids.append(event_id)
+    return merged
+
+def flush_progress_events(events):
+    """Write coalesced events, one merge per rider; returns the ids of events that failed."""
+    failed = []
+    for rider_id, columns, states, event_ids in coalesce_progress_events(events).values():
+        if merge_training_progress(rider_id, columns, states):
+            count_progress('rider_writes')
+            count_progress('drained_events', len(event_ids))
         else:
-            return None
+            count_progress('write_failures')
+            failed.extend(event_ids)
+    return failed
+
+def run_progress_drainer(queue):
+    """Background loop for the sqlite queue: flush what has arrived every PROGRESS_FLUSH_INTERVAL_SECONDS."""
+    while True:
+        try:
+            events = queue.receive(PROGRESS_DRAIN_BATCH_SIZE)
+            if events:
+                failed = set(flush_progress_events(events))
+                queue.ack([event_id for event_id, _ in events if event_id not in failed])
+                queue.release(list(failed))
+                if len(events) == PROGRESS_DRAIN_BATCH_SIZE and not failed:
+                    continue
+        except Exception as e:
+            logger.error(f"Error draining progress queue: {str(e)}")
+        time.sleep(PROGRESS_FLUSH_INTERVAL_SECONDS)
+
+_io_executor = None
+_io_executor_lock = threading.Lock()
+
+def submit_io(fn, *args):
+    """Start a backend call on the shared I/O pool and return its Future.
+    
+    The caller's context (e.g. the /batch memo) is carried into the worker. With
+    IO_MAX_CONCURRENCY <= 1 the call runs inline and a completed Future is returned.
+    """
+    global _io_executor
+    if IO_MAX_CONCURRENCY <= 1:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    with _io_executor_lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(max_workers=IO_MAX_CONCURRENCY, thread_name_prefix='io')
+    
+    return _io_executor.submit(contextvars.copy_context().run, fn, *args)
+
+def cancel_io(future):
+    """Drop a speculative submit_io call that is no longer needed; one already running finishes in the background."""
+    if future is not None:
+        future.cancel()
+
+# Lookups shared by the sub-requests of one /batch call; None outside a batch
+_batch_memo = contextvars.ContextVar('batch_memo', default=None)
+
+def get_rider_info(rider_id):
+    """Get rider information, served from the batch memo or per-container cache when possible."""
+    memo = _batch_memo.get()
+    memo_key = ('rider_info', str(rider_id))
+    if memo is not None and memo_key in memo:
+        return memo[memo_key]
+    
+    found, rider_info = rider_info_cache.get(rider_id)
+    if not found:
+        rider_info, from_database = fetch_rider_info(rider_id)
+        # Only cache answers from the replica; mock fallbacks must not outlive an outage
+        if from_database:
+            rider_info_cache.put(rider_id, rider_info)
+    
+    if memo is not None:
+        memo[memo_key] = rider_info
+    return rider_info
+
+def is_rider_info_known(rider_id):
+    """Whether get_rider_info can answer from the batch memo or the rider cache, without the replica."""
+    memo = _batch_memo.get()
+    if memo is not None and ('rider_info', str(rider_id)) in memo:
+        return True
+    return rider_info_cache.contains(rider_id)
+
+def fetch_rider_info(rider_id):
+    """Get rider information from database with fallback to mock data.
+    
+    A pooled connection that was dropped while idle (by the server or a NAT) is
+    discarded and the query retried once on a new connection before falling back.
+    Returns (rider_info, from_database).
+    """
+    for attempt in range(2):
+        conn = None
+        reused = False
+        failed = False
+        try:
+            conn, reused = get_database_connection(fresh=attempt > 0)
+            if conn is None:
+                logger.info(f"Database connection failed, using mock data for rider_id: {rider_id}")
+                from mock_data import get_mock_rider_info
+                return get_mock_rider_info(rider_id), False
             
-    except Exception as e:
-        logger.error(f"Error fetching rider info: {str(e)}")
-        logger.info(f"Falling back to mock data for rider_id: {rider_id}")
-        # Fallback to mock data for local development
-        return get_mock_rider_info(rider_id)
-    finally:
-        if conn:
-            conn.close()
+            cursor = conn.cursor()
+            
+            # Execute the query with fallback to created_at
+            query = RIDER_INFO_SUMMARY_QUERY if RIDER_AGE_SOURCE == 'summary' else RIDER_INFO_QUERY
+            
+            # Sent as one round trip; SET LOCAL bounds only this transaction
+            with backend_call('replica.rider_info') as call:
+                cursor.execute(f"SET LOCAL statement_timeout = {statement_timeout_ms()};\n{query}", (rider_id,))
+                result = cursor.fetchone()
+                call.rows = int(result is not None)
+            replica_breaker.record_success()
+            
+            if result:
+                return {
+                    'rider_id': result[0],
+                    'node_type': result[1],
+                    'rider_age': result[2]
+                }, True
+            else:
+                return None, True
+                
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            failed = True
+            if deadline_passed():
+                # Our own budget ran out; not a replica failure
+                raise DeadlineExceeded(f"Rider lookup ran past the deadline: {str(e)}") from e
+            if reused and _is_dropped_connection(conn, e):
+                logger.info(f"Pooled database connection was dropped, retrying on a new one: {str(e)}")
+                connection_manager.on_db_dropped()
+                continue
+            logger.error(f"Error fetching rider info: {str(e)}")
+            if conn is not None:
+                replica_breaker.record_failure()
+            logger.info(f"Falling back to mock data for rider_id: {rider_id}")
+            # Fallback to mock data for local development
+            from mock_data import get_mock_rider_info
+            return get_mock_rider_info(rider_id), False
+        finally:
+            if conn:
+                release_database_connection(conn, discard=failed)
 
 def update_training_progress(rider_id, module_started=None, module_completed=None):
-    """Update training progress in Supabase."""
+    """Update training progress in Supabase, or queue it when write-behind is on."""
     try:
-        supabase = get_supabase_client()
-        
         # Prepare update data
         update_data = {}
         
@@ -138,21 +1343,19 @@ def update_training_progress(rider_id, module_started=None, module_completed=Non
                 column_name = f'module_completed_{day}'
                 update_data[column_name] = timestamp
         
+        # Anything merge_training_progress cannot set goes the synchronous way so the caller still sees the error
+        if update_data.keys() <= PROGRESS_EVENT_COLUMNS and enqueue_progress_event(rider_id, columns=update_data):
+            return True
+        
+        supabase = get_supabase_client()
+        
         # Always update the updated_at timestamp
         update_data['updated_at'] = datetime.now().isoformat()
         
-        # Check if record exists for this rider
-        existing_record = supabase.table('training_progress').select('*').eq('rider_id', rider_id).execute()
-        
-        if existing_record.data:
-            # Update existing record
-            logger.info(f"Updating existing training progress for rider_id: {rider_id}")
-            result = supabase.table('training_progress').update(update_data).eq('rider_id', rider_id).execute()
-        else:
-            # Create new record
-            logger.info(f"Creating new training progress record for rider_id: {rider_id}")
-            update_data['rider_id'] = rider_id
-            result = supabase.table('training_progress').insert(update_data).execute()
+        # Single round trip: insert the row or merge only the provided columns into it.
+        # Relies on the unique constraint on training_progress.rider_id (supabase_migrations.sql).
+        update_data['rider_id'] = rider_id
+        result = execute_query('training_progress.upsert', supabase.table('training_progress').upsert(update_data, on_conflict='rider_id'))
         
         if result.data:
             logger.info(f"Successfully updated training progress for rider_id: {rider_id}")
@@ -162,15 +1365,19 @@ def update_training_progress(rider_id, module_started=None, module_completed=Non
             return False
         
     except Exception as e:
+        on_backend_error(e)
         logger.error(f"Error updating training progress: {str(e)}")
         raise
 
-def get_training_progress(rider_id):
-    """Get training progress from Supabase with fallback to mock data."""
+def get_training_progress(rider_id, fields=None):
+    """Get training progress from Supabase with fallback to mock data.
+    
+    `fields` limits the columns read (see TRAINING_PROGRESS_FIELDS); None reads the whole row.
+    """
     try:
         supabase = get_supabase_client()
         
-        result = supabase.table('training_progress').select('*').eq('rider_id', rider_id).execute()
+        result = execute_query('training_progress.select', supabase.table('training_progress').select(select_columns(fields)).eq('rider_id', rider_id))
         
         if result.data:
             return result.data[0]
@@ -178,21 +1385,83 @@ def get_training_progress(rider_id):
             return None
         
     except Exception as e:
+        on_backend_error(e)
         logger.error(f"Error getting training progress: {str(e)}")
         logger.info(f"Falling back to mock data for rider_id: {rider_id}")
         # Fallback to mock data for local development
-        return get_mock_training_progress(rider_id)
+        from mock_data import get_mock_training_progress
+        return project_row(get_mock_training_progress(rider_id), fields)
+
+def select_columns(fields):
+    """PostgREST select list for a projection; None selects every column."""
+    return ','.join(fields) if fields else '*'
+
+def project_row(row, fields):
+    """Copy of row limited to fields; rows and None pass through when fields is None."""
+    if row is None or not fields:
+        return row
+    return {field: row.get(field) for field in fields}
 
-def get_tutorial_mappings(day, hub_type):
-    """Get tutorial mappings for a specific day and hub type."""
+def parse_fields(value, allowed, required=()):
+    """Validated column list from a `fields` parameter (comma-separated string or list).
+    
+    Returns None when no projection was asked for, including values that name no
+    column such as ',' or [' ']. Columns in `required` are always included. Raises
+    ValueError naming any column outside `allowed`.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list) or not all(isinstance(field, str) for field in value):
+        raise ValueError('fields must be a comma-separated string or a list of column names')
+    
+    named = [field.strip() for field in value if field.strip()]
+    if not named:
+        return None
+    fields = list(required)
+    for field in named:
+        if field not in fields:
+            fields.append(field)
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return fields
+
+def get_tutorial_template(day, hub_type):
+    """Get the precomputed tutorial list template for a day and hub type.
+    
+    Served from the catalog snapshot, where templates are rebuilt on every load;
+    without a snapshot it is built from a mappings query and a tutorials query.
+    """
+    catalog = tutorial_catalog.get()
+    if catalog is not None:
+        return catalog['tutorial_templates'].get(_day_hub_key(day, hub_type), [])
+    
+    mappings = get_tutorial_mappings(day, hub_type, fields=MAPPING_LIST_FIELDS)
+    if not mappings:
+        return []
+    tutorials_by_id = get_tutorials_by_ids([mapping['tutorial_id'] for mapping in mappings])
+    return build_tutorial_template(mappings, tutorials_by_id)
+
+def get_tutorial_mappings(day, hub_type, fields=None):
+    """Get tutorial mappings for a specific day and hub type.
+    
+    `fields` narrows the columns read from Supabase; cached rows are returned whole.
+    """
+    catalog = tutorial_catalog.get()
+    if catalog is not None:
+        return catalog['mappings_by_day_hub'].get(_day_hub_key(day, hub_type), [])
+    
     try:
         supabase = get_supabase_client()
         
-        result = supabase.table('day_hub_tutorial_mappings').select('*').eq('day', day).eq('hub_type', hub_type).order('order_index').execute()
+        result = execute_query('mappings.select', supabase.table('day_hub_tutorial_mappings').select(select_columns(fields)).eq('day', day).eq('hub_type', hub_type).order('order_index'))
         
         return result.data if result.data else []
         
     except Exception as e:
+        on_backend_error(e)
         logger.error(f"Error getting tutorial mappings: {str(e)}")
         return []
 
@@ -201,7 +1470,7 @@ def get_tutorial_states(rider_id):
     try:
         supabase = get_supabase_client()
         
-        result = supabase.table('training_progress').select('tutorial_state').eq('rider_id', rider_id).execute()
+        result = execute_query('tutorial_state.select', supabase.table('training_progress').select('tutorial_state').eq('rider_id', rider_id))
         
         if result.data and result.data[0].get('tutorial_state'):
             return result.data[0]['tutorial_state']
@@ -209,65 +1478,142 @@ def get_tutorial_states(rider_id):
             return {}
         
     except Exception as e:
+        on_backend_error(e)
         logger.error(f"Error getting tutorial states: {str(e)}")
         return {}
 
-def get_tutorial_by_id(tutorial_id):
-    """Get tutorial information by ID."""
+def get_tutorial_by_id(tutorial_id, fields=None):
+    """Get tutorial information by ID, limited to `fields` when given."""
+    catalog = tutorial_catalog.get()
+    if catalog is not None:
+        return project_row(catalog['tutorials_by_id'].get(tutorial_id), fields)
+    
     try:
         supabase = get_supabase_client()
         
-        result = supabase.table('tutorials').select('*').eq('id', tutorial_id).execute()
+        result = execute_query('tutorials.select', supabase.table('tutorials').select(select_columns(fields)).eq('id', tutorial_id))
         
         return result.data[0] if result.data else None
         
     except Exception as e:
+        on_backend_error(e)
         logger.error(f"Error getting tutorial by ID: {str(e)}")
         return None
 
-def get_all_tutorials():
-    """Get all tutorials."""
+def get_tutorials_by_ids(tutorial_ids, fields=TUTORIAL_LIST_FIELDS):
+    """Get tutorials for several IDs in one query, keyed by tutorial ID.
+    
+    Reads only `fields` from Supabase (must include id); cached rows are returned whole.
+    """
+    if not tutorial_ids:
+        return {}
+    catalog = tutorial_catalog.get()
+    if catalog is not None:
+        tutorials_by_id = catalog['tutorials_by_id']
+        return {tutorial_id: tutorials_by_id[tutorial_id] for tutorial_id in tutorial_ids if tutorial_id in tutorials_by_id}
+    
     try:
         supabase = get_supabase_client()
         
-        result = supabase.table('tutorials').select('*').order('id').execute()
+        result = execute_query('tutorials.select_by_ids', supabase.table('tutorials').select(select_columns(fields)).in_('id', list(set(tutorial_ids))))
         
-        return result.data if result.data else []
+        return {tutorial['id']: tutorial for tutorial in (result.data or [])}
         
     except Exception as e:
-        logger.error(f"Error getting all tutorials: {str(e)}")
-        return []
+        on_backend_error(e)
+        logger.error(f"Error getting tutorials by IDs: {str(e)}")
+        return {}
+
+def get_tutorials_page(limit, after_key=None, fields=None):
+    """Get one page of tutorials ordered by id, plus the cursor key for the next page.
+    
+    `fields` must include id, which the cursor is built from.
+    """
+    catalog = tutorial_catalog.get()
+    if catalog is not None:
+        rows = _page_from_snapshot(catalog['tutorials'], catalog['tutorial_positions'], after_key, limit)
+        if rows is not None:
+            rows, next_key = _finish_page(rows, limit, _tutorial_sort_key)
+            return [project_row(row, fields) for row in rows] if fields else rows, next_key
+    
+    try:
+        supabase = get_supabase_client()
+        
+        query = supabase.table('tutorials').select(select_columns(fields)).order('id').limit(limit + 1)
+        if after_key is not None:
+            query = query.gt('id', after_key[0])
+        result = execute_query('tutorials.select_page', query)
+        
+        return _finish_page(result.data or [], limit, _tutorial_sort_key)
+        
+    except Exception as e:
+        on_backend_error(e)
+        logger.error(f"Error getting tutorials page: {str(e)}")
+        return [], None
 
 def update_tutorial_state(rider_id, tutorial_id, is_done, action='update'):
     """Update tutorial state for a rider."""
+    return update_tutorial_states(rider_id, {tutorial_id: is_done})
+
+def update_tutorial_states(rider_id, states):
+    """Update several tutorial states for a rider in one write.
+    
+    `states` maps tutorial_id to isDone. The merge into tutorial_state happens
+    server-side in set_tutorial_states (supabase_migrations.sql), creating the
+    progress row if needed, so a whole batch is one round trip and concurrent
+    writers cannot overwrite each other. With write-behind on, the states are queued instead.
+    """
+    if enqueue_progress_event(rider_id, states=states):
+        return True
+    
     try:
         supabase = get_supabase_client()
         
-        # Get current tutorial states
-        current_states = get_tutorial_states(rider_id)
+        result = execute_query('tutorial_state.merge', supabase.rpc('set_tutorial_states', {
+            'p_rider_id': rider_id,
+            'p_states': {
+                tutorial_id: {
+                    'id': tutorial_id,
+                    'isDone': is_done
+                }
+                for tutorial_id, is_done in states.items()
+            }
+        }))
         
-        # Update the specific tutorial state
-        current_states[tutorial_id] = {
-            'id': tutorial_id,
-            'isDone': is_done
-        }
+        return bool(result.data)
         
-        # Update the training progress record
-        result = supabase.table('training_progress').update({
-            'tutorial_state': current_states
-        }).eq('rider_id', rider_id).execute()
+    except Exception as e:
+        on_backend_error(e)
+        logger.error(f"Error updating tutorial states: {str(e)}")
+        return False
+
+def merge_training_progress(rider_id, columns, states):
+    """Apply coalesced progress events for one rider in a single write.
+    
+    `columns` maps training_progress columns to values and `states` maps
+    tutorial_id to isDone; both are merged server-side by merge_training_progress
+    (supabase_migrations.sql), which creates the row if needed.
+    """
+    try:
+        supabase = get_supabase_client()
         
-        # If no record exists, create one
-        if not result.data:
-            result = supabase.table('training_progress').insert({
-                'rider_id': rider_id,
-                'tutorial_state': current_states
-            }).execute()
+        result = execute_query('training_progress.merge', supabase.rpc('merge_training_progress', {
+            'p_rider_id': rider_id,
+            'p_columns': columns,
+            'p_states': {
+                tutorial_id: {
+                    'id': tutorial_id,
+                    'isDone': is_done
+                }
+                for tutorial_id, is_done in states.items()
+            }
+        }))
         
         return bool(result.data)
         
     except Exception as e:
-        logger.error(f"Error updating tutorial state: {str(e)}")
+        on_backend_error(e)
+        logger.error(f"Error merging training progress for rider_id {rider_id}: {str(e)}")
         return False
 
 def create_tutorial(tutorial_id, title, subtitle='', description=''):
@@ -275,16 +1621,18 @@ def create_tutorial(tutorial_id, title, subtitle='', description=''):
     try:
         supabase = get_supabase_client()
         
-        result = supabase.table('tutorials').insert({
+        result = execute_query('tutorials.insert', supabase.table('tutorials').insert({
             'id': tutorial_id,
             'title': title,
             'subtitle': subtitle,
             'description': description
-        }).execute()
+        }))
+        tutorial_catalog.invalidate()
         
         return bool(result.data)
         
     except Exception as e:
+        on_backend_error(e)
         logger.error(f"Error creating tutorial: {str(e)}")
         return False
 
@@ -303,36 +1651,286 @@ def create_day_hub_mappings(day, hub_type, tutorial_ids):
                 'order_index': i
             })
         
-        result = supabase.table('day_hub_tutorial_mappings').insert(mappings).execute()
+        result = execute_query('mappings.insert', supabase.table('day_hub_tutorial_mappings').insert(mappings))
+        tutorial_catalog.invalidate()
         
         return bool(result.data)
         
     except Exception as e:
+        on_backend_error(e)
         logger.error(f"Error creating day-hub mappings: {str(e)}")
         return False
 
-def get_all_day_hub_mappings():
-    """Get all day-hub-tutorial mappings."""
+def upsert_tutorials(rows):
+    """Upsert tutorial rows in chunks of IMPORT_CHUNK_SIZE.
+    
+    A chunk that fails is retried row by row so one bad row does not sink the
+    rest. Returns {tutorial_id: error} for the rows that could not be written.
+    """
+    failures = {}
+    for start in range(0, len(rows), IMPORT_CHUNK_SIZE):
+        chunk = rows[start:start + IMPORT_CHUNK_SIZE]
+        try:
+            supabase = get_supabase_client()
+            execute_query('tutorials.upsert_chunk', supabase.table('tutorials').upsert(chunk, on_conflict='id'))
+            continue
+        except Exception as e:
+            on_backend_error(e)
+            logger.error(f"Error upserting tutorials chunk at row {start}, retrying row by row: {str(e)}")
+        
+        for row in chunk:
+            try:
+                supabase = get_supabase_client()
+                execute_query('tutorials.upsert', supabase.table('tutorials').upsert(row, on_conflict='id'))
+            except Exception as e:
+                on_backend_error(e)
+                failures[row['id']] = str(e)
+    
+    if rows:
+        tutorial_catalog.invalidate()
+    return failures
+
+def get_existing_tutorial_ids(tutorial_ids):
+    """IDs among tutorial_ids that exist in Supabase, read in chunks of IMPORT_CHUNK_SIZE.
+    
+    Reads the table rather than the catalog cache, and raises on a backend error
+    instead of reporting the tutorials as missing.
+    """
+    tutorial_ids = sorted(set(tutorial_ids))
+    existing_ids = set()
+    for start in range(0, len(tutorial_ids), IMPORT_CHUNK_SIZE):
+        chunk = tutorial_ids[start:start + IMPORT_CHUNK_SIZE]
+        try:
+            supabase = get_supabase_client()
+            result = execute_query('tutorials.select_existing', supabase.table('tutorials').select('id').in_('id', chunk))
+        except Exception as e:
+            on_backend_error(e)
+            logger.error(f"Error checking which tutorials exist: {str(e)}")
+            raise
+        existing_ids.update(row['id'] for row in (result.data or []))
+    return existing_ids
+
+def replace_day_hub_mappings(day, hub_type, tutorial_ids):
+    """Replace the whole mapping set of a (day, hub_type) in one transaction.
+    
+    Runs replace_day_hub_mappings (supabase_migrations.sql), so readers see either
+    the old set or the new one. Returns None on success, or the error message.
+    """
+    try:
+        supabase = get_supabase_client()
+        
+        execute_query('mappings.replace', supabase.rpc('replace_day_hub_mappings', {
+            'p_day': day,
+            'p_hub_type': hub_type,
+            'p_tutorial_ids': tutorial_ids
+        }))
+        tutorial_catalog.invalidate()
+        
+        return None
+        
+    except Exception as e:
+        on_backend_error(e)
+        logger.error(f"Error replacing day-hub mappings for day {day} / {hub_type}: {str(e)}")
+        return str(e)
+
+def get_day_hub_mappings_page(limit, after_key=None):
+    """Get one page of mappings ordered by (day, hub_type, order_index), plus the cursor key for the next page."""
+    catalog = tutorial_catalog.get()
+    if catalog is not None:
+        rows = _page_from_snapshot(catalog['mappings'], catalog['mapping_positions'], after_key, limit)
+        if rows is not None:
+            return _finish_page(rows, limit, _mapping_sort_key)
+    
+    try:
+        supabase = get_supabase_client()
+        
+        query = supabase.table('day_hub_tutorial_mappings').select('*').order('day').order('hub_type').order('order_index').order('id').limit(limit + 1)
+        if after_key is not None:
+            query = query.or_(_mapping_keyset_filter(after_key))
+        result = execute_query('mappings.select_page', query)
+        
+        return _finish_page(result.data or [], limit, _mapping_sort_key)
+        
+    except Exception as e:
+        on_backend_error(e)
+        logger.error(f"Error getting day-hub mappings page: {str(e)}")
+        return [], None
+
+def _mapping_keyset_filter(after_key):
+    """PostgREST or-filter selecting mappings that sort after after_key."""
+    day, hub_type, order_index, mapping_id = after_key
+    hub_type = json.dumps(hub_type, ensure_ascii=False)
+    return (
+        f"day.gt.{day},"
+        f"and(day.eq.{day},hub_type.gt.{hub_type}),"
+        f"and(day.eq.{day},hub_type.eq.{hub_type},order_index.gt.{order_index}),"
+        f"and(day.eq.{day},hub_type.eq.{hub_type},order_index.eq.{order_index},id.gt.{mapping_id})"
+    )
+
+def _page_from_snapshot(rows, positions, after_key, limit):
+    """Up to limit + 1 cached rows after the cursor row; None if that row is no longer cached."""
+    if after_key is None:
+        start = 0
+    else:
+        index = positions.get(tuple(after_key))
+        if index is None:
+            return None
+        start = index + 1
+    return rows[start:start + limit + 1]
+
+def _finish_page(rows, limit, sort_key):
+    """Trim the look-ahead row and derive the next cursor key from the last row kept."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, list(sort_key(rows[-1]))
+
+def encode_cursor(key):
+    """Opaque pagination cursor for a sort key."""
+    if key is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(',', ':')).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, types):
+    """Sort key from a cursor made by encode_cursor; ValueError if it is malformed."""
+    if cursor is None:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(str(cursor) + '=' * (-len(str(cursor)) % 4)))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(key, list) or len(key) != len(types):
+        raise ValueError('Invalid cursor')
+    if not all(isinstance(value, expected) and not isinstance(value, bool) for value, expected in zip(key, types)):
+        raise ValueError('Invalid cursor')
+    return key
+
+def parse_page_limit(value):
+    """Page size from a request, clamped to CATALOG_PAGE_MAX_LIMIT; ValueError if invalid."""
+    if value is None:
+        return CATALOG_PAGE_DEFAULT_LIMIT
     try:
-        supabase = get_supabase_client()
-        
-        result = supabase.table('day_hub_tutorial_mappings').select('*').order('day').order('hub_type').order('order_index').execute()
-        
-        return result.data if result.data else []
-        
-    except Exception as e:
-        logger.error(f"Error getting all day-hub mappings: {str(e)}")
-        return []
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    return min(limit, CATALOG_PAGE_MAX_LIMIT)
 
 def lambda_handler(event, context):
     """Main Lambda handler function."""
+    if is_sqs_event(event):
+        return drain_sqs_event(event, context)
+    if should_profile(event):
+        return profile_invocation(handle_event, event, context)
+    return handle_event(event, context)
+
+def is_sqs_event(event):
+    """Whether the invocation comes from the progress queue's SQS trigger."""
+    records = event.get('Records') if isinstance(event, dict) else None
+    return bool(records) and records[0].get('eventSource') == 'aws:sqs'
+
+def is_valid_progress_event(event):
+    """Whether a dequeued message has the shape enqueue_progress_event sends."""
+    if not isinstance(event, dict) or event.get('rider_id') in (None, ''):
+        return False
+    return all(isinstance(event.get(key) or {}, dict) for key in ('columns', 'states'))
+
+def drain_sqs_event(event, context):
+    """Write a batch of queued progress events, coalesced per rider.
+    
+    Returns a partial batch response: messages of riders whose write failed are
+    retried, and since all of a rider's messages fail together, FIFO order holds.
+    """
+    events = []
+    for record in event['Records']:
+        try:
+            progress_event = json.loads(record['body'])
+        except ValueError:
+            progress_event = None
+        if not is_valid_progress_event(progress_event):
+            # Retrying cannot fix it, and a failed message would block its FIFO group
+            logger.error(f"Dropping malformed progress event {record['messageId']}")
+            continue
+        events.append((record['messageId'], progress_event))
+    
+    deadline_token = _deadline.set(deadline_from_context(context))
+    try:
+        failed = flush_progress_events(events)
+    except DeadlineExceeded as e:
+        logger.error(f"Deadline exceeded draining progress events: {str(e)}")
+        failed = [event_id for event_id, _ in events]
+    finally:
+        _deadline.reset(deadline_token)
+    
+    logger.info(f"Drained {len(events) - len(failed)} of {len(event['Records'])} progress events")
+    return {'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failed]}
+
+def get_request_header(event, name):
+    """Case-insensitive lookup of a request header in an API Gateway event."""
+    request_headers = event.get('headers') or {}
+    name = name.lower()
+    for key, value in request_headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+def should_profile(event):
+    """Decide whether to profile this invocation (sampling or a signed header)."""
+    if PROFILING_SAMPLE_RATE > 0 and random.random() < PROFILING_SAMPLE_RATE:
+        return True
+    return verify_signed_token(get_request_header(event, 'X-Profile-Token'), PROFILING_SECRET)
+
+def verify_signed_token(token, secret):
+    """Check a "<unix_ts>:<hex HMAC-SHA256 of unix_ts keyed by secret>" token; False when no secret is set."""
+    if not token or not secret:
+        return False
+    timestamp, _, signature = token.partition(':')
+    try:
+        if abs(time.time() - int(timestamp)) > SIGNED_TOKEN_MAX_AGE_SECONDS:
+            return False
+    except ValueError:
+        return False
+    expected = hmac.new(secret.encode(), timestamp.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+def profile_invocation(handler, event, context):
+    """Run the handler under cProfile and log the top functions by cumulative time.
+    
+    Only the invoking thread is profiled; time spent in submit_io workers shows up as
+    waits on their futures.
+    """
+    import cProfile
+    import io
+    import pstats
+    
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(handler, event, context)
+    finally:
+        try:
+            output = io.StringIO()
+            stats = pstats.Stats(profiler, stream=output)
+            stats.sort_stats('cumulative').print_stats(PROFILING_TOP_N)
+            logger.info(f"Profile for {event.get('path', '')}:\n{output.getvalue()}")
+            if PROFILING_DUMP_DIR:
+                request_id = getattr(context, 'aws_request_id', None) or str(int(time.time() * 1000))
+                dump_path = os.path.join(PROFILING_DUMP_DIR, f"profile-{request_id}.pstats")
+                stats.dump_stats(dump_path)
+                logger.info(f"Profile written to {dump_path}")
+        except Exception as e:
+            logger.error(f"Error writing profile: {str(e)}")
+
+def handle_event(event, context):
+    """Handle one API Gateway proxy event."""
     
     # Set CORS headers
     headers = {
         'Content-Type': 'application/json',
         'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-        'Access-Control-Allow-Methods': 'GET,POST,OPTIONS'
+        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,If-None-Match,Idempotency-Key,X-Profile-Token',
+        'Access-Control-Allow-Methods': 'GET,POST,OPTIONS',
+        'Access-Control-Expose-Headers': 'ETag,Idempotent-Replayed'
     }
     
     # Handle preflight OPTIONS request
@@ -343,54 +1941,311 @@ def lambda_handler(event, context):
             'body': json.dumps({'message': 'CORS preflight'})
         }
     
+    deadline_token = _deadline.set(deadline_from_context(context))
+    trace = RequestTrace(metric_route(event.get('path', ''))) if METRICS_ENABLED else None
+    trace_token = _request_trace.set(trace)
+    response = None
     try:
-        # Parse request body
-        if isinstance(event.get('body'), str):
-            body = json.loads(event['body'])
-        else:
-            body = event.get('body', {})
-        
-        # Get the path to determine which endpoint to call
-        path = event.get('path', '')
-        
-        if path == '/rider-info':
-            # Get query parameters for GET requests
-            query_params = event.get('queryStringParameters') or {}
-            return handle_rider_info(query_params, headers)
-        elif path == '/training-progress':
-            # Get query parameters for GET requests
-            query_params = event.get('queryStringParameters') or {}
-            return handle_training_progress(query_params, headers)
-        elif path == '/update-progress':
-            return handle_update_progress(body, headers)
-        elif path == '/module-started':
-            return handle_module_started(body, headers)
-        elif path == '/module-completed':
-            return handle_module_completed(body, headers)
-        elif path == '/get-tutorials':
-            # Get query parameters for GET requests
-            query_params = event.get('queryStringParameters') or {}
-            return handle_get_tutorials(query_params, headers)
-        elif path == '/tutorial-state':
-            return handle_tutorial_state(body, headers)
-        elif path == '/tutorials':
-            return handle_tutorials(body, headers)
-        elif path == '/day-hub-mappings':
-            return handle_day_hub_mappings(body, headers)
+        response = compress_response(event, route_request(event, headers))
+        return response
+        
+    except DeadlineExceeded as e:
+        response = deadline_exceeded_response(headers, e)
+        return response
+    except Exception as e:
+        logger.error(f"Lambda error: {str(e)}")
+        response = {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({'error': str(e)})
+        }
+        return response
+    finally:
+        _request_trace.reset(trace_token)
+        _deadline.reset(deadline_token)
+        if trace is not None:
+            emit_request_summary(trace, response['statusCode'] if response else 500)
+
+_brotli_module = None
+
+def get_brotli():
+    """The optional brotli module, or None when it is not installed."""
+    global _brotli_module
+    if _brotli_module is None:
+        try:
+            import brotli
+            _brotli_module = brotli
+        except ImportError:
+            _brotli_module = False
+    return _brotli_module or None
+
+def choose_content_encoding(accept_encoding):
+    """Pick br or gzip from an Accept-Encoding header, honoring q=0; None for identity."""
+    if not accept_encoding:
+        return None
+    
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    
+    def allowed(coding):
+        return accepted.get(coding, accepted.get('*', 0.0)) > 0
+    
+    if allowed('br') and get_brotli():
+        return 'br'
+    if allowed('gzip'):
+        return 'gzip'
+    return None
+
+def compress_response(event, response):
+    """Compress large response bodies for clients that accept it.
+    
+    API Gateway needs binary bodies base64-encoded with isBase64Encoded set.
+    Small bodies are left alone since compressing them costs more CPU than it
+    saves on the wire.
+    """
+    body = response.get('body')
+    if COMPRESSION_MIN_BYTES <= 0 or not body or response.get('isBase64Encoded'):
+        return response
+    
+    raw = body.encode('utf-8')
+    if len(raw) < COMPRESSION_MIN_BYTES:
+        return response
+    
+    response_headers = dict(response.get('headers') or {})
+    response_headers['Vary'] = 'Accept-Encoding'
+    encoding = choose_content_encoding(get_request_header(event, 'Accept-Encoding'))
+    if not encoding:
+        return dict(response, headers=response_headers)
+    
+    try:
+        if encoding == 'br':
+            compressed = get_brotli().compress(raw, quality=BROTLI_QUALITY)
         else:
+            compressed = gzip.compress(raw, compresslevel=GZIP_COMPRESS_LEVEL, mtime=0)
+    except Exception as e:
+        logger.error(f"Error compressing response: {str(e)}")
+        return dict(response, headers=response_headers)
+    
+    response_headers['Content-Encoding'] = encoding
+    return dict(
+        response,
+        headers=response_headers,
+        body=base64.b64encode(compressed).decode('ascii'),
+        isBase64Encoded=True
+    )
+
+def metric_route(path):
+    """The Route dimension for a request path: the path itself for known routes, else "other"."""
+    return path if path in METRIC_ROUTES else 'other'
+
+def emit_request_summary(trace, status_code):
+    """Write the invocation's EMF summary as a bare JSON line so CloudWatch extracts the metrics."""
+    try:
+        print(json.dumps(trace.summary(status_code)), flush=True)
+    except Exception as e:
+        logger.error(f"Error emitting request metrics: {str(e)}")
+
+def deadline_exceeded_response(headers, error):
+    """Clean 504 returned while budget remains, instead of Lambda timing out."""
+    logger.error(f"Deadline exceeded: {str(error)}")
+    return {
+        'statusCode': 504,
+        'headers': headers,
+        'body': json.dumps({
+            'message': 'Something went wrong!',
+            'data': None,
+            'error': 'Request timed out'
+        })
+    }
+
+def route_request(event, headers, allow_batch=True):
+    """Dispatch an API Gateway proxy event to its endpoint handler."""
+    # Get the path to determine which endpoint to call
+    path = event.get('path', '')
+    
+    # Parse request body; NDJSON bodies are passed through as text for /tutorials imports only
+    if isinstance(event.get('body'), str) and is_ndjson_request(event):
+        if path != '/tutorials':
             return {
-                'statusCode': 404,
+                'statusCode': 415,
                 'headers': headers,
-                'body': json.dumps({'error': 'Endpoint not found'})
+                'body': json.dumps({
+                    'message': 'Something went wrong!',
+                    'data': None,
+                    'error': 'NDJSON bodies are only accepted by /tutorials imports'
+                })
             }
-            
-    except Exception as e:
-        logger.error(f"Lambda error: {str(e)}")
+        body = {'action': 'import', 'ndjson': event['body']}
+    elif isinstance(event.get('body'), str):
+        body = json.loads(event['body'])
+    else:
+        body = event.get('body', {})
+    
+    if path == '/rider-info':
+        # Get query parameters for GET requests
+        query_params = event.get('queryStringParameters') or {}
+        return handle_rider_info(query_params, headers)
+    elif path == '/training-progress':
+        # Get query parameters for GET requests
+        query_params = event.get('queryStringParameters') or {}
+        return conditional_response(event, handle_training_progress(query_params, headers), RIDER_CACHE_CONTROL)
+    elif path == '/update-progress':
+        return idempotent_response(event, body, headers, lambda: handle_update_progress(body, headers))
+    elif path == '/module-started':
+        return idempotent_response(event, body, headers, lambda: handle_module_started(body, headers))
+    elif path == '/module-completed':
+        return idempotent_response(event, body, headers, lambda: handle_module_completed(body, headers))
+    elif path == '/get-tutorials':
+        # Get query parameters for GET requests
+        query_params = event.get('queryStringParameters') or {}
+        return conditional_response(event, handle_get_tutorials(query_params, headers), RIDER_CACHE_CONTROL)
+    elif path == '/tutorial-state':
+        return idempotent_response(event, body, headers, lambda: handle_tutorial_state(body, headers))
+    elif path == '/tutorials':
+        if event.get('httpMethod') == 'GET':
+            return conditional_response(event, handle_tutorials(catalog_read_params(event), headers), catalog_cache_control())
+        return handle_tutorials(body, headers)
+    elif path == '/day-hub-mappings':
+        if event.get('httpMethod') == 'GET':
+            return conditional_response(event, handle_day_hub_mappings(catalog_read_params(event), headers), catalog_cache_control())
+        return handle_day_hub_mappings(body, headers)
+    elif path == '/metrics' and verify_signed_token(get_request_header(event, 'X-Metrics-Token'), METRICS_SECRET):
+        return handle_metrics(headers)
+    elif path == '/batch' and allow_batch:
+        return handle_batch(body, headers)
+    else:
         return {
-            'statusCode': 500,
+            'statusCode': 404,
             'headers': headers,
-            'body': json.dumps({'error': str(e)})
+            'body': json.dumps({'error': 'Endpoint not found'})
+        }
+
+def idempotent_response(event, body, headers, handler):
+    """Run a write handler at most once per Idempotency-Key.
+    
+    A repeat of a completed request gets the stored response back without
+    touching the database. 5xx responses are not stored, so those can be retried.
+    When the store is full of in-flight keys the request is refused with a 503
+    rather than forgetting one of them. Requests without the header run as usual.
+    """
+    key = get_request_header(event, 'Idempotency-Key')
+    if not key or idempotency_store.max_size <= 0:
+        return handler()
+    
+    if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        return {
+            'statusCode': 400,
+            'headers': headers,
+            'body': json.dumps({'error': f'Idempotency-Key must be at most {IDEMPOTENCY_KEY_MAX_LENGTH} characters'})
+        }
+    
+    path = event.get('path', '')
+    store_key = f"{path}:{key}"
+    fingerprint = hashlib.blake2b(json.dumps([path, body], sort_keys=True, default=str).encode('utf-8'), digest_size=16).hexdigest()
+    state, stored = idempotency_store.begin(store_key, fingerprint)
+    
+    if state == 'replay':
+        status_code, stored_body = stored
+        return {
+            'statusCode': status_code,
+            'headers': dict(headers, **{'Idempotent-Replayed': 'true'}),
+            'body': stored_body
+        }
+    if state == 'in_progress':
+        return {
+            'statusCode': 409,
+            'headers': headers,
+            'body': json.dumps({'error': 'A request with this Idempotency-Key is still in progress'})
+        }
+    if state == 'mismatch':
+        return {
+            'statusCode': 422,
+            'headers': headers,
+            'body': json.dumps({'error': 'Idempotency-Key was already used for a different request'})
+        }
+    if state == 'full':
+        return {
+            'statusCode': 503,
+            'headers': dict(headers, **{'Retry-After': '1'}),
+            'body': json.dumps({'error': 'Too many requests with an Idempotency-Key are in progress; retry shortly'})
+        }
+    
+    response = None
+    try:
+        response = handler()
+        return response
+    finally:
+        if response is not None and response.get('statusCode', 500) < 500:
+            idempotency_store.complete(store_key, fingerprint, response['statusCode'], response.get('body'))
+        else:
+            idempotency_store.release(store_key)
+
+def is_ndjson_request(event):
+    """Whether the request body is newline-delimited JSON."""
+    content_type = (get_request_header(event, 'Content-Type') or '').split(';')[0].strip().lower()
+    return content_type in ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+def catalog_read_params(event):
+    """Parameters of a GET on /tutorials or /day-hub-mappings: the query string, always as the `get` action.
+    
+    Only these GETs are tagged with ETag/Cache-Control, since caches key on the URL;
+    POST reads with the same parameters in the body are never conditional.
+    """
+    return dict(event.get('queryStringParameters') or {}, action='get')
+
+def catalog_cache_control():
+    """Cache-Control for catalog reads; catalog edits reach other containers within the cache TTL anyway."""
+    return f"public, max-age={CATALOG_CACHE_CONTROL_MAX_AGE_SECONDS}"
+
+def compute_etag(body):
+    """Weak ETag over the serialized response body.
+    
+    Weak because the representation is the same whether or not the body is
+    compressed on the way out.
+    """
+    return f'W/"{hashlib.blake2b(body.encode("utf-8"), digest_size=16).hexdigest()}"'
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header value against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque_tag = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque_tag:
+            return True
+    return False
+
+def conditional_response(event, response, cache_control):
+    """Tag a successful GET with ETag/Cache-Control and turn a matching If-None-Match into a 304."""
+    if event.get('httpMethod') != 'GET' or response.get('statusCode') != 200 or not response.get('body'):
+        return response
+    
+    etag = compute_etag(response['body'])
+    response_headers = dict(response.get('headers') or {})
+    response_headers['ETag'] = etag
+    response_headers['Cache-Control'] = cache_control
+    
+    if etag_matches(get_request_header(event, 'If-None-Match'), etag):
+        return {
+            'statusCode': 304,
+            'headers': response_headers,
+            'body': ''
         }
+    return dict(response, headers=response_headers)
 
 def handle_rider_info(query_params, headers):
     """Handle rider info endpoint - GET request with query parameters."""
@@ -419,6 +2274,8 @@ def handle_rider_info(query_params, headers):
                 'body': json.dumps({'error': 'Rider not found'})
             }
             
+    except DeadlineExceeded as e:
+        return deadline_exceeded_response(headers, e)
     except Exception as e:
         logger.error(f"Error in handle_rider_info: {str(e)}")
         return {
@@ -439,7 +2296,16 @@ def handle_training_progress(query_params, headers):
                 'body': json.dumps({'error': 'Rider ID is required'})
             }
         
-        training_progress = get_training_progress(rider_id)
+        try:
+            fields = parse_fields(query_params.get('fields'), TRAINING_PROGRESS_FIELDS)
+        except ValueError as e:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': str(e)})
+            }
+        
+        training_progress = get_training_progress(rider_id, fields)
         
         if training_progress:
             return {
@@ -454,6 +2320,8 @@ def handle_training_progress(query_params, headers):
                 'body': json.dumps({'error': 'Training progress not found'})
             }
             
+    except DeadlineExceeded as e:
+        return deadline_exceeded_response(headers, e)
     except Exception as e:
         logger.error(f"Error in handle_training_progress: {str(e)}")
         return {
@@ -491,6 +2359,8 @@ def handle_update_progress(body, headers):
                 'body': json.dumps({'error': 'Failed to update progress'})
             }
             
+    except DeadlineExceeded as e:
+        return deadline_exceeded_response(headers, e)
     except Exception as e:
         logger.error(f"Error in handle_update_progress: {str(e)}")
         return {
@@ -529,6 +2399,8 @@ def handle_module_started(body, headers):
                 'body': json.dumps({'error': 'Failed to mark module as started'})
             }
             
+    except DeadlineExceeded as e:
+        return deadline_exceeded_response(headers, e)
     except Exception as e:
         logger.error(f"Error in handle_module_started: {str(e)}")
         return {
@@ -567,6 +2439,8 @@ def handle_module_completed(body, headers):
                 'body': json.dumps({'error': 'Failed to mark module as completed'})
             }
             
+    except DeadlineExceeded as e:
+        return deadline_exceeded_response(headers, e)
     except Exception as e:
         logger.error(f"Error in handle_module_completed: {str(e)}")
         return {
@@ -591,9 +2465,18 @@ def handle_get_tutorials(query_params, headers):
                 })
             }
         
+        # Tutorial states depend only on rider_id and the catalog on nothing. When the
+        # rider is already known there is no replica query to overlap, so states are
+        # read only once the rider checks out; otherwise the read starts now and is
+        # cancelled on the early returns below if it has not started yet
+        tutorial_states_future = None if is_rider_info_known(rider_id) else submit_io(get_tutorial_states, rider_id)
+        if not budget_is_low():
+            submit_io(tutorial_catalog.get)
+        
         # Step 1: Get rider info to determine day and hub type
         rider_info = get_rider_info(rider_id)
         if not rider_info:
+            cancel_io(tutorial_states_future)
             return {
                 'statusCode': 404,
                 'headers': headers,
@@ -608,6 +2491,7 @@ def handle_get_tutorials(query_params, headers):
         node_type = rider_info.get('node_type')
         
         if not rider_age:
+            cancel_io(tutorial_states_future)
             return {
                 'statusCode': 400,
                 'headers': headers,
@@ -628,40 +2512,20 @@ def handle_get_tutorials(query_params, headers):
         else:
             hub_type = 'lm_hub'  # Default fallback
         
-        # Step 3: Get tutorial mappings for the day and hub type
-        tutorial_mappings = get_tutorial_mappings(rider_age, hub_type)
-        if not tutorial_mappings:
-            return {
-                'statusCode': 200,
-                'headers': headers,
-                'body': json.dumps({
-                    'message': 'Success',
-                    'data': {
-                        'rider_age': rider_age,
-                        'tutorials': []
-                    }
-                })
-            }
+        if tutorial_states_future is None:
+            tutorial_states_future = submit_io(get_tutorial_states, rider_id)
+        
+        # Step 3: Get the precomputed tutorial list for the day and hub type
+        template = get_tutorial_template(rider_age, hub_type)
         
         # Step 4: Get tutorial states for the rider
-        tutorial_states = get_tutorial_states(rider_id)
+        try:
+            tutorial_states = tutorial_states_future.result(timeout=remaining_budget_seconds())
+        except FutureTimeoutError:
+            raise DeadlineExceeded("Timed out waiting for tutorial states")
         
-        # Step 5: Build response with tutorial details and states
-        tutorials = []
-        for mapping in tutorial_mappings:
-            tutorial_id = mapping['tutorial_id']
-            tutorial_info = get_tutorial_by_id(tutorial_id)
-            
-            if tutorial_info:
-                # Check if tutorial is completed
-                is_done = tutorial_states.get(tutorial_id, {}).get('isDone', False)
-                
-                tutorials.append({
-                    'id': tutorial_id,
-                    'title': tutorial_info['title'],
-                    'subtitle': tutorial_info.get('subtitle', ''),
-                    'isDone': is_done
-                })
+        # Step 5: Add the rider's completion flags to the template
+        tutorials = apply_tutorial_states(template, tutorial_states)
         
         return {
             'statusCode': 200,
@@ -675,6 +2539,8 @@ def handle_get_tutorials(query_params, headers):
             })
         }
         
+    except DeadlineExceeded as e:
+        return deadline_exceeded_response(headers, e)
     except Exception as e:
         logger.error(f"Error in handle_get_tutorials: {str(e)}")
         return {
@@ -688,14 +2554,22 @@ def handle_get_tutorials(query_params, headers):
         }
 
 def handle_tutorial_state(body, headers):
-    """Handle tutorial state management (create/update)."""
+    """Handle tutorial state management (create/update).
+    
+    Accepts either a single `tutorial_id`/`isDone` pair or a `tutorials` list of
+    `{tutorial_id, isDone}` items, which is applied in one merged write.
+    """
     try:
         rider_id = body.get('rider_id')
+        
+        if 'tutorials' in body:
+            return handle_tutorial_state_bulk(rider_id, body.get('tutorials'), headers)
+        
         tutorial_id = body.get('tutorial_id')
         is_done = body.get('isDone')
         action = body.get('action', 'update')  # 'create' or 'update'
         
-        if not rider_id or not tutorial_id or is_done is None:
+        if not rider_id or not is_valid_tutorial_state(tutorial_id, is_done):
             return {
                 'statusCode': 400,
                 'headers': headers,
@@ -728,6 +2602,8 @@ def handle_tutorial_state(body, headers):
                 })
             }
             
+    except DeadlineExceeded as e:
+        return deadline_exceeded_response(headers, e)
     except Exception as e:
         logger.error(f"Error in handle_tutorial_state: {str(e)}")
         return {
@@ -740,6 +2616,71 @@ def handle_tutorial_state(body, headers):
             })
         }
 
+def is_valid_tutorial_state(tutorial_id, is_done):
+    """A tutorial state needs a non-empty string tutorial_id and a boolean isDone, in single and bulk mode alike."""
+    return isinstance(tutorial_id, str) and bool(tutorial_id) and isinstance(is_done, bool)
+
+def handle_tutorial_state_bulk(rider_id, items, headers):
+    """Apply a list of tutorial states in a single write and report per-item results."""
+    if not rider_id or not isinstance(items, list) or not items:
+        return {
+            'statusCode': 400,
+            'headers': headers,
+            'body': json.dumps({
+                'message': 'Something went wrong!',
+                'data': None,
+                'error': 'Rider ID and a non-empty tutorials list are required'
+            })
+        }
+    
+    # Validate every item; later items for the same tutorial win, as they would sequentially
+    results = []
+    states = {}
+    for item in items:
+        tutorial_id = item.get('tutorial_id') if isinstance(item, dict) else None
+        is_done = item.get('isDone') if isinstance(item, dict) else None
+        if not is_valid_tutorial_state(tutorial_id, is_done):
+            results.append({
+                'tutorial_id': tutorial_id,
+                'updated': False,
+                'error': 'tutorial_id and boolean isDone are required'
+            })
+            continue
+        states[tutorial_id] = is_done
+        results.append({'tutorial_id': tutorial_id, 'updated': True})
+    
+    success = update_tutorial_states(rider_id, states) if states else False
+    if states and not success:
+        for result in results:
+            if result['updated']:
+                result['updated'] = False
+                result['error'] = 'Failed to update tutorial state'
+    
+    updated_count = sum(1 for result in results if result['updated'])
+    if not updated_count:
+        return {
+            'statusCode': 500 if states else 400,
+            'headers': headers,
+            'body': json.dumps({
+                'message': 'Something went wrong!',
+                'data': {'updated': False, 'results': results},
+                'error': 'Failed to update tutorial state' if states else 'No valid tutorial states provided'
+            })
+        }
+    
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': json.dumps({
+            'message': 'Success',
+            'data': {
+                'updated': updated_count == len(results),
+                'updated_count': updated_count,
+                'results': results
+            }
+        })
+    }
+
 def handle_tutorials(body, headers):
     """Handle tutorial management (create/update/get)."""
     try:
@@ -785,9 +2726,22 @@ def handle_tutorials(body, headers):
                 }
         
         elif action == 'get':
+            try:
+                fields = parse_fields(body.get('fields'), TUTORIAL_FIELDS, required=('id',))
+            except ValueError as e:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': json.dumps({
+                        'message': 'Something went wrong!',
+                        'data': None,
+                        'error': str(e)
+                    })
+                }
+            
             tutorial_id = body.get('tutorial_id')
             if tutorial_id:
-                tutorial = get_tutorial_by_id(tutorial_id)
+                tutorial = get_tutorial_by_id(tutorial_id, fields)
                 if tutorial:
                     return {
                         'statusCode': 200,
@@ -808,17 +2762,34 @@ def handle_tutorials(body, headers):
                         })
                     }
             else:
-                # Get all tutorials
-                tutorials = get_all_tutorials()
+                # List tutorials one page at a time
+                try:
+                    limit = parse_page_limit(body.get('limit'))
+                    after_key = decode_cursor(body.get('cursor'), (str,))
+                except ValueError as e:
+                    return {
+                        'statusCode': 400,
+                        'headers': headers,
+                        'body': json.dumps({
+                            'message': 'Something went wrong!',
+                            'data': None,
+                            'error': str(e)
+                        })
+                    }
+                
+                tutorials, next_key = get_tutorials_page(limit, after_key, fields)
                 return {
                     'statusCode': 200,
                     'headers': headers,
                     'body': json.dumps({
                         'message': 'Success',
-                        'data': {'tutorials': tutorials}
+                        'data': {'tutorials': tutorials, 'next_cursor': encode_cursor(next_key)}
                     })
                 }
         
+        elif action == 'import':
+            return handle_catalog_import(body, headers)
+        
         else:
             return {
                 'statusCode': 400,
@@ -826,10 +2797,12 @@ def handle_tutorials(body, headers):
                 'body': json.dumps({
                     'message': 'Something went wrong!',
                     'data': None,
-                    'error': 'Invalid action. Use create, update, or get'
+                    'error': 'Invalid action. Use create, update, get, or import'
                 })
             }
             
+    except DeadlineExceeded as e:
+        return deadline_exceeded_response(headers, e)
     except Exception as e:
         logger.error(f"Error in handle_tutorials: {str(e)}")
         return {
@@ -842,6 +2815,176 @@ def handle_tutorials(body, headers):
             })
         }
 
+def parse_import_records(body):
+    """Flatten an import body into (ref, record) pairs, in order.
+    
+    Accepts `tutorials` and `mappings` lists, a `records` list of typed records,
+    or `ndjson` text with one typed record per line. A line that is not a JSON
+    object comes back as (ref, None).
+    """
+    records = []
+    for index, tutorial in enumerate(body.get('tutorials') or []):
+        records.append((f"tutorials[{index}]", dict(tutorial, type='tutorial') if isinstance(tutorial, dict) else None))
+    for index, mapping in enumerate(body.get('mappings') or []):
+        records.append((f"mappings[{index}]", dict(mapping, type='mapping') if isinstance(mapping, dict) else None))
+    for index, record in enumerate(body.get('records') or []):
+        records.append((f"records[{index}]", record if isinstance(record, dict) else None))
+    
+    ndjson = body.get('ndjson')
+    if isinstance(ndjson, str):
+        for line_number, line in enumerate(ndjson.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            records.append((f"line {line_number}", record if isinstance(record, dict) else None))
+    return records
+
+def validate_import_tutorial(record):
+    """Tutorial row to upsert from an import record, or an error message."""
+    row = {}
+    for field in ('id', 'title'):
+        value = record.get(field)
+        if not isinstance(value, str) or not value.strip():
+            return None, f"{field} is required"
+        row[field] = value
+    for field in ('subtitle', 'description'):
+        value = record.get(field, '')
+        if value is not None and not isinstance(value, str):
+            return None, f"{field} must be a string"
+        row[field] = value or ''
+    row['updated_at'] = datetime.now().isoformat()
+    return row, None
+
+def validate_import_mapping(record):
+    """(day, hub_type, tutorial_ids) from an import record, or an error message."""
+    day = record.get('day')
+    if isinstance(day, str) and day.isdigit():
+        day = int(day)
+    if not isinstance(day, int) or isinstance(day, bool) or day < 1:
+        return None, "day must be a positive integer"
+    hub_type = record.get('hub_type')
+    if not isinstance(hub_type, str) or not hub_type:
+        return None, "hub_type is required"
+    tutorial_ids = record.get('tutorial_ids')
+    if not isinstance(tutorial_ids, list) or not tutorial_ids or not all(isinstance(tutorial_id, str) and tutorial_id for tutorial_id in tutorial_ids):
+        return None, "tutorial_ids must be a non-empty list of tutorial IDs"
+    if len(set(tutorial_ids)) != len(tutorial_ids):
+        return None, "tutorial_ids contains duplicates"
+    return (day, hub_type, tutorial_ids), None
+
+def handle_catalog_import(body, headers):
+    """Handle bulk import of tutorials and day-hub mapping sets.
+    
+    Tutorials are validated and upserted in chunks; each mapping record replaces
+    its (day, hub_type) set atomically once its tutorials exist. Rows that fail
+    are reported individually and do not stop the rest. If the existence check
+    itself fails, no mapping set is replaced and the response is a 502. Re-running
+    an import is safe, since both writes are idempotent.
+    """
+    records = parse_import_records(body)
+    if not records:
+        return {
+            'statusCode': 400,
+            'headers': headers,
+            'body': json.dumps({
+                'message': 'Something went wrong!',
+                'data': None,
+                'error': 'Provide tutorials, mappings, records or ndjson to import'
+            })
+        }
+    if len(records) > IMPORT_MAX_ROWS:
+        return {
+            'statusCode': 400,
+            'headers': headers,
+            'body': json.dumps({
+                'message': 'Something went wrong!',
+                'data': None,
+                'error': f'At most {IMPORT_MAX_ROWS} rows are allowed per import'
+            })
+        }
+    
+    errors = []
+    tutorial_rows = []
+    tutorial_refs = {}
+    mapping_sets = []
+    seen_sets = set()
+    for ref, record in records:
+        if record is None:
+            errors.append({'row': ref, 'error': 'Row is not a JSON object'})
+            continue
+        record_type = record.get('type')
+        if record_type == 'tutorial':
+            row, error = validate_import_tutorial(record)
+            if not error and row['id'] in tutorial_refs:
+                error = f"Duplicate tutorial id (first seen at {tutorial_refs[row['id']]})"
+            if error:
+                errors.append({'row': ref, 'id': record.get('id'), 'error': error})
+                continue
+            tutorial_refs[row['id']] = ref
+            tutorial_rows.append(row)
+        elif record_type == 'mapping':
+            mapping_set, error = validate_import_mapping(record)
+            if not error and mapping_set[:2] in seen_sets:
+                error = "Duplicate mapping set for this day and hub_type"
+            if error:
+                errors.append({'row': ref, 'day': record.get('day'), 'hub_type': record.get('hub_type'), 'error': error})
+                continue
+            seen_sets.add(mapping_set[:2])
+            mapping_sets.append((ref, mapping_set))
+        else:
+            errors.append({'row': ref, 'error': 'type must be tutorial or mapping'})
+    
+    failed_tutorials = upsert_tutorials(tutorial_rows)
+    for tutorial_id, error in failed_tutorials.items():
+        errors.append({'row': tutorial_refs[tutorial_id], 'id': tutorial_id, 'error': error})
+    
+    # Mapping sets may only point at tutorials that now exist
+    imported_ids = {row['id'] for row in tutorial_rows if row['id'] not in failed_tutorials}
+    referenced_ids = {tutorial_id for _, (_, _, tutorial_ids) in mapping_sets for tutorial_id in tutorial_ids}
+    try:
+        existing_ids = imported_ids | get_existing_tutorial_ids(referenced_ids - imported_ids)
+    except DeadlineExceeded:
+        raise
+    except Exception:
+        return {
+            'statusCode': 502,
+            'headers': headers,
+            'body': json.dumps({
+                'message': 'Something went wrong!',
+                'data': {
+                    'tutorials_upserted': len(tutorial_rows) - len(failed_tutorials),
+                    'mapping_sets_replaced': 0,
+                    'errors': errors
+                },
+                'error': 'Could not check which tutorials exist; mapping sets were not replaced'
+            })
+        }
+    
+    replaced_sets = 0
+    for ref, (day, hub_type, tutorial_ids) in mapping_sets:
+        missing = [tutorial_id for tutorial_id in tutorial_ids if tutorial_id not in existing_ids]
+        error = f"Unknown tutorial ids: {', '.join(missing)}" if missing else replace_day_hub_mappings(day, hub_type, tutorial_ids)
+        if error:
+            errors.append({'row': ref, 'day': day, 'hub_type': hub_type, 'error': error})
+        else:
+            replaced_sets += 1
+    
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': json.dumps({
+            'message': 'Imported with errors' if errors else 'Success',
+            'data': {
+                'tutorials_upserted': len(tutorial_rows) - len(failed_tutorials),
+                'mapping_sets_replaced': replaced_sets,
+                'errors': errors
+            }
+        })
+    }
+
 def handle_day_hub_mappings(body, headers):
     """Handle day-hub-tutorial mappings management."""
     try:
@@ -900,14 +3043,28 @@ def handle_day_hub_mappings(body, headers):
                     })
                 }
             else:
-                # Get all mappings
-                all_mappings = get_all_day_hub_mappings()
+                # List mappings one page at a time
+                try:
+                    limit = parse_page_limit(body.get('limit'))
+                    after_key = decode_cursor(body.get('cursor'), (int, str, int, int))
+                except ValueError as e:
+                    return {
+                        'statusCode': 400,
+                        'headers': headers,
+                        'body': json.dumps({
+                            'message': 'Something went wrong!',
+                            'data': None,
+                            'error': str(e)
+                        })
+                    }
+                
+                mappings, next_key = get_day_hub_mappings_page(limit, after_key)
                 return {
                     'statusCode': 200,
                     'headers': headers,
                     'body': json.dumps({
                         'message': 'Success',
-                        'data': {'mappings': all_mappings}
+                        'data': {'mappings': mappings, 'next_cursor': encode_cursor(next_key)}
                     })
                 }
         
@@ -922,6 +3079,8 @@ def handle_day_hub_mappings(body, headers):
                 })
             }
             
+    except DeadlineExceeded as e:
+        return deadline_exceeded_response(headers, e)
     except Exception as e:
         logger.error(f"Error in handle_day_hub_mappings: {str(e)}")
         return {
@@ -934,6 +3093,132 @@ def handle_day_hub_mappings(body, headers):
             })
         }
 
+def handle_batch(body, headers):
+    """Handle batch endpoint - run several API operations in one invocation.
+    
+    Each item in `requests` is {path, query, body}. Items run in order through the
+    regular handlers, share lookups such as rider info, and their responses come
+    back in the same order with parsed bodies.
+    """
+    sub_requests = body.get('requests') if isinstance(body, dict) else None
+    
+    if not isinstance(sub_requests, list) or not sub_requests:
+        return {
+            'statusCode': 400,
+            'headers': headers,
+            'body': json.dumps({'error': 'A non-empty requests list is required'})
+        }
+    
+    if len(sub_requests) > BATCH_MAX_REQUESTS:
+        return {
+            'statusCode': 400,
+            'headers': headers,
+            'body': json.dumps({'error': f'At most {BATCH_MAX_REQUESTS} requests are allowed per batch'})
+        }
+    
+    responses = []
+    token = _batch_memo.set({})
+    try:
+        for sub_request in sub_requests:
+            if not isinstance(sub_request, dict) or not sub_request.get('path'):
+                responses.append({
+                    'path': None,
+                    'statusCode': 400,
+                    'body': {'error': 'Each request requires a path'}
+                })
+                continue
+            
+            path = sub_request['path']
+            if deadline_passed():
+                responses.append({
+                    'path': path,
+                    'statusCode': 504,
+                    'body': {'error': 'Request timed out'}
+                })
+                continue
+            
+            sub_body = sub_request.get('body')
+            if isinstance(sub_body, str):
+                try:
+                    sub_body = json.loads(sub_body)
+                except ValueError:
+                    responses.append({
+                        'path': path,
+                        'statusCode': 400,
+                        'body': {'error': 'body is not valid JSON'}
+                    })
+                    continue
+            
+            event = {
+                'path': path,
+                'httpMethod': 'POST' if sub_body is not None else 'GET',
+                'queryStringParameters': sub_request.get('query'),
+                'body': sub_body if sub_body is not None else {}
+            }
+            
+            try:
+                response = route_request(event, headers, allow_batch=False)
+            except Exception as e:
+                logger.error(f"Error in batch request {path}: {str(e)}")
+                response = {'statusCode': 500, 'body': json.dumps({'error': str(e)})}
+            
+            responses.append({
+                'path': path,
+                'statusCode': response['statusCode'],
+                'body': json.loads(response['body']) if response.get('body') else None
+            })
+    finally:
+        _batch_memo.reset(token)
+    
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': json.dumps({'responses': responses})
+    }
+
+def handle_metrics(headers):
+    """Handle metrics endpoint - warm-container counters for tuning."""
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': json.dumps({
+            'connections': connection_manager.get_stats(),
+            'tutorial_catalog': tutorial_catalog.get_stats(),
+            'rider_info_cache': rider_info_cache.get_stats(),
+            'idempotency': idempotency_store.get_stats(),
+            'progress_queue': get_progress_queue_stats(),
+            'replica_breaker': replica_breaker.get_stats()
+        })
+    }
+
+def warm_up():
+    """Open backend connections and preload the tutorial catalog before the first request."""
+    started = time.monotonic()
+    
+    def warm_database():
+        conn, _ = get_database_connection()
+        if conn:
+            release_database_connection(conn)
+    
+    database_future = submit_io(warm_database)
+    try:
+        get_supabase_client()
+        tutorial_catalog.get()
+    except Exception as e:
+        logger.error(f"Error warming up Supabase: {str(e)}")
+    database_future.result()
+    
+    logger.info(f"Warm-up finished in {(time.monotonic() - started) * 1000:.0f}ms")
+
+# Init-phase code runs with Lambda's boosted CPU, before the first invocation
+if WARM_UP_ON_INIT:
+    warm_up()
+
 
 if __name__ == '__main__':
-    lambda_handler({rider_}, None)
\ No newline at end of file
+    sample_event = {
+        'httpMethod': 'GET',
+        'path': '/rider-info',
+        'queryStringParameters': {'rider_id': '12345'}
+    }
+    print(json.dumps(lambda_handler(sample_event, None), indent=2))
\ No newline at end of file
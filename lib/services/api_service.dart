@@ -7,6 +7,30 @@ import '../models/tutorial.dart';
 
 class ApiService {
   static const String baseUrl = 'https://tlffrtmssa.execute-api.us-east-2.amazonaws.com'; // Replace with your Lambda endpoint
+
+  // Last ETag and body per URL, so unchanged reads come back as a bodyless 304
+  static final Map<String, String> _etags = {};
+  static final Map<String, String> _cachedBodies = {};
+
+  // GET with If-None-Match; a 304 is turned back into a 200 carrying the cached body
+  static Future<http.Response> _conditionalGet(Uri uri) async {
+    final key = uri.toString();
+    final headers = {'Content-Type': 'application/json'};
+    final etag = _etags[key];
+    if (etag != null && _cachedBodies.containsKey(key)) {
+      headers['If-None-Match'] = etag;
+    }
+
+    final response = await http.get(uri, headers: headers);
+    if (response.statusCode == 304 && _cachedBodies.containsKey(key)) {
+      return http.Response(_cachedBodies[key]!, 200, headers: response.headers);
+    }
+    if (response.statusCode == 200 && response.headers['etag'] != null) {
+      _etags[key] = response.headers['etag']!;
+      _cachedBodies[key] = response.body;
+    }
+    return response;
+  }
   
   // Get rider information from replica database
   static Future<Rider?> getRiderInfo(String riderId) async {
@@ -67,9 +91,8 @@ class ApiService {
   // Get training progress from Supabase
   static Future<TrainingProgress?> getTrainingProgress(String riderId) async {
     try {
-      final response = await http.get(
+      final response = await _conditionalGet(
         Uri.parse('$baseUrl/training-progress?rider_id=$riderId'),
-        headers: {'Content-Type': 'application/json'},
       );
 
       if (response.statusCode == 200) {
@@ -106,9 +129,8 @@ class ApiService {
   // Get tutorials for a rider based on their day and hub type
   static Future<GetTutorialsResponse?> getTutorials(String riderId) async {
     try {
-      final response = await http.get(
+      final response = await _conditionalGet(
         Uri.parse('$baseUrl/get-tutorials?rider_id=$riderId'),
-        headers: {'Content-Type': 'application/json'},
       );
 
       if (response.statusCode == 200) {
@@ -143,6 +165,27 @@ class ApiService {
     }
   }
 
+  // Update several tutorial states in one request (e.g. when syncing after reconnecting)
+  static Future<bool> updateTutorialStates(String riderId, Map<String, bool> states) async {
+    try {
+      final response = await http.post(
+        Uri.parse('$baseUrl/tutorial-state'),
+        headers: {'Content-Type': 'application/json'},
+        body: json.encode({
+          'rider_id': riderId,
+          'tutorials': states.entries
+              .map((entry) => {'tutorial_id': entry.key, 'isDone': entry.value})
+              .toList(),
+        }),
+      );
+
+      return response.statusCode == 200;
+    } catch (e) {
+      debugPrint('Error updating tutorial states: $e');
+      return false;
+    }
+  }
+
   // Create a new tutorial
   static Future<bool> createTutorial(String id, String title, {String subtitle = '', String description = ''}) async {
     try {
@@ -165,26 +208,33 @@ class ApiService {
     }
   }
 
-  // Get all tutorials
+  // Get all tutorials, following the listing's pagination cursor
   static Future<List<Tutorial>?> getAllTutorials() async {
     try {
-      final response = await http.post(
-        Uri.parse('$baseUrl/tutorials'),
-        headers: {'Content-Type': 'application/json'},
-        body: json.encode({
-          'action': 'get',
-        }),
-      );
+      final tutorials = <Tutorial>[];
+      String? cursor;
+      do {
+        final response = await http.post(
+          Uri.parse('$baseUrl/tutorials'),
+          headers: {'Content-Type': 'application/json'},
+          body: json.encode({
+            'action': 'get',
+            if (cursor != null) 'cursor': cursor,
+          }),
+        );
 
-      if (response.statusCode == 200) {
+        if (response.statusCode != 200) {
+          return null;
+        }
         final data = json.decode(response.body);
-        if (data['data'] != null && data['data']['tutorials'] != null) {
-          return (data['data']['tutorials'] as List<dynamic>)
-              .map((tutorial) => Tutorial.fromJson(tutorial))
-              .toList();
+        if (data['data'] == null || data['data']['tutorials'] == null) {
+          return null;
         }
-      }
-      return null;
+        tutorials.addAll((data['data']['tutorials'] as List<dynamic>)
+            .map((tutorial) => Tutorial.fromJson(tutorial)));
+        cursor = data['data']['next_cursor'];
+      } while (cursor != null);
+      return tutorials;
     } catch (e) {
       debugPrint('Error fetching all tutorials: $e');
       return null;
@@ -212,26 +262,34 @@ class ApiService {
     }
   }
 
-  // Get day-hub-tutorial mappings
+  // Get day-hub-tutorial mappings; without day and hub type, pages through all of them
   static Future<List<Map<String, dynamic>>?> getDayHubMappings({int? day, String? hubType}) async {
     try {
-      final response = await http.post(
-        Uri.parse('$baseUrl/day-hub-mappings'),
-        headers: {'Content-Type': 'application/json'},
-        body: json.encode({
-          'action': 'get',
-          'day': day,
-          'hub_type': hubType,
-        }),
-      );
+      final mappings = <Map<String, dynamic>>[];
+      String? cursor;
+      do {
+        final response = await http.post(
+          Uri.parse('$baseUrl/day-hub-mappings'),
+          headers: {'Content-Type': 'application/json'},
+          body: json.encode({
+            'action': 'get',
+            'day': day,
+            'hub_type': hubType,
+            if (cursor != null) 'cursor': cursor,
+          }),
+        );
 
-      if (response.statusCode == 200) {
+        if (response.statusCode != 200) {
+          return null;
+        }
         final data = json.decode(response.body);
-        if (data['data'] != null && data['data']['mappings'] != null) {
-          return List<Map<String, dynamic>>.from(data['data']['mappings']);
+        if (data['data'] == null || data['data']['mappings'] == null) {
+          return null;
         }
-      }
-      return null;
+        mappings.addAll(List<Map<String, dynamic>>.from(data['data']['mappings']));
+        cursor = data['data']['next_cursor'];
+      } while (cursor != null);
+      return mappings;
     } catch (e) {
       debugPrint('Error fetching day-hub mappings: $e');
       return null;
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Load generator for local_server.py
+
+Two scenarios:
+
+  steps  closed loop - for each concurrency level, that many clients replay the app
+         launch session back to back for --duration seconds; shows how throughput
+         and latency change as concurrency rises
+  spike  open loop - --riders distinct riders start their shift within --ramp-seconds
+         and each runs the launch session once, like the morning shift-start rush
+
+The launch session is what the app does when a rider opens it: /rider-info,
+/training-progress and /get-tutorials, then /tutorial-state and /module-started
+for the first tutorial. Riders are numbered from fake_backends.SYNTHETIC_RIDER_ID_START
+so the fake backend knows all of them.
+
+Usage:
+  python3 load_test.py --url http://127.0.0.1:8000 --levels 1,4,16,64 --duration 10
+  python3 load_test.py --scenario spike --riders 2000 --ramp-seconds 30 --concurrency 256
+"""
+
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from fake_backends import SYNTHETIC_RIDER_ID_START
+
+class Recorder:
+    """Thread-safe latency and status collection"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies_ms = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.sessions = 0
+
+    def record(self, route, latency_ms, status):
+        with self._lock:
+            self.latencies_ms[route].append(latency_ms)
+            if status is None or status >= 500:
+                self.errors[route] += 1
+
+    def session_done(self):
+        with self._lock:
+            self.sessions += 1
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+class Client:
+    """HTTP client for one app instance"""
+
+    def __init__(self, url, recorder, timeout):
+        parts = urlsplit(url)
+        self._host = parts.hostname
+        self._port = parts.port or 80
+        self._timeout = timeout
+        self._recorder = recorder
+        self._connection = None
+
+    def request(self, method, path, query=None, body=None):
+        if query:
+            path = f"{path}?{urlencode(query)}"
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        payload = json.dumps(body) if body is not None else None
+        started = time.perf_counter()
+        status = None
+        data = None
+        try:
+            if self._connection is None:
+                self._connection = http.client.HTTPConnection(self._host, self._port, timeout=self._timeout)
+            self._connection.request(method, path, body=payload, headers=headers)
+            response = self._connection.getresponse()
+            raw = response.read()
+            status = response.status
+            data = json.loads(raw) if raw else None
+        except Exception:
+            self.close()
+        self._recorder.record(path.split('?')[0], (time.perf_counter() - started) * 1000, status)
+        return status, data
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+def launch_session(client, rider_id):
+    """The requests the app makes when a rider opens it at shift start"""
+    query = {'rider_id': rider_id}
+    client.request('GET', '/rider-info', query)
+    client.request('GET', '/training-progress', query)
+    status, data = client.request('GET', '/get-tutorials', query)
+
+    tutorials = ((data or {}).get('data') or {}).get('tutorials') or []
+    if status == 200 and tutorials:
+        client.request('POST', '/tutorial-state', body={
+            'rider_id': rider_id, 'tutorial_id': tutorials[0]['id'], 'isDone': True})
+        client.request('POST', '/module-started', body={'rider_id': rider_id, 'day': 'day1'})
+
+def summarize(label, recorder, elapsed):
+    """One line per route plus an overall line"""
+    all_latencies = [latency for samples in recorder.latencies_ms.values() for latency in samples]
+    total = len(all_latencies)
+    errors = sum(recorder.errors.values())
+    overall = {
+        'label': label,
+        'requests': total,
+        'sessions': recorder.sessions,
+        'throughput_rps': round(total / elapsed, 1) if elapsed else 0.0,
+        'errors': errors,
+        'p50_ms': round(percentile(all_latencies, 0.50), 1),
+        'p95_ms': round(percentile(all_latencies, 0.95), 1),
+        'p99_ms': round(percentile(all_latencies, 0.99), 1),
+        'routes': {},
+    }
+    for route, samples in sorted(recorder.latencies_ms.items()):
+        overall['routes'][route] = {
+            'requests': len(samples),
+            'errors': recorder.errors.get(route, 0),
+            'p50_ms': round(percentile(samples, 0.50), 1),
+            'p95_ms': round(percentile(samples, 0.95), 1),
+            'p99_ms': round(percentile(samples, 0.99), 1),
+        }
+    return overall
+
+def run_level(url, concurrency, duration, timeout, riders):
+    """Closed loop: `concurrency` clients run sessions back to back for `duration` seconds"""
+    recorder = Recorder()
+    stop_at = time.monotonic() + duration
+
+    def worker(index):
+        client = Client(url, recorder, timeout)
+        try:
+            while time.monotonic() < stop_at:
+                rider_id = str(SYNTHETIC_RIDER_ID_START + random.randrange(riders))
+                launch_session(client, rider_id)
+                recorder.session_done()
+        finally:
+            client.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(f"concurrency {concurrency}", recorder, time.perf_counter() - started)
+
+def run_spike(url, riders, ramp_seconds, concurrency, timeout):
+    """Open loop: each rider arrives at a random time within the ramp and runs one session"""
+    recorder = Recorder()
+    # Arrivals bunch up towards the start of the shift
+    offsets = sorted(ramp_seconds * random.betavariate(1.0, 3.0) for _ in range(riders))
+    local = threading.local()
+
+    def session(rider_id):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = Client(url, recorder, timeout)
+        launch_session(client, rider_id)
+        recorder.session_done()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for index, offset in enumerate(offsets):
+            delay = offset - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(session, str(SYNTHETIC_RIDER_ID_START + index))
+    return summarize(f"spike {riders} riders / {ramp_seconds}s", recorder, time.perf_counter() - started)
+
+def print_result(result, show_routes):
+    print(f"{result['label']:28s} {result['requests']:8d} {result['throughput_rps']:9.1f} {result['p50_ms']:8.1f} "
+          f"{result['p95_ms']:8.1f} {result['p99_ms']:8.1f} {result['errors']:7d}")
+    if show_routes:
+        for route, stats in result['routes'].items():
+            print(f"  {route:26s} {stats['requests']:8d} {'':9s} {stats['p50_ms']:8.1f} "
+                  f"{stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f} {stats['errors']:7d}")
+
+def main():
+    """Main load test function"""
+    parser = argparse.ArgumentParser(description='Load test a running local_server.py')
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--scenario', choices=['steps', 'spike'], default='steps')
+    parser.add_argument('--levels', default='1,4,16,64', help='concurrency levels for the steps scenario')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per concurrency level')
+    parser.add_argument('--riders', type=int, default=1000, help='distinct riders')
+    parser.add_argument('--ramp-seconds', type=float, default=30.0, help='spike: window in which riders arrive')
+    parser.add_argument('--concurrency', type=int, default=128, help='spike: maximum sessions in flight')
+    parser.add_argument('--timeout', type=float, default=30.0, help='per-request socket timeout in seconds')
+    parser.add_argument('--routes', action='store_true', help='also print per-route breakdown')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    if args.scenario == 'steps':
+        results = [run_level(args.url, int(level), args.duration, args.timeout, args.riders)
+                   for level in args.levels.split(',')]
+    else:
+        results = [run_spike(args.url, args.riders, args.ramp_seconds, args.concurrency, args.timeout)]
+
+    if args.json:
+        print(json.dumps({'url': args.url, 'scenario': args.scenario, 'results': results}, indent=2))
+    else:
+        print(f"Load test against {args.url} ({args.scenario})")
+        print(f"{'':28s} {'requests':>8s} {'req/s':>9s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'errors':>7s}")
+        for result in results:
+            print_result(result, args.routes)
+
+    return all(result['errors'] == 0 for result in results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
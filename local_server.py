@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Local HTTP server for the Lambda handlers
+
+Translates plain HTTP requests into the API Gateway proxy event shape that
+lambda_handler expects, so the API can be load-tested locally instead of through
+API Gateway.
+
+Backends:
+  --backend fake   in-process fakes from fake_backends.py with injected latency (default)
+  --backend env    whatever SUPABASE_URL / DB_* point at, e.g. a local Supabase stack
+                   (`supabase start`) and a local Postgres holding rider/node/tour
+
+Workers:
+  --mode process   N pre-forked single-threaded workers sharing the listening socket;
+                   each behaves like one Lambda container with its own warm state
+  --mode thread    one process serving N requests concurrently from a thread pool
+
+Usage:
+  python3 local_server.py --port 8000 --workers 8
+  python3 local_server.py --mode thread --workers 32 --latency-ms 15
+"""
+
+import argparse
+import base64
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+class LambdaContext:
+    """Minimal stand-in for the Lambda context object"""
+
+    def __init__(self, timeout_ms):
+        self.aws_request_id = str(uuid.uuid4())
+        self._deadline = time.monotonic() + timeout_ms / 1000
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+def build_event(method, raw_path, request_headers, body_bytes):
+    """Convert an HTTP request into an API Gateway REST proxy event"""
+    url = urlsplit(raw_path)
+    query = dict(parse_qsl(url.query, keep_blank_values=True))
+    return {
+        'resource': url.path,
+        'path': url.path,
+        'httpMethod': method,
+        'headers': dict(request_headers),
+        'queryStringParameters': query or None,
+        'body': body_bytes.decode('utf-8') if body_bytes else None,
+        'isBase64Encoded': False,
+        'requestContext': {
+            'requestId': str(uuid.uuid4()),
+            'stage': 'local',
+            'httpMethod': method,
+        },
+    }
+
+def make_handler_class(lambda_handler, timeout_ms):
+    class LambdaProxyHandler(BaseHTTPRequestHandler):
+        # One request per connection, so a busy client can't pin a worker with keep-alive
+        protocol_version = 'HTTP/1.0'
+
+        def _invoke(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body_bytes = self.rfile.read(length) if length else b''
+            event = build_event(self.command, self.path, self.headers.items(), body_bytes)
+            response = lambda_handler(event, LambdaContext(timeout_ms))
+
+            body = response.get('body') or ''
+            payload = base64.b64decode(body) if response.get('isBase64Encoded') else body.encode('utf-8')
+            self.send_response(response.get('statusCode', 200))
+            for name, value in (response.get('headers') or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(payload)
+
+        do_GET = _invoke
+        do_POST = _invoke
+        do_OPTIONS = _invoke
+
+        def log_message(self, format, *args):
+            pass
+
+    return LambdaProxyHandler
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that serves connections from a bounded thread pool"""
+
+    daemon_threads = True
+
+    def __init__(self, server_address, handler_class, workers, bind_and_activate=True):
+        super().__init__(server_address, handler_class, bind_and_activate)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http')
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._serve, request, client_address)
+
+    def _serve(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+def load_lambda_handler(args):
+    """Install the chosen backend and import lambda_function"""
+    if args.backend == 'fake':
+        import fake_backends
+        fake_backends.install(args.latency_ms, args.jitter_ms)
+    import lambda_function
+    logging.getLogger().setLevel(args.log_level)
+    return lambda_function.lambda_handler
+
+def serve_threads(args):
+    handler_class = make_handler_class(load_lambda_handler(args), args.timeout_ms)
+    server = PooledHTTPServer((args.host, args.port), handler_class, args.workers)
+    print(f"🚀 Serving on http://{args.host}:{args.port} ({args.workers} threads, {args.backend} backend)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def serve_processes(args):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((args.host, args.port))
+    listener.listen(1024)
+
+    children = []
+    for _ in range(args.workers):
+        pid = os.fork()
+        if pid == 0:
+            # Each child is one "container": its own module state, one request at a time
+            handler_class = make_handler_class(load_lambda_handler(args), args.timeout_ms)
+            server = HTTPServer((args.host, args.port), handler_class, bind_and_activate=False)
+            server.socket.close()
+            server.socket = listener
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            os._exit(0)
+        children.append(pid)
+
+    print(f"🚀 Serving on http://{args.host}:{args.port} ({args.workers} worker processes, {args.backend} backend)", flush=True)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        listener.close()
+
+def main():
+    """Main server function"""
+    parser = argparse.ArgumentParser(description='Serve lambda_handler over local HTTP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--mode', choices=['process', 'thread'], default='process')
+    parser.add_argument('--backend', choices=['fake', 'env'], default='fake')
+    parser.add_argument('--latency-ms', type=float, default=10.0, help='fake backend latency per round trip')
+    parser.add_argument('--jitter-ms', type=float, default=3.0)
+    parser.add_argument('--timeout-ms', type=int, default=29000, help='simulated Lambda time budget per request')
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if args.mode == 'process':
+        serve_processes(args)
+    else:
+        serve_threads(args)
+
+if __name__ == "__main__":
+    main()
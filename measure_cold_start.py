@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Cold start measurement for the Lambda function
+
+Starts a fresh interpreter per scenario and reports how long `import lambda_function`
+takes, which heavy backend modules it pulled in, and the latency of the first
+request. Pass --baseline <git-rev> to measure an older lambda_function.py alongside
+the working tree for a before/after comparison.
+
+Needs the packages from requirements.txt and the usual Lambda environment variables,
+since the first request talks to the real backends.
+
+Usage:
+  python3 measure_cold_start.py
+  python3 measure_cold_start.py --baseline HEAD~1 --path /get-tutorials --rider-id 12345
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+HEAVY_MODULES = ['psycopg2', 'supabase', 'httpx', 'postgrest', 'gotrue', 'realtime', 'storage3', 'mock_data']
+
+PROBE = r"""
+import json, sys, time
+sys.path[:0] = {paths!r}
+started = time.perf_counter()
+import lambda_function
+import_ms = (time.perf_counter() - started) * 1000
+loaded = [name for name in {heavy!r} if name in sys.modules]
+started = time.perf_counter()
+response = lambda_function.lambda_handler({event!r}, None)
+first_request_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({{
+    'import_ms': round(import_ms, 1),
+    'first_request_ms': round(first_request_ms, 1),
+    'status_code': response['statusCode'],
+    'modules_after_import': loaded,
+}}))
+"""
+
+def build_event(path, rider_id):
+    """Build the API Gateway event used for the first request"""
+    if path == 'OPTIONS':
+        return {'httpMethod': 'OPTIONS', 'path': '/get-tutorials'}
+    return {'httpMethod': 'GET', 'path': path, 'queryStringParameters': {'rider_id': rider_id}}
+
+def run_probe(source_dir, event, extra_env):
+    """Measure one scenario in a fresh interpreter"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = PROBE.format(paths=[source_dir, here], heavy=HEAVY_MODULES, event=event)
+    env = dict(os.environ, **extra_env)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'probe failed'}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def export_revision(revision, target_dir):
+    """Write lambda_function.py from a git revision into target_dir"""
+    source = subprocess.run(['git', 'show', f'{revision}:lambda_function.py'], capture_output=True, text=True, check=True).stdout
+    with open(os.path.join(target_dir, 'lambda_function.py'), 'w') as f:
+        f.write(source)
+
+def main():
+    """Main measurement function"""
+    parser = argparse.ArgumentParser(description='Measure Lambda cold start import time and first-request latency')
+    parser.add_argument('--baseline', help='git revision to compare against, e.g. HEAD~1')
+    parser.add_argument('--path', default='/get-tutorials', help="route for the first request, or OPTIONS")
+    parser.add_argument('--rider-id', default='12345')
+    parser.add_argument('--runs', type=int, default=3, help='fresh interpreters per scenario; the median is reported')
+    args = parser.parse_args()
+
+    event = build_event(args.path, args.rider_id)
+    here = os.path.dirname(os.path.abspath(__file__))
+    scenarios = [
+        ('current (lazy imports)', here, {'WARM_UP_ON_INIT': 'false'}),
+        ('current (WARM_UP_ON_INIT)', here, {'WARM_UP_ON_INIT': 'true'}),
+    ]
+
+    with tempfile.TemporaryDirectory() as baseline_dir:
+        if args.baseline:
+            export_revision(args.baseline, baseline_dir)
+            scenarios.insert(0, (f'baseline ({args.baseline})', baseline_dir, {}))
+
+        print(f"Cold start report - first request: {args.path}")
+        print("=" * 60)
+        for name, source_dir, extra_env in scenarios:
+            samples = [run_probe(source_dir, event, extra_env) for _ in range(args.runs)]
+            errors = [sample['error'] for sample in samples if 'error' in sample]
+            if errors:
+                print(f"{name:32s} ❌ {errors[0]}")
+                continue
+            samples.sort(key=lambda sample: sample['import_ms'] + sample['first_request_ms'])
+            median = samples[len(samples) // 2]
+            print(f"{name:32s} import {median['import_ms']:8.1f} ms   first request {median['first_request_ms']:8.1f} ms   "
+                  f"status {median['status_code']}")
+            print(f"{'':32s} loaded at import: {', '.join(median['modules_after_import']) or 'none'}")
+
+if __name__ == "__main__":
+    main()
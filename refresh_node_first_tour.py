@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Refresh the node_first_tour summary table
+
+Recomputes each node's first tour date and upserts only the rows that changed.
+Run periodically (e.g. nightly) against the primary database when the Lambda is
+configured with RIDER_AGE_SOURCE=summary. See replica_schema.sql for the DDL.
+
+Connection settings come from NODE_FIRST_TOUR_DSN, or from the DB_HOST, DB_NAME,
+DB_USER, DB_PASSWORD and DB_PORT environment variables.
+"""
+
+import os
+import sys
+import time
+
+import psycopg2
+
+REFRESH_QUERY = """
+INSERT INTO node_first_tour (node_id, min_tour_date, refreshed_at)
+SELECT node_id, MIN(tour_date)::date, now()
+FROM tour
+WHERE tour_date IS NOT NULL
+GROUP BY node_id
+ON CONFLICT (node_id) DO UPDATE
+SET min_tour_date = EXCLUDED.min_tour_date,
+    refreshed_at = EXCLUDED.refreshed_at
+WHERE node_first_tour.min_tour_date IS DISTINCT FROM EXCLUDED.min_tour_date;
+"""
+
+def get_connection():
+    """Connect to the database that owns the tour table."""
+    dsn = os.environ.get('NODE_FIRST_TOUR_DSN')
+    if dsn:
+        return psycopg2.connect(dsn)
+    return psycopg2.connect(
+        host=os.environ['DB_HOST'],
+        database=os.environ['DB_NAME'],
+        user=os.environ['DB_USER'],
+        password=os.environ['DB_PASSWORD'],
+        port=os.environ.get('DB_PORT', '5432')
+    )
+
+def refresh_node_first_tour():
+    """Upsert changed first-tour dates and return the number of rows written."""
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cursor:
+                cursor.execute(REFRESH_QUERY)
+                return cursor.rowcount
+    finally:
+        conn.close()
+
+def main():
+    """Main refresh function"""
+    started = time.monotonic()
+    try:
+        updated = refresh_node_first_tour()
+    except Exception as e:
+        print(f"❌ Error refreshing node_first_tour: {e}")
+        return False
+    print(f"✅ node_first_tour refreshed: {updated} rows updated in {time.monotonic() - started:.1f}s")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,23 @@
+-- BlitzNow Training App - read replica support objects
+-- Apply on the primary of the rider/node/tour database; the read replica picks
+-- them up through replication.
+--
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block. Run this file
+-- with plain `psql -f replica_schema.sql` (autocommit, no --single-transaction),
+-- or run the CREATE INDEX statement on its own if your migration tool wraps
+-- each file in a transaction.
+
+-- Serves the first-tour lookup in get_rider_info (lambda_function.RIDER_INFO_QUERY):
+-- one index probe per rider instead of aggregating the whole tour table.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS tour_node_id_tour_date_idx
+    ON tour (node_id, tour_date);
+
+-- Optional summary used when RIDER_AGE_SOURCE=summary.
+-- Kept up to date by refresh_node_first_tour.py.
+CREATE TABLE IF NOT EXISTS node_first_tour (
+    node_id       BIGINT PRIMARY KEY,
+    min_tour_date DATE NOT NULL,
+    refreshed_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+GRANT SELECT ON node_first_tour TO product_readuser;
@@ -0,0 +1,142 @@
+-- BlitzNow Training App - Supabase migrations
+-- Run in the Supabase SQL editor after supabase_schema.sql. Each section is
+-- idempotent and can be re-run safely.
+
+-- Single-round-trip progress writes (update_training_progress) upsert on rider_id.
+-- Remove any duplicate rows first, keeping the most recently updated one.
+DELETE FROM training_progress tp
+USING training_progress newer
+WHERE tp.rider_id = newer.rider_id
+  AND (COALESCE(tp.updated_at, '-infinity'), tp.id) < (COALESCE(newer.updated_at, '-infinity'), newer.id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS training_progress_rider_id_key
+    ON training_progress (rider_id);
+
+-- Atomic tutorial state merge used by update_tutorial_state. Merges p_states
+-- ({"<tutorial_id>": {"id": ..., "isDone": ...}, ...}) into tutorial_state in a
+-- single statement, creating the progress row when the rider has none yet.
+CREATE OR REPLACE FUNCTION set_tutorial_states(
+    p_rider_id training_progress.rider_id%TYPE,
+    p_states jsonb
+)
+RETURNS boolean
+LANGUAGE sql
+AS $$
+    INSERT INTO training_progress (rider_id, tutorial_state)
+    VALUES (p_rider_id, p_states)
+    ON CONFLICT (rider_id) DO UPDATE
+    SET tutorial_state = COALESCE(training_progress.tutorial_state, '{}'::jsonb) || EXCLUDED.tutorial_state
+    RETURNING true;
+$$;
+
+GRANT EXECUTE ON FUNCTION set_tutorial_states TO anon, authenticated;
+
+-- Keyset pagination of the /day-hub-mappings listing orders by
+-- (day, hub_type, order_index, id) and seeks past the previous page's last row.
+CREATE INDEX IF NOT EXISTS day_hub_tutorial_mappings_keyset_idx
+    ON day_hub_tutorial_mappings (day, hub_type, order_index, id);
+
+-- Atomic replacement of one (day, hub_type) mapping set, used by the /tutorials
+-- import action. The delete and insert run in the same transaction, so readers
+-- see either the old set or the new one. order_index follows the array order.
+CREATE OR REPLACE FUNCTION replace_day_hub_mappings(
+    p_day day_hub_tutorial_mappings.day%TYPE,
+    p_hub_type day_hub_tutorial_mappings.hub_type%TYPE,
+    p_tutorial_ids text[]
+)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    inserted integer;
+BEGIN
+    DELETE FROM day_hub_tutorial_mappings
+    WHERE day = p_day AND hub_type = p_hub_type;
+
+    INSERT INTO day_hub_tutorial_mappings (day, hub_type, tutorial_id, order_index)
+    SELECT p_day, p_hub_type, ids.tutorial_id, ids.position - 1
+    FROM unnest(p_tutorial_ids) WITH ORDINALITY AS ids(tutorial_id, position);
+
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+    RETURN inserted;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION replace_day_hub_mappings TO anon, authenticated;
+
+-- Write-behind drain (PROGRESS_QUEUE): applies one rider's coalesced progress events
+-- in a single statement. p_columns holds module_started_*/module_completed_* values to
+-- set (absent keys keep their current value); any other key is an error rather than
+-- being dropped silently. p_states is merged into tutorial_state like set_tutorial_states.
+CREATE OR REPLACE FUNCTION merge_training_progress(
+    p_rider_id training_progress.rider_id%TYPE,
+    p_columns jsonb,
+    p_states jsonb
+)
+RETURNS boolean
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    unknown_columns text;
+BEGIN
+    SELECT string_agg(key, ', ' ORDER BY key) INTO unknown_columns
+    FROM jsonb_object_keys(COALESCE(p_columns, '{}'::jsonb)) AS key
+    WHERE key NOT IN (
+        'module_started_day1', 'module_started_day2', 'module_started_day3',
+        'module_completed_day1', 'module_completed_day2', 'module_completed_day3'
+    );
+    IF unknown_columns IS NOT NULL THEN
+        RAISE EXCEPTION 'merge_training_progress cannot set columns: %', unknown_columns
+            USING ERRCODE = 'undefined_column';
+    END IF;
+
+    INSERT INTO training_progress AS tp (
+        rider_id, tutorial_state,
+        module_started_day1, module_started_day2, module_started_day3,
+        module_completed_day1, module_completed_day2, module_completed_day3,
+        updated_at
+    )
+    SELECT
+        p_rider_id, COALESCE(p_states, '{}'::jsonb),
+        r.module_started_day1, r.module_started_day2, r.module_started_day3,
+        r.module_completed_day1, r.module_completed_day2, r.module_completed_day3,
+        now()
+    FROM jsonb_populate_record(NULL::training_progress, COALESCE(p_columns, '{}'::jsonb)) AS r
+    ON CONFLICT (rider_id) DO UPDATE
+    SET tutorial_state = COALESCE(tp.tutorial_state, '{}'::jsonb) || EXCLUDED.tutorial_state,
+        module_started_day1 = COALESCE(EXCLUDED.module_started_day1, tp.module_started_day1),
+        module_started_day2 = COALESCE(EXCLUDED.module_started_day2, tp.module_started_day2),
+        module_started_day3 = COALESCE(EXCLUDED.module_started_day3, tp.module_started_day3),
+        module_completed_day1 = COALESCE(EXCLUDED.module_completed_day1, tp.module_completed_day1),
+        module_completed_day2 = COALESCE(EXCLUDED.module_completed_day2, tp.module_completed_day2),
+        module_completed_day3 = COALESCE(EXCLUDED.module_completed_day3, tp.module_completed_day3),
+        updated_at = EXCLUDED.updated_at;
+
+    RETURN true;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION merge_training_progress TO anon, authenticated;
+
+-- The tutorial catalog cache (TutorialCatalogCache in lambda_function.py) detects
+-- edits from other containers by row count and max(updated_at), so every UPDATE of
+-- a catalog row must move updated_at forward, whoever makes it.
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS tutorials_set_updated_at ON tutorials;
+CREATE TRIGGER tutorials_set_updated_at
+    BEFORE UPDATE ON tutorials
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS day_hub_tutorial_mappings_set_updated_at ON day_hub_tutorial_mappings;
+CREATE TRIGGER day_hub_tutorial_mappings_set_updated_at
+    BEFORE UPDATE ON day_hub_tutorial_mappings
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
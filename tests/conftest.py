@@ -0,0 +1,44 @@
+"""
+Shared pytest fixtures
+
+lambda_function is imported against the in-process fakes from fake_backends.py,
+so the tests run offline. Run from the repository root:
+
+  python3 -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_backends
+
+fake_backends.install()
+
+import lambda_function
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Fresh seed tables and empty container state; returns the fake database."""
+    fake_backends.database.tables = fake_backends.build_seed_tables()
+    fake_backends.reset_round_trips()
+    monkeypatch.setattr(lambda_function, 'connection_manager', lambda_function.ConnectionManager())
+    monkeypatch.setattr(lambda_function, 'tutorial_catalog', lambda_function.TutorialCatalogCache(300, 5000))
+    lambda_function.rider_info_cache.clear()
+    lambda_function.idempotency_store.clear()
+    return fake_backends.database
+
+@pytest.fixture
+def failing_supabase(monkeypatch):
+    """Make every fake Supabase query fail like a dropped connection; returns the attempt counter."""
+    attempts = []
+
+    def execute(query):
+        attempts.append(query)
+        raise ConnectionError('connection refused')
+
+    monkeypatch.setattr(fake_backends.FakeQuery, 'execute', execute)
+    return attempts
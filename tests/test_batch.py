@@ -0,0 +1,80 @@
+"""/batch: ordering, shared lookups, per-item errors and limits"""
+
+import json
+
+import lambda_function
+
+def batch(requests):
+    response = lambda_function.lambda_handler({'httpMethod': 'POST', 'path': '/batch', 'body': json.dumps({'requests': requests})}, None)
+    return response['statusCode'], json.loads(response['body'])
+
+def test_responses_come_back_in_request_order(backend):
+    status, body = batch([
+        {'path': '/get-tutorials', 'query': {'rider_id': '12345'}},
+        {'path': '/training-progress', 'query': {'rider_id': '12345'}},
+        {'path': '/no-such-route'},
+        {'path': '/tutorial-state', 'body': {'rider_id': '12345', 'tutorial_id': 'delivery_flow', 'isDone': True}},
+    ])
+    assert status == 200
+    responses = body['responses']
+    assert [(item['path'], item['statusCode']) for item in responses] == [
+        ('/get-tutorials', 200),
+        ('/training-progress', 200),
+        ('/no-such-route', 404),
+        ('/tutorial-state', 200),
+    ]
+    assert responses[0]['body']['data']['rider_age'] == 1
+
+def test_sub_requests_share_one_rider_lookup(backend, monkeypatch):
+    # Without the per-container cache, only the batch memo can dedupe the lookup
+    monkeypatch.setattr(lambda_function, 'rider_info_cache', lambda_function.RiderInfoCache(0, 60, 'UTC'))
+    fetch_rider_info = lambda_function.fetch_rider_info
+    lookups = []
+
+    def counting_fetch(rider_id):
+        lookups.append(rider_id)
+        return fetch_rider_info(rider_id)
+
+    monkeypatch.setattr(lambda_function, 'fetch_rider_info', counting_fetch)
+    status, body = batch([
+        {'path': '/rider-info', 'query': {'rider_id': '12345'}},
+        {'path': '/get-tutorials', 'query': {'rider_id': '12345'}},
+        {'path': '/get-tutorials', 'query': {'rider_id': '12345'}},
+    ])
+    assert status == 200
+    assert [item['statusCode'] for item in body['responses']] == [200, 200, 200]
+    assert lookups == ['12345']
+
+    # The memo does not outlive the batch
+    batch([{'path': '/rider-info', 'query': {'rider_id': '12345'}}])
+    assert lookups == ['12345', '12345']
+
+def test_nested_batch_and_metrics_are_not_reachable(backend, monkeypatch):
+    monkeypatch.setattr(lambda_function, 'METRICS_SECRET', 'secret')
+    status, body = batch([
+        {'path': '/batch', 'body': {'requests': [{'path': '/rider-info', 'query': {'rider_id': '12345'}}]}},
+        {'path': '/metrics'},
+    ])
+    assert status == 200
+    assert [item['statusCode'] for item in body['responses']] == [404, 404]
+
+def test_invalid_items_fail_individually(backend):
+    status, body = batch([
+        {'path': '/tutorial-state', 'body': '{not json'},
+        'not an object',
+        {'query': {'rider_id': '12345'}},
+        {'path': '/tutorial-state', 'body': json.dumps({'rider_id': '12345', 'tutorial_id': 'delivery_flow', 'isDone': True})},
+    ])
+    assert status == 200
+    assert [item['statusCode'] for item in body['responses']] == [400, 400, 400, 200]
+
+def test_request_limit(backend, monkeypatch):
+    monkeypatch.setattr(lambda_function, 'BATCH_MAX_REQUESTS', 2)
+    request = {'path': '/rider-info', 'query': {'rider_id': '12345'}}
+    assert batch([request, request])[0] == 200
+    status, body = batch([request, request, request])
+    assert status == 400
+    assert 'At most 2' in body['error']
+
+def test_empty_batch_is_rejected(backend):
+    assert batch([])[0] == 400
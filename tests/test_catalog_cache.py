@@ -0,0 +1,132 @@
+"""TutorialCatalogCache: TTL, version probe, invalidation and failure back-off"""
+
+import fake_backends
+import lambda_function
+from lambda_function import TutorialCatalogCache
+
+def expire(cache):
+    """Pretend the TTL has elapsed since the last check."""
+    cache._checked_at -= cache.ttl_seconds
+    if cache._loaded_at is not None:
+        cache._loaded_at -= cache.ttl_seconds
+
+def test_serves_snapshot_within_ttl(backend):
+    cache = TutorialCatalogCache(300, 5000)
+    snapshot = cache.get()
+    assert snapshot is not None
+    assert 'delivery_flow' in snapshot['tutorials_by_id']
+
+    fake_backends.reset_round_trips()
+    assert cache.get() is snapshot
+    assert fake_backends.total_round_trips() == 0
+    assert cache.get_stats()['loads'] == 1
+
+def test_unchanged_catalog_is_revalidated_by_version_probe(backend):
+    cache = TutorialCatalogCache(300, 5000)
+    snapshot = cache.get()
+    expire(cache)
+
+    fake_backends.reset_round_trips()
+    assert cache.get() is snapshot
+    # One version probe per table, no reload
+    assert fake_backends.total_round_trips() == 2
+    assert cache.get_stats()['revalidations'] == 1
+    assert cache.get_stats()['loads'] == 1
+
+def test_changed_catalog_is_reloaded_after_ttl(backend):
+    cache = TutorialCatalogCache(300, 5000)
+    cache.get()
+    backend.tables['tutorials'].append({
+        'id': 'new_tutorial', 'title': 'New', 'subtitle': '', 'description': '',
+        'created_at': '2024-02-01T00:00:00+00:00', 'updated_at': '2024-02-01T00:00:00+00:00',
+    })
+
+    # Within the TTL other containers' writes are not seen yet
+    assert 'new_tutorial' not in cache.get()['tutorials_by_id']
+    expire(cache)
+    assert 'new_tutorial' in cache.get()['tutorials_by_id']
+    assert cache.get_stats()['loads'] == 2
+
+def test_invalidate_forces_reload(backend):
+    cache = TutorialCatalogCache(300, 5000)
+    cache.get()
+    cache.invalidate()
+    assert cache.get() is not None
+    assert cache.get_stats()['loads'] == 2
+    assert cache.get_stats()['invalidations'] == 1
+
+def test_oversize_catalog_is_not_cached_or_reprobed_within_ttl(backend):
+    cache = TutorialCatalogCache(300, 10)
+    assert cache.get() is None
+    assert cache.get_stats()['oversize'] == 1
+
+    fake_backends.reset_round_trips()
+    assert cache.get() is None
+    assert fake_backends.total_round_trips() == 0
+
+def test_failure_backs_off_until_ttl(backend, failing_supabase):
+    cache = TutorialCatalogCache(300, 5000)
+    assert cache.get() is None
+    assert cache.get_stats()['errors'] == 1
+    probes = len(failing_supabase)
+
+    # A failing backend is not probed again on every request
+    assert cache.get() is None
+    assert len(failing_supabase) == probes
+
+    expire(cache)
+    assert cache.get() is None
+    assert len(failing_supabase) > probes
+    assert cache.get_stats()['errors'] == 2
+
+def test_recovers_after_failure_backoff(backend, monkeypatch):
+    cache = TutorialCatalogCache(300, 5000)
+    execute = fake_backends.FakeQuery.execute
+
+    def failing_execute(query):
+        raise ConnectionError('connection refused')
+
+    monkeypatch.setattr(fake_backends.FakeQuery, 'execute', failing_execute)
+    assert cache.get() is None
+    monkeypatch.setattr(fake_backends.FakeQuery, 'execute', execute)
+    expire(cache)
+    assert cache.get() is not None
+
+def test_failed_revalidation_keeps_serving_the_snapshot(backend, monkeypatch):
+    cache = TutorialCatalogCache(300, 5000)
+    snapshot = cache.get()
+    expire(cache)
+
+    def failing_execute(query):
+        raise ConnectionError('connection refused')
+
+    monkeypatch.setattr(fake_backends.FakeQuery, 'execute', failing_execute)
+    assert cache.get() is snapshot
+    assert cache.get_stats()['stale_serves'] == 1
+    # Not probed again until the TTL elapses
+    assert cache.get() is snapshot
+    assert cache.get_stats()['errors'] == 1
+
+def test_snapshot_past_max_age_is_reloaded_without_a_version_change(backend):
+    cache = TutorialCatalogCache(300, 5000, max_age_seconds=600)
+    cache.get()
+    # An edit the version probe cannot see: same row count, same latest updated_at
+    tutorial = backend.tables['tutorials'][0]
+    tutorial['title'] = 'Edited elsewhere'
+
+    expire(cache)
+    assert cache.get()['tutorials_by_id'][tutorial['id']]['title'] != 'Edited elsewhere'
+    expire(cache)
+    assert cache.get()['tutorials_by_id'][tutorial['id']]['title'] == 'Edited elsewhere'
+    assert cache.get_stats()['expired_reloads'] == 1
+    assert cache.get_stats()['loads'] == 2
+
+def test_zero_ttl_disables_cache(backend):
+    cache = TutorialCatalogCache(0, 5000)
+    assert cache.get() is None
+    assert fake_backends.total_round_trips() == 0
+
+def test_handlers_fall_back_to_direct_queries_while_backing_off(backend, monkeypatch):
+    monkeypatch.setattr(lambda_function, 'tutorial_catalog', TutorialCatalogCache(300, 10))
+    mappings = lambda_function.get_tutorial_mappings(1, 'lm_hub')
+    assert [mapping['order_index'] for mapping in mappings] == list(range(12))
@@ -0,0 +1,106 @@
+"""/tutorials bulk import: row validation, NDJSON parsing and backend failures"""
+
+import json
+
+import lambda_function
+
+def post(body, content_type='application/json', path='/tutorials'):
+    event = {
+        'httpMethod': 'POST',
+        'path': path,
+        'headers': {'Content-Type': content_type},
+        'body': body if isinstance(body, str) else json.dumps(body),
+    }
+    response = lambda_function.lambda_handler(event, None)
+    return response['statusCode'], json.loads(response['body'])
+
+def mapping_ids(backend, day, hub_type):
+    rows = [row for row in backend.tables['day_hub_tutorial_mappings'] if row['day'] == day and row['hub_type'] == hub_type]
+    return [row['tutorial_id'] for row in sorted(rows, key=lambda row: row['order_index'])]
+
+def test_valid_import_writes_tutorials_and_replaces_mapping_set(backend):
+    status, body = post({
+        'action': 'import',
+        'tutorials': [{'id': 'night_shift', 'title': 'Night shift'}],
+        'mappings': [{'day': 1, 'hub_type': 'lm_hub', 'tutorial_ids': ['night_shift', 'delivery_flow']}],
+    })
+    assert status == 200
+    assert body['message'] == 'Success'
+    assert body['data'] == {'tutorials_upserted': 1, 'mapping_sets_replaced': 1, 'errors': []}
+    assert mapping_ids(backend, 1, 'lm_hub') == ['night_shift', 'delivery_flow']
+
+def test_invalid_rows_are_reported_and_the_rest_written(backend):
+    before = mapping_ids(backend, 1, 'lm_hub')
+    status, body = post({'action': 'import', 'records': [
+        {'type': 'tutorial', 'id': 'night_shift', 'title': 'Night shift'},
+        {'type': 'tutorial', 'id': 'night_shift', 'title': 'Again'},
+        {'type': 'tutorial', 'id': 'untitled'},
+        {'type': 'tutorial', 'id': 'bad_subtitle', 'title': 'Bad', 'subtitle': 3},
+        {'type': 'mapping', 'day': 0, 'hub_type': 'lm_hub', 'tutorial_ids': ['night_shift']},
+        {'type': 'mapping', 'day': 1, 'hub_type': 'lm_hub', 'tutorial_ids': ['night_shift', 'night_shift']},
+        {'type': 'mapping', 'day': 1, 'hub_type': 'lm_hub', 'tutorial_ids': ['no_such_tutorial']},
+        {'type': 'course'},
+        'not an object',
+    ]})
+    assert status == 200
+    assert body['message'] == 'Imported with errors'
+    assert body['data']['tutorials_upserted'] == 1
+    assert body['data']['mapping_sets_replaced'] == 0
+    errors = {error['row']: error['error'] for error in body['data']['errors']}
+    assert errors == {
+        'records[1]': 'Duplicate tutorial id (first seen at records[0])',
+        'records[2]': 'title is required',
+        'records[3]': 'subtitle must be a string',
+        'records[4]': 'day must be a positive integer',
+        'records[5]': 'tutorial_ids contains duplicates',
+        'records[6]': 'Unknown tutorial ids: no_such_tutorial',
+        'records[7]': 'type must be tutorial or mapping',
+        'records[8]': 'Row is not a JSON object',
+    }
+    assert mapping_ids(backend, 1, 'lm_hub') == before
+
+def test_ndjson_import(backend):
+    ndjson = '\n'.join([
+        json.dumps({'type': 'tutorial', 'id': 'night_shift', 'title': 'Night shift'}),
+        '',
+        '{not json',
+        json.dumps({'type': 'mapping', 'day': '2', 'hub_type': 'lm_hub', 'tutorial_ids': ['night_shift']}),
+    ])
+    status, body = post(ndjson, content_type='application/x-ndjson; charset=utf-8')
+    assert status == 200
+    assert body['data']['tutorials_upserted'] == 1
+    assert body['data']['mapping_sets_replaced'] == 1
+    assert body['data']['errors'] == [{'row': 'line 3', 'error': 'Row is not a JSON object'}]
+    assert mapping_ids(backend, 2, 'lm_hub') == ['night_shift']
+
+def test_ndjson_is_rejected_outside_tutorials(backend):
+    ndjson = json.dumps({'type': 'tutorial', 'id': 'night_shift', 'title': 'Night shift'})
+    status, body = post(ndjson, content_type='application/x-ndjson', path='/day-hub-mappings')
+    assert status == 415
+    assert not any(row['id'] == 'night_shift' for row in backend.tables['tutorials'])
+
+def test_failed_existence_check_replaces_no_mapping_set(backend, monkeypatch):
+    before = mapping_ids(backend, 1, 'lm_hub')
+    execute_query = lambda_function.execute_query
+
+    def failing_existence_check(operation, query):
+        if operation == 'tutorials.select_existing':
+            raise ConnectionError('connection refused')
+        return execute_query(operation, query)
+
+    monkeypatch.setattr(lambda_function, 'execute_query', failing_existence_check)
+    status, body = post({
+        'action': 'import',
+        'tutorials': [{'id': 'night_shift', 'title': 'Night shift'}],
+        'mappings': [{'day': 1, 'hub_type': 'lm_hub', 'tutorial_ids': ['night_shift', 'delivery_flow']}],
+    })
+    assert status == 502
+    assert body['data']['tutorials_upserted'] == 1
+    assert body['data']['mapping_sets_replaced'] == 0
+    assert mapping_ids(backend, 1, 'lm_hub') == before
+
+def test_row_limit(backend, monkeypatch):
+    monkeypatch.setattr(lambda_function, 'IMPORT_MAX_ROWS', 2)
+    status, body = post({'action': 'import', 'tutorials': [{'id': f't{index}', 'title': 'T'} for index in range(3)]})
+    assert status == 400
+    assert body['data'] is None
@@ -0,0 +1,88 @@
+"""CircuitBreaker state transitions and the replica connection guard"""
+
+import sys
+
+import lambda_function
+from lambda_function import CircuitBreaker
+
+def cool_down(breaker):
+    """Pretend the cool-down has elapsed since the last state change."""
+    breaker._changed_at -= breaker.cooldown_seconds
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker('test', 3, 30)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.get_stats()['state'] == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.get_stats()['short_circuited'] == 1
+    assert breaker.get_stats()['opened'] == 1
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker('test', 3, 30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.get_stats()['state'] == CircuitBreaker.CLOSED
+    assert breaker.get_stats()['consecutive_failures'] == 1
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker('test', 2, 30)
+    open_breaker(breaker)
+    cool_down(breaker)
+    assert breaker.allow_request()
+    assert breaker.get_stats()['state'] == CircuitBreaker.HALF_OPEN
+    # Everyone else keeps failing fast until the probe reports back
+    assert not breaker.allow_request()
+
+def test_successful_probe_closes():
+    breaker = CircuitBreaker('test', 2, 30)
+    open_breaker(breaker)
+    cool_down(breaker)
+    breaker.allow_request()
+    breaker.record_success()
+    assert breaker.get_stats()['state'] == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+def test_failed_probe_reopens_for_another_cool_down():
+    breaker = CircuitBreaker('test', 2, 30)
+    open_breaker(breaker)
+    cool_down(breaker)
+    breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.get_stats()['state'] == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.get_stats()['opened'] == 2
+
+def test_lost_probe_is_replaced_after_cool_down():
+    breaker = CircuitBreaker('test', 2, 30)
+    open_breaker(breaker)
+    cool_down(breaker)
+    assert breaker.allow_request()
+    cool_down(breaker)
+    assert breaker.allow_request()
+
+def test_replica_connections_are_skipped_while_open(backend, monkeypatch):
+    breaker = CircuitBreaker('read_replica', 2, 30)
+    monkeypatch.setattr(lambda_function, 'replica_breaker', breaker)
+    attempts = []
+
+    def refuse(**kwargs):
+        attempts.append(kwargs)
+        raise sys.modules['psycopg2'].OperationalError('could not connect to server')
+
+    monkeypatch.setattr(sys.modules['psycopg2'], 'connect', refuse)
+    assert lambda_function.get_database_connection() == (None, False)
+    assert lambda_function.get_database_connection() == (None, False)
+    assert len(attempts) == 2
+
+    assert lambda_function.get_database_connection() == (None, False)
+    assert len(attempts) == 2
+    assert breaker.get_stats()['short_circuited'] == 1
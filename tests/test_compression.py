@@ -0,0 +1,95 @@
+"""Response compression: Accept-Encoding negotiation, size threshold and API Gateway encoding"""
+
+import base64
+import gzip
+import json
+
+import pytest
+
+import lambda_function
+from lambda_function import choose_content_encoding, compress_response
+
+LARGE_BODY = json.dumps({'message': 'Success', 'data': ['x' * 40] * 100})
+
+@pytest.fixture
+def no_brotli(monkeypatch):
+    monkeypatch.setattr(lambda_function, 'get_brotli', lambda: None)
+
+def request(accept_encoding):
+    return {'headers': {'Accept-Encoding': accept_encoding} if accept_encoding is not None else {}}
+
+def response(body=LARGE_BODY, status_code=200):
+    return {'statusCode': status_code, 'headers': {'Content-Type': 'application/json'}, 'body': body}
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    (None, None),
+    ('', None),
+    ('gzip', 'gzip'),
+    ('GZIP, deflate', 'gzip'),
+    ('deflate', None),
+    ('gzip;q=0', None),
+    ('gzip; q=0.5', 'gzip'),
+    ('gzip;q=0.000', None),
+    ('gzip;q=oops', None),
+    ('*', 'gzip'),
+    ('*;q=0', None),
+    ('*, gzip;q=0', None),
+    ('br;q=1, gzip;q=0.1', 'gzip'),
+    # identity;q=0 forbids an uncompressed body, but there is no other coding to send
+    ('identity;q=0', None),
+    ('identity;q=0, gzip', 'gzip'),
+])
+def test_choose_content_encoding_without_brotli(no_brotli, accept_encoding, expected):
+    assert choose_content_encoding(accept_encoding) == expected
+
+def test_brotli_is_preferred_when_available(monkeypatch):
+    monkeypatch.setattr(lambda_function, 'get_brotli', lambda: object())
+    assert choose_content_encoding('gzip, br') == 'br'
+    assert choose_content_encoding('gzip, br;q=0') == 'gzip'
+
+def test_large_body_is_gzipped_and_base64_encoded(no_brotli):
+    compressed = compress_response(request('gzip'), response())
+    assert compressed['isBase64Encoded'] is True
+    assert compressed['headers']['Content-Encoding'] == 'gzip'
+    assert compressed['headers']['Vary'] == 'Accept-Encoding'
+    assert compressed['headers']['Content-Type'] == 'application/json'
+    assert gzip.decompress(base64.b64decode(compressed['body'])).decode('utf-8') == LARGE_BODY
+
+def test_large_body_without_acceptable_encoding_still_varies(no_brotli):
+    plain = compress_response(request('gzip;q=0'), response())
+    assert plain['body'] == LARGE_BODY
+    assert 'isBase64Encoded' not in plain
+    assert 'Content-Encoding' not in plain['headers']
+    # Caches must still key on Accept-Encoding, since another client gets gzip
+    assert plain['headers']['Vary'] == 'Accept-Encoding'
+
+def test_threshold(no_brotli, monkeypatch):
+    monkeypatch.setattr(lambda_function, 'COMPRESSION_MIN_BYTES', len(LARGE_BODY))
+    assert compress_response(request('gzip'), response())['isBase64Encoded']
+    monkeypatch.setattr(lambda_function, 'COMPRESSION_MIN_BYTES', len(LARGE_BODY) + 1)
+    original = response()
+    assert compress_response(request('gzip'), original) is original
+    monkeypatch.setattr(lambda_function, 'COMPRESSION_MIN_BYTES', 0)
+    assert compress_response(request('gzip'), original) is original
+
+def test_small_and_not_modified_responses_are_untouched(no_brotli):
+    small = response(body=json.dumps({'message': 'Success'}))
+    assert compress_response(request('gzip'), small) is small
+    not_modified = response(body='', status_code=304)
+    assert compress_response(request('gzip'), not_modified) is not_modified
+
+def test_already_encoded_body_is_untouched(no_brotli):
+    encoded = dict(response(), isBase64Encoded=True)
+    assert compress_response(request('gzip'), encoded) is encoded
+
+def test_handler_compresses_large_responses(backend, no_brotli):
+    result = lambda_function.lambda_handler({
+        'httpMethod': 'GET',
+        'path': '/get-tutorials',
+        'headers': {'Accept-Encoding': 'gzip'},
+        'queryStringParameters': {'rider_id': '12345'},
+    }, None)
+    assert result['statusCode'] == 200
+    assert result['headers']['Content-Encoding'] == 'gzip'
+    body = json.loads(gzip.decompress(base64.b64decode(result['body'])))
+    assert body['data']['rider_age'] == 1
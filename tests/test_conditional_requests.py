@@ -0,0 +1,46 @@
+"""ETag / If-None-Match handling: only GETs are conditional"""
+
+import json
+
+import lambda_function
+
+def call(method, path, query=None, body=None, if_none_match=None):
+    event = {'httpMethod': method, 'path': path, 'queryStringParameters': query, 'headers': {}}
+    if body is not None:
+        event['body'] = json.dumps(body)
+    if if_none_match:
+        event['headers']['If-None-Match'] = if_none_match
+    return lambda_function.lambda_handler(event, None)
+
+def test_get_catalog_read_revalidates_to_304(backend):
+    first = call('GET', '/tutorials', {'tutorial_id': 'delivery_flow'})
+    assert first['statusCode'] == 200
+    assert json.loads(first['body'])['data']['id'] == 'delivery_flow'
+    assert first['headers']['Cache-Control'].startswith('public')
+
+    second = call('GET', '/tutorials', {'tutorial_id': 'delivery_flow'}, if_none_match=first['headers']['ETag'])
+    assert second['statusCode'] == 304
+    assert second['body'] == ''
+
+def test_get_mappings_read_uses_query_parameters(backend):
+    response = call('GET', '/day-hub-mappings', {'day': '2', 'hub_type': 'quick_hub'})
+    assert response['statusCode'] == 200
+    assert len(json.loads(response['body'])['data']['mappings']) == 12
+    assert 'ETag' in response['headers']
+
+def test_get_cannot_run_write_actions(backend):
+    response = call('GET', '/tutorials', {'action': 'create', 'id': 'x', 'title': 'X'})
+    assert response['statusCode'] == 200
+    assert not any(tutorial['id'] == 'x' for tutorial in backend.tables['tutorials'])
+
+def test_post_read_is_never_conditional(backend):
+    etag = call('GET', '/tutorials', {'tutorial_id': 'delivery_flow'})['headers']['ETag']
+    response = call('POST', '/tutorials', body={'action': 'get', 'tutorial_id': 'delivery_flow'}, if_none_match=etag)
+    assert response['statusCode'] == 200
+    assert 'ETag' not in response['headers']
+    assert 'Cache-Control' not in response['headers']
+
+def test_rider_reads_are_private(backend):
+    response = call('GET', '/get-tutorials', {'rider_id': '12345'})
+    assert response['headers']['Cache-Control'] == 'private, no-cache'
+    assert call('GET', '/get-tutorials', {'rider_id': '12345'}, if_none_match=response['headers']['ETag'])['statusCode'] == 304
@@ -0,0 +1,75 @@
+"""Read replica connection reuse, stale-connection discard and reconnect on a dropped connection"""
+
+import sys
+
+import fake_backends
+import lambda_function
+
+def pooled_connection():
+    """Open a connection, return it to the pool and hand back the pooled object."""
+    conn, reused = lambda_function.connection_manager.checkout_db()
+    assert not reused
+    lambda_function.connection_manager.release_db(conn)
+    return conn
+
+def test_connections_are_reused_across_lookups(backend):
+    assert lambda_function.fetch_rider_info('12345')[1]
+    assert lambda_function.fetch_rider_info('12345')[1]
+    stats = lambda_function.connection_manager.get_stats()
+    assert stats['db_new'] == 1
+    assert stats['db_hits'] == 1
+    assert stats['db_idle_connections'] == 1
+
+def test_idle_connection_failing_health_check_is_replaced(backend, monkeypatch):
+    conn = pooled_connection()
+    monkeypatch.setattr(lambda_function, 'DB_HEALTH_CHECK_IDLE_SECONDS', 0)
+    execute = fake_backends.FakeCursor.execute
+
+    def execute_on_live_connections(cursor, query, params=None):
+        if cursor._connection is conn:
+            raise fake_backends.FakeOperationalError('server closed the connection unexpectedly')
+        return execute(cursor, query, params)
+
+    monkeypatch.setattr(fake_backends.FakeCursor, 'execute', execute_on_live_connections)
+    fresh, reused = lambda_function.connection_manager.checkout_db()
+    assert fresh is not conn and not reused
+    assert conn.closed
+    assert lambda_function.connection_manager.get_stats()['db_stale_discarded'] == 1
+
+def test_closed_pooled_connection_is_discarded_without_a_query(backend):
+    conn = pooled_connection()
+    conn.close()
+    fake_backends.reset_round_trips()
+    fresh, reused = lambda_function.connection_manager.checkout_db()
+    assert fresh is not conn and not reused
+    # Only the connect; no health-check query was spent on the closed connection
+    assert fake_backends.round_trips['replica'] == 1
+
+def test_dropped_connection_is_retried_once_on_a_fresh_one(backend, monkeypatch):
+    breaker = lambda_function.CircuitBreaker('read_replica', 1, 30)
+    monkeypatch.setattr(lambda_function, 'replica_breaker', breaker)
+    conn = pooled_connection()
+    execute = fake_backends.FakeCursor.execute
+
+    def drop_pooled_connection(cursor, query, params=None):
+        # Recently used, so checkout skips the health check; the drop shows up mid-query
+        if cursor._connection is conn:
+            raise fake_backends.FakeOperationalError('server closed the connection unexpectedly')
+        return execute(cursor, query, params)
+
+    monkeypatch.setattr(fake_backends.FakeCursor, 'execute', drop_pooled_connection)
+    rider_info, from_database = lambda_function.fetch_rider_info('12345')
+    assert from_database
+    assert rider_info['rider_id'] == '12345'
+    assert conn.closed
+    assert lambda_function.connection_manager.get_stats()['db_dropped_retries'] == 1
+    assert breaker.get_stats()['state'] == 'closed'
+
+def test_server_reported_errors_are_not_treated_as_dropped_connections():
+    conn = fake_backends.FakeConnection()
+    timeout = sys.modules['psycopg2'].OperationalError('canceling statement due to statement timeout')
+    timeout.pgcode = '57014'
+    assert not lambda_function._is_dropped_connection(conn, timeout)
+    assert lambda_function._is_dropped_connection(conn, sys.modules['psycopg2'].OperationalError('server closed the connection unexpectedly'))
+    conn.close()
+    assert lambda_function._is_dropped_connection(conn, ValueError('anything'))
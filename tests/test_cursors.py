@@ -0,0 +1,76 @@
+"""Pagination cursors: encode/decode round trip, tamper rejection and paging"""
+
+import base64
+import json
+
+import pytest
+
+import lambda_function
+from lambda_function import decode_cursor, encode_cursor
+
+def forge(key):
+    """A cursor built by hand the way a client could."""
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii').rstrip('=')
+
+def post(path, body):
+    response = lambda_function.lambda_handler({'httpMethod': 'POST', 'path': path, 'body': json.dumps(body)}, None)
+    return response['statusCode'], json.loads(response['body'])
+
+@pytest.mark.parametrize('key, types', [
+    (['delivery_flow'], (str,)),
+    (['ünïcode/+?='], (str,)),
+    ([3, 'lm_hub', 7, 42], (int, str, int, int)),
+])
+def test_round_trip(key, types):
+    cursor = encode_cursor(key)
+    assert isinstance(cursor, str)
+    assert '=' not in cursor
+    assert decode_cursor(cursor, types) == key
+
+def test_none_means_no_cursor():
+    assert encode_cursor(None) is None
+    assert decode_cursor(None, (str,)) is None
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor!',
+    '',
+    '%%%',
+    forge({'id': 'delivery_flow'}),
+    forge('delivery_flow'),
+    forge([]),
+    forge(['delivery_flow', 'extra']),
+    forge([1]),
+    forge([True]),
+    forge([None]),
+])
+def test_rejects_malformed_or_tampered_tutorial_cursors(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, (str,))
+
+@pytest.mark.parametrize('key', [
+    ['3', 'lm_hub', 7, 42],
+    [3, 'lm_hub', 7],
+    [3, 'lm_hub', 7.5, 42],
+    [3, 'lm_hub', True, 42],
+    [3, 'lm_hub', 7, 42, 0],
+])
+def test_rejects_mapping_cursors_with_wrong_shape(key):
+    with pytest.raises(ValueError):
+        decode_cursor(forge(key), (int, str, int, int))
+
+def test_tampered_cursor_is_a_bad_request(backend):
+    status, body = post('/tutorials', {'action': 'get', 'cursor': forge([1])})
+    assert status == 400
+    assert body['error'] == 'Invalid cursor'
+
+def test_pages_cover_the_catalog_once(backend):
+    seen = []
+    cursor = None
+    while True:
+        status, body = post('/day-hub-mappings', {'action': 'get', 'limit': 5, 'cursor': cursor})
+        assert status == 200
+        seen.extend(mapping['id'] for mapping in body['data']['mappings'])
+        cursor = body['data']['next_cursor']
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == len(backend.tables['day_hub_tutorial_mappings'])
@@ -0,0 +1,57 @@
+"""Per-request deadlines: Supabase call timeouts and skipping optional work"""
+
+import time
+
+import fake_backends
+import lambda_function
+from lambda_function import TutorialCatalogCache
+
+class FakeSession:
+    def __init__(self):
+        self.event_hooks = {'request': [], 'response': []}
+
+class FakeHTTPRequest:
+    def __init__(self):
+        self.extensions = {'timeout': {'connect': 120, 'read': 120, 'write': 120, 'pool': 120}}
+
+def with_budget(seconds, fn, *args):
+    token = lambda_function._deadline.set(time.monotonic() + seconds if seconds is not None else None)
+    try:
+        return fn(*args)
+    finally:
+        lambda_function._deadline.reset(token)
+
+def test_each_call_gets_its_own_requests_timeout():
+    client = type('Client', (), {})()
+    client.postgrest = type('Postgrest', (), {})()
+    client.postgrest.session = FakeSession()
+    lambda_function._install_deadline_timeout(client)
+    lambda_function._install_deadline_timeout(client)
+    hooks = client.postgrest.session.event_hooks['request']
+    assert hooks == [lambda_function._deadline_timeout_hook]
+
+    short, unbounded = FakeHTTPRequest(), FakeHTTPRequest()
+    with_budget(0.5, hooks[0], short)
+    with_budget(None, hooks[0], unbounded)
+    assert short.extensions['timeout']['read'] <= 0.5
+    assert unbounded.extensions['timeout']['read'] == lambda_function.SUPABASE_HTTP_TIMEOUT_SECONDS
+
+def test_low_budget_serves_snapshot_without_probe(backend):
+    cache = TutorialCatalogCache(300, 5000)
+    snapshot = cache.get()
+    cache._checked_at -= cache.ttl_seconds
+
+    fake_backends.reset_round_trips()
+    assert with_budget(0.2, cache.get) is snapshot
+    assert fake_backends.total_round_trips() == 0
+    assert cache.get_stats()['low_budget_skips'] == 1
+
+    # With time to spare the overdue probe happens
+    assert with_budget(10, cache.get) is snapshot
+    assert cache.get_stats()['revalidations'] == 1
+
+def test_low_budget_does_not_load_an_empty_cache(backend):
+    cache = TutorialCatalogCache(300, 5000)
+    assert with_budget(0.2, cache.get) is None
+    assert fake_backends.total_round_trips() == 0
+    assert cache.get_stats()['loads'] == 0
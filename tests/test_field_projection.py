@@ -0,0 +1,79 @@
+"""Field projection on /training-progress and the /tutorials get action"""
+
+import json
+
+import pytest
+
+import fake_backends
+import lambda_function
+from lambda_function import TRAINING_PROGRESS_FIELDS, TUTORIAL_FIELDS, parse_fields
+
+def get_training_progress(fields):
+    params = {'rider_id': '12345'}
+    if fields is not None:
+        params['fields'] = fields
+    response = lambda_function.lambda_handler({'httpMethod': 'GET', 'path': '/training-progress', 'queryStringParameters': params}, None)
+    return response['statusCode'], json.loads(response['body'])
+
+def get_tutorial(fields):
+    response = lambda_function.lambda_handler({
+        'httpMethod': 'POST',
+        'path': '/tutorials',
+        'body': json.dumps({'action': 'get', 'tutorial_id': 'delivery_flow', 'fields': fields}),
+    }, None)
+    return response['statusCode'], json.loads(response['body'])
+
+@pytest.mark.parametrize('value', [None, '', ',', ' , ', [], [''], [' ']])
+def test_values_naming_no_column_mean_all_columns(value):
+    assert parse_fields(value, TUTORIAL_FIELDS, required=('id',)) is None
+
+def test_required_columns_come_first_and_are_not_repeated():
+    assert parse_fields('title, id,title', TUTORIAL_FIELDS, required=('id',)) == ['id', 'title']
+    assert parse_fields(['subtitle'], TUTORIAL_FIELDS, required=('id',)) == ['id', 'subtitle']
+
+@pytest.mark.parametrize('value', ['title,password', ['id', 'secret'], 42, ['title', 3]])
+def test_invalid_values_raise(value):
+    with pytest.raises(ValueError):
+        parse_fields(value, TUTORIAL_FIELDS)
+
+def test_training_progress_reads_only_the_requested_columns(backend, monkeypatch):
+    selects = []
+    select = fake_backends.FakeQuery.select
+
+    def recording_select(query, columns='*', **kwargs):
+        selects.append(columns)
+        return select(query, columns, **kwargs)
+
+    monkeypatch.setattr(fake_backends.FakeQuery, 'select', recording_select)
+    status, body = get_training_progress('module_completed_day1,module_completed_day2')
+    assert status == 200
+    assert set(body) == {'module_completed_day1', 'module_completed_day2'}
+    assert selects == ['module_completed_day1,module_completed_day2']
+
+@pytest.mark.parametrize('fields', [None, '', ','])
+def test_training_progress_without_a_projection_returns_every_column(backend, fields):
+    status, body = get_training_progress(fields)
+    assert status == 200
+    assert set(body) == set(TRAINING_PROGRESS_FIELDS)
+
+def test_training_progress_rejects_unknown_fields(backend):
+    status, body = get_training_progress('module_completed_day1,password')
+    assert status == 400
+    assert 'password' in body['error']
+
+def test_tutorial_projection_always_includes_id(backend):
+    status, body = get_tutorial(['title'])
+    assert status == 200
+    assert body['data'] == {'id': 'delivery_flow', 'title': body['data']['title']}
+
+@pytest.mark.parametrize('fields', ['', ',', []])
+def test_tutorial_without_a_projection_returns_every_column(backend, fields):
+    status, body = get_tutorial(fields)
+    assert status == 200
+    assert set(body['data']) == set(TUTORIAL_FIELDS)
+
+def test_tutorial_rejects_unknown_fields(backend):
+    status, body = get_tutorial('title,secret')
+    assert status == 400
+    assert body['data'] is None
+    assert 'secret' in body['error']
@@ -0,0 +1,83 @@
+"""/get-tutorials: rider checks, state overlay and backend work per request"""
+
+import json
+
+import fake_backends
+import lambda_function
+
+def get_tutorials(rider_id):
+    response = lambda_function.lambda_handler({
+        'httpMethod': 'GET',
+        'path': '/get-tutorials',
+        'queryStringParameters': {'rider_id': rider_id},
+    }, None)
+    return response['statusCode'], json.loads(response['body'])
+
+def test_overlays_rider_states_in_mapping_order(backend):
+    status, body = get_tutorials('11111')
+    assert status == 200
+    tutorials = body['data']['tutorials']
+    assert body['data']['rider_age'] == 3
+    assert [tutorial['id'] for tutorial in tutorials] == [f'lm_hub_day3_tutorial_{index}' for index in range(12)]
+    assert not any(tutorial['isDone'] for tutorial in tutorials)
+
+def test_known_unknown_rider_costs_no_supabase_round_trip(backend):
+    # Load the catalog up front so the background prefetch cannot land in the count below
+    lambda_function.tutorial_catalog.get()
+    status, _ = get_tutorials('99')
+    assert status == 404
+
+    # The rider is now negatively cached, so nothing is read for it speculatively
+    fake_backends.reset_round_trips()
+    status, _ = get_tutorials('99')
+    assert status == 404
+    assert fake_backends.round_trips['supabase'] == 0
+
+def test_cached_rider_still_gets_fresh_states(backend):
+    get_tutorials('12345')
+    lambda_function.update_tutorial_states('12345', {'central_hub_only': True, 'lm_hub_day1_tutorial_1': True})
+
+    status, body = get_tutorials('12345')
+    assert status == 200
+    done = {tutorial['id'] for tutorial in body['data']['tutorials'] if tutorial['isDone']}
+    assert done == {'lm_hub_day1_tutorial_0', 'lm_hub_day1_tutorial_1'}
+
+def reference_body(backend, rider_id, day, hub_type):
+    """The response body as built before list templates: json.dumps of the joined rows."""
+    tutorials_by_id = {tutorial['id']: tutorial for tutorial in backend.tables['tutorials']}
+    mappings = sorted(
+        (mapping for mapping in backend.tables['day_hub_tutorial_mappings'] if mapping['day'] == day and mapping['hub_type'] == hub_type),
+        key=lambda mapping: mapping['order_index']
+    )
+    states = next(row for row in backend.tables['training_progress'] if row['rider_id'] == rider_id)['tutorial_state']
+    tutorials = []
+    for mapping in mappings:
+        tutorial_info = tutorials_by_id.get(mapping['tutorial_id'])
+        if tutorial_info:
+            tutorials.append({
+                'id': mapping['tutorial_id'],
+                'title': tutorial_info['title'],
+                'subtitle': tutorial_info.get('subtitle', ''),
+                'isDone': states.get(mapping['tutorial_id'], {}).get('isDone', False)
+            })
+    return json.dumps({'message': 'Success', 'data': {'rider_age': day, 'tutorials': tutorials}})
+
+def test_body_matches_json_dumps_with_or_without_catalog_cache(backend, monkeypatch):
+    titles = {'lm_hub_day1_tutorial_0': 'Zustellung üben', 'lm_hub_day1_tutorial_1': 'डिलीवरी "quote" \\ 🚚'}
+    for tutorial in backend.tables['tutorials']:
+        if tutorial['id'] in titles:
+            tutorial['title'] = titles[tutorial['id']]
+            tutorial['subtitle'] = 'ß\n\t'
+    row = next(row for row in backend.tables['training_progress'] if row['rider_id'] == '12345')
+    row['tutorial_state'] = {
+        'lm_hub_day1_tutorial_0': {'id': 'lm_hub_day1_tutorial_0', 'isDone': True},
+        'lm_hub_day1_tutorial_1': {'id': 'lm_hub_day1_tutorial_1', 'isDone': 'yes'},
+        'lm_hub_day1_tutorial_2': {'id': 'lm_hub_day1_tutorial_2', 'isDone': 1},
+        'lm_hub_day1_tutorial_3': {'id': 'lm_hub_day1_tutorial_3', 'isDone': None},
+    }
+    expected = reference_body(backend, '12345', 1, 'lm_hub')
+    event = {'httpMethod': 'GET', 'path': '/get-tutorials', 'queryStringParameters': {'rider_id': '12345'}}
+
+    assert lambda_function.lambda_handler(event, None)['body'] == expected
+    monkeypatch.setattr(lambda_function, 'tutorial_catalog', lambda_function.TutorialCatalogCache(0, 5000))
+    assert lambda_function.lambda_handler(event, None)['body'] == expected
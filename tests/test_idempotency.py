@@ -0,0 +1,89 @@
+"""Idempotency-Key handling: replay, fingerprint conflicts and eviction of in-flight keys"""
+
+import json
+
+import lambda_function
+from lambda_function import IdempotencyStore
+
+def post(path, body, key):
+    event = {
+        'httpMethod': 'POST',
+        'path': path,
+        'headers': {'Idempotency-Key': key},
+        'body': json.dumps(body),
+    }
+    return lambda_function.lambda_handler(event, None)
+
+def test_completed_request_is_replayed_without_writing(backend, monkeypatch):
+    body = {'rider_id': '12345', 'tutorial_id': 'delivery_flow', 'isDone': True}
+    first = post('/tutorial-state', body, 'key-1')
+    assert first['statusCode'] == 200
+
+    def fail():
+        raise AssertionError('handler ran again')
+
+    monkeypatch.setattr(lambda_function, 'handle_tutorial_state', lambda body, headers: fail())
+    replay = post('/tutorial-state', body, 'key-1')
+    assert replay['statusCode'] == 200
+    assert replay['headers']['Idempotent-Replayed'] == 'true'
+    assert replay['body'] == first['body']
+
+def test_key_reused_for_a_different_body_is_rejected(backend):
+    post('/tutorial-state', {'rider_id': '12345', 'tutorial_id': 'delivery_flow', 'isDone': True}, 'key-1')
+    response = post('/tutorial-state', {'rider_id': '12345', 'tutorial_id': 'delivery_flow', 'isDone': False}, 'key-1')
+    assert response['statusCode'] == 422
+
+def test_same_key_on_another_path_is_independent(backend):
+    post('/tutorial-state', {'rider_id': '12345', 'tutorial_id': 'delivery_flow', 'isDone': True}, 'key-1')
+    response = post('/module-started', {'rider_id': '12345', 'day': 'day1', 'module': 'module1'}, 'key-1')
+    assert response['statusCode'] == 200
+    assert 'Idempotent-Replayed' not in response['headers']
+
+def test_server_errors_are_not_remembered(backend, monkeypatch):
+    handler = lambda_function.handle_tutorial_state
+    monkeypatch.setattr(lambda_function, 'handle_tutorial_state', lambda body, headers: {'statusCode': 500, 'headers': headers, 'body': '{}'})
+    body = {'rider_id': '12345', 'tutorial_id': 'delivery_flow', 'isDone': True}
+    assert post('/tutorial-state', body, 'key-1')['statusCode'] == 500
+    monkeypatch.setattr(lambda_function, 'handle_tutorial_state', handler)
+    assert post('/tutorial-state', body, 'key-1')['statusCode'] == 200
+
+def test_fingerprint_states():
+    store = IdempotencyStore(10, 60)
+    assert store.begin('key', 'a') == ('new', None)
+    assert store.begin('key', 'a') == ('in_progress', None)
+    assert store.begin('key', 'b') == ('mismatch', None)
+    store.complete('key', 'a', 200, '{}')
+    assert store.begin('key', 'a') == ('replay', (200, '{}'))
+    assert store.begin('key', 'b') == ('mismatch', None)
+
+def test_expired_key_runs_again(monkeypatch):
+    store = IdempotencyStore(10, 60)
+    store.begin('key', 'a')
+    store.complete('key', 'a', 200, '{}')
+    now = lambda_function.time.time()
+    monkeypatch.setattr(lambda_function.time, 'time', lambda: now + 61)
+    assert store.begin('key', 'b') == ('new', None)
+
+def test_full_store_evicts_completed_keys_but_never_in_flight_ones():
+    store = IdempotencyStore(2, 60)
+    store.begin('in-flight', 'a')
+    store.begin('done', 'a')
+    store.complete('done', 'a', 200, '{}')
+
+    assert store.begin('third', 'a') == ('new', None)
+    assert store.get_stats()['evictions'] == 1
+    # The in-flight key survived and still blocks a concurrent retry
+    assert store.begin('in-flight', 'a') == ('in_progress', None)
+
+    assert store.begin('fourth', 'a') == ('full', None)
+    assert store.get_stats()['full'] == 1
+    store.release('third')
+    assert store.begin('fourth', 'a') == ('new', None)
+
+def test_full_store_returns_503(backend, monkeypatch):
+    store = IdempotencyStore(1, 60)
+    store.begin('/tutorial-state:other', 'a')
+    monkeypatch.setattr(lambda_function, 'idempotency_store', store)
+    response = post('/tutorial-state', {'rider_id': '12345', 'tutorial_id': 'delivery_flow', 'isDone': True}, 'key-1')
+    assert response['statusCode'] == 503
+    assert response['headers']['Retry-After'] == '1'
@@ -0,0 +1,133 @@
+"""Write-behind progress queue: coalescing, ack/release, flush failures and config checks"""
+
+import json
+
+import pytest
+
+import fake_backends
+import lambda_function
+from lambda_function import SQLiteProgressQueue, coalesce_progress_events, flush_progress_events
+
+def progress_row(backend, rider_id):
+    return next(row for row in backend.tables['training_progress'] if row['rider_id'] == rider_id)
+
+def test_coalesces_per_rider_in_order():
+    merged = coalesce_progress_events([
+        (1, {'rider_id': '12345', 'columns': {'module_started_day1': 'a'}, 'states': {'delivery_flow': True}}),
+        (2, {'rider_id': '67890', 'columns': {'module_started_day1': 'x'}}),
+        (3, {'rider_id': '12345', 'columns': {'module_started_day1': 'b', 'module_completed_day1': 'c'}, 'states': {'delivery_flow': False}}),
+    ])
+    assert merged == {
+        '12345': ('12345', {'module_started_day1': 'b', 'module_completed_day1': 'c'}, {'delivery_flow': False}, [1, 3]),
+        '67890': ('67890', {'module_started_day1': 'x'}, {}, [2]),
+    }
+
+def test_flush_writes_one_merge_per_rider(backend):
+    failed = flush_progress_events([
+        (1, {'rider_id': '12345', 'columns': {'module_started_day2': '2024-01-02T00:00:00'}, 'states': {}}),
+        (2, {'rider_id': '12345', 'columns': {}, 'states': {'pickup_flow': True}}),
+    ])
+    assert failed == []
+    row = progress_row(backend, '12345')
+    assert row['module_started_day2'] == '2024-01-02T00:00:00'
+    assert row['tutorial_state']['pickup_flow'] == {'id': 'pickup_flow', 'isDone': True}
+
+def test_flush_reports_every_event_of_a_failed_rider(backend):
+    failed = flush_progress_events([
+        (1, {'rider_id': '12345', 'columns': {'module_started_day1': 'a'}, 'states': {}}),
+        (2, {'rider_id': '67890', 'columns': {'module_started_day1': 'b'}, 'states': {}}),
+        (3, {'rider_id': '12345', 'columns': {'tutorial_state': {}}, 'states': {}}),
+    ])
+    # merge_training_progress rejects the unknown column, so rider 12345 is retried as a whole
+    assert failed == [1, 3]
+    assert progress_row(backend, '67890')['module_started_day1'] == 'b'
+
+def test_sqs_batch_reports_failed_messages(backend, monkeypatch):
+    def execute(rpc):
+        raise ConnectionError('connection refused')
+
+    monkeypatch.setattr(fake_backends.FakeRPC, 'execute', execute)
+    records = [
+        {'messageId': 'm1', 'eventSource': 'aws:sqs', 'body': json.dumps({'rider_id': '12345', 'columns': {'module_started_day1': 'a'}})},
+        {'messageId': 'm2', 'eventSource': 'aws:sqs', 'body': json.dumps({'rider_id': '67890', 'states': {'delivery_flow': True}})},
+    ]
+    response = lambda_function.lambda_handler({'Records': records}, None)
+    assert response == {'batchItemFailures': [{'itemIdentifier': 'm1'}, {'itemIdentifier': 'm2'}]}
+
+def test_sqlite_queue_claims_acks_and_releases(tmp_path):
+    queue = SQLiteProgressQueue(str(tmp_path / 'queue.sqlite3'))
+    queue.send({'rider_id': '12345', 'columns': {'module_started_day1': 'a'}})
+    queue.send({'rider_id': '12345', 'columns': {'module_started_day1': 'b'}})
+    queue.send({'rider_id': '67890', 'columns': {'module_started_day1': 'x'}})
+
+    claimed = queue.receive(10)
+    assert [event['columns']['module_started_day1'] for _, event in claimed] == ['a', 'b', 'x']
+    # Claimed events are invisible to other drainers until acked or released
+    assert queue.receive(10) == []
+
+    queue.ack([claimed[2][0]])
+    queue.release([claimed[0][0], claimed[1][0]])
+    assert queue.depth() == 2
+    assert [event_id for event_id, _ in queue.receive(10)] == [claimed[0][0], claimed[1][0]]
+
+def test_sqlite_queue_holds_back_riders_with_events_in_flight(tmp_path):
+    queue = SQLiteProgressQueue(str(tmp_path / 'queue.sqlite3'))
+    queue.send({'rider_id': '12345', 'columns': {'module_started_day1': 'a'}})
+    first = queue.receive(10)
+    queue.send({'rider_id': '12345', 'columns': {'module_started_day1': 'b'}})
+    queue.send({'rider_id': '67890', 'columns': {'module_started_day1': 'x'}})
+
+    # The rider's second event must wait for the first, or the writes could reorder
+    assert [event['rider_id'] for _, event in queue.receive(10)] == ['67890']
+    queue.ack([first[0][0]])
+    assert [event['columns']['module_started_day1'] for _, event in queue.receive(10)] == ['b']
+
+def test_unknown_columns_are_written_synchronously(backend, monkeypatch):
+    queued = []
+    monkeypatch.setattr(lambda_function, 'enqueue_progress_event', lambda rider_id, columns=None, states=None: queued.append(columns) or True)
+
+    assert lambda_function.update_training_progress('12345', module_started={'day1': 'a'})
+    assert queued == [{'module_started_day1': 'a'}]
+
+    # There is no day4 column, so the write fails where the caller can see it
+    with pytest.raises(fake_backends.FakeAPIError):
+        lambda_function.update_training_progress('12345', module_started={'day4': 'a'})
+    assert len(queued) == 1
+
+@pytest.mark.parametrize('mode, url, env, error', [
+    ('sqs', '', {}, 'PROGRESS_QUEUE_URL'),
+    ('sqlite', '', {'AWS_LAMBDA_FUNCTION_NAME': 'training-app'}, 'local runs only'),
+    ('kafka', '', {}, 'Unknown PROGRESS_QUEUE'),
+])
+def test_config_errors_fail_at_init(monkeypatch, mode, url, env, error):
+    monkeypatch.setattr(lambda_function, 'PROGRESS_QUEUE', mode)
+    monkeypatch.setattr(lambda_function, 'PROGRESS_QUEUE_URL', url)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    with pytest.raises(ValueError, match=error):
+        lambda_function.check_progress_queue_config()
+
+def test_sqs_mode_without_boto3_fails_at_init(monkeypatch):
+    monkeypatch.setattr(lambda_function, 'PROGRESS_QUEUE', 'sqs')
+    monkeypatch.setattr(lambda_function, 'PROGRESS_QUEUE_URL', 'https://sqs.example/queue.fifo')
+    monkeypatch.setattr(lambda_function.importlib.util, 'find_spec', lambda name: None)
+    with pytest.raises(RuntimeError, match='boto3'):
+        lambda_function.check_progress_queue_config()
+
+def test_sqlite_mode_is_allowed_locally(monkeypatch):
+    monkeypatch.setattr(lambda_function, 'PROGRESS_QUEUE', 'sqlite')
+    monkeypatch.delenv('AWS_LAMBDA_FUNCTION_NAME', raising=False)
+    lambda_function.check_progress_queue_config()
+
+def test_sqs_batch_drops_malformed_messages(backend):
+    records = [
+        {'messageId': 'm1', 'eventSource': 'aws:sqs', 'body': '[]'},
+        {'messageId': 'm2', 'eventSource': 'aws:sqs', 'body': json.dumps({'columns': {'module_started_day1': 'a'}})},
+        {'messageId': 'm3', 'eventSource': 'aws:sqs', 'body': json.dumps({'rider_id': '12345', 'columns': ['module_started_day1']})},
+        {'messageId': 'm4', 'eventSource': 'aws:sqs', 'body': 'not json'},
+        {'messageId': 'm5', 'eventSource': 'aws:sqs', 'body': json.dumps({'rider_id': '12345', 'columns': {'module_started_day1': 'b'}})},
+    ]
+    response = lambda_function.lambda_handler({'Records': records}, None)
+    # Poison messages are acknowledged so they cannot block the rider's FIFO group
+    assert response == {'batchItemFailures': []}
+    assert progress_row(backend, '12345')['module_started_day1'] == 'b'
@@ -0,0 +1,19 @@
+"""EMF request summary: the Route dimension stays bounded"""
+
+import json
+
+import lambda_function
+
+def emitted_routes(capsys, monkeypatch, paths):
+    monkeypatch.setattr(lambda_function, 'METRICS_ENABLED', True)
+    for path in paths:
+        lambda_function.lambda_handler({'httpMethod': 'GET', 'path': path, 'queryStringParameters': {'rider_id': '12345'}}, None)
+    lines = [line for line in capsys.readouterr().out.splitlines() if line.startswith('{"_aws"')]
+    return [json.loads(line)['Route'] for line in lines]
+
+def test_known_routes_are_their_own_dimension(backend, capsys, monkeypatch):
+    assert emitted_routes(capsys, monkeypatch, ['/rider-info', '/get-tutorials']) == ['/rider-info', '/get-tutorials']
+
+def test_unknown_paths_collapse_to_other(backend, capsys, monkeypatch):
+    paths = ['/wp-login.php', '/.env', '/get-tutorials/../../etc/passwd', '']
+    assert emitted_routes(capsys, monkeypatch, paths) == ['other'] * len(paths)
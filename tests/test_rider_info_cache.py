@@ -0,0 +1,89 @@
+"""RiderInfoCache: midnight expiry, negative TTL, LRU eviction and what gets cached"""
+
+from datetime import datetime
+
+import lambda_function
+from lambda_function import RiderInfoCache
+
+RIDER = {'rider_id': '12345', 'node_type': 'lm_hub', 'rider_age': 1}
+
+def freeze_time(monkeypatch, timestamp):
+    monkeypatch.setattr(lambda_function.time, 'time', lambda: timestamp)
+
+def test_entries_expire_at_the_next_local_midnight(monkeypatch):
+    cache = RiderInfoCache(10, 60, 'Asia/Kolkata')
+    midnight = cache._next_midnight()
+    local = datetime.fromtimestamp(midnight, cache.timezone)
+    assert (local.hour, local.minute, local.second) == (0, 0, 0)
+    assert 0 < midnight - lambda_function.time.time() <= 24 * 3600
+
+    cache.put('12345', RIDER)
+    freeze_time(monkeypatch, midnight - 1)
+    assert cache.get('12345') == (True, RIDER)
+    # The rider's age changes at midnight, so yesterday's answer must not be served
+    freeze_time(monkeypatch, midnight)
+    assert cache.get('12345') == (False, None)
+    assert cache.get_stats()['expirations'] == 1
+
+def test_unknown_riders_are_cached_for_the_negative_ttl(monkeypatch):
+    cache = RiderInfoCache(10, 60, 'UTC')
+    now = lambda_function.time.time()
+    freeze_time(monkeypatch, now)
+    cache.put('99', None)
+    assert cache.get('99') == (True, None)
+    assert cache.get_stats()['negative_hits'] == 1
+
+    freeze_time(monkeypatch, now + 59)
+    assert cache.contains('99')
+    freeze_time(monkeypatch, now + 60)
+    assert not cache.contains('99')
+    assert cache.get('99') == (False, None)
+
+def test_least_recently_used_rider_is_evicted(monkeypatch):
+    cache = RiderInfoCache(2, 60, 'UTC')
+    cache.put('1', dict(RIDER, rider_id='1'))
+    cache.put('2', dict(RIDER, rider_id='2'))
+    cache.get('1')
+    cache.put('3', dict(RIDER, rider_id='3'))
+    assert cache.contains('1')
+    assert not cache.contains('2')
+    assert cache.contains('3')
+    assert cache.get_stats()['evictions'] == 1
+
+def test_returned_entries_are_copies():
+    cache = RiderInfoCache(10, 60, 'UTC')
+    cache.put('12345', RIDER)
+    _, rider_info = cache.get('12345')
+    rider_info['rider_age'] = 99
+    assert cache.get('12345') == (True, RIDER)
+
+def test_zero_size_disables_the_cache():
+    cache = RiderInfoCache(0, 60, 'UTC')
+    cache.put('12345', RIDER)
+    assert not cache.contains('12345')
+
+def test_mock_fallbacks_are_never_cached(backend, monkeypatch):
+    lookups = []
+
+    def fetch_from_mock(rider_id):
+        lookups.append(rider_id)
+        return dict(RIDER, rider_id=rider_id), False
+
+    monkeypatch.setattr(lambda_function, 'fetch_rider_info', fetch_from_mock)
+    assert lambda_function.get_rider_info('12345')['rider_id'] == '12345'
+    assert lambda_function.get_rider_info('12345')['rider_id'] == '12345'
+    assert lookups == ['12345', '12345']
+    assert not lambda_function.rider_info_cache.contains('12345')
+
+def test_replica_answers_are_cached(backend, monkeypatch):
+    lookups = []
+
+    def fetch_from_replica(rider_id):
+        lookups.append(rider_id)
+        return (dict(RIDER, rider_id=rider_id) if rider_id == '12345' else None), True
+
+    monkeypatch.setattr(lambda_function, 'fetch_rider_info', fetch_from_replica)
+    for _ in range(2):
+        assert lambda_function.get_rider_info('12345')['rider_id'] == '12345'
+        assert lambda_function.get_rider_info('99') is None
+    assert lookups == ['12345', '99']
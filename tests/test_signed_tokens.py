@@ -0,0 +1,46 @@
+"""HMAC tokens for /metrics and on-demand profiling"""
+
+import hashlib
+import hmac
+import time
+
+import lambda_function
+from lambda_function import verify_signed_token
+
+def sign(secret, timestamp):
+    return f"{timestamp}:{hmac.new(secret.encode(), str(timestamp).encode(), hashlib.sha256).hexdigest()}"
+
+def get_metrics(token):
+    event = {'httpMethod': 'GET', 'path': '/metrics', 'headers': {'X-Metrics-Token': token} if token else {}}
+    return lambda_function.lambda_handler(event, None)['statusCode']
+
+def test_valid_token():
+    assert verify_signed_token(sign('secret', int(time.time())), 'secret')
+
+def test_rejects_wrong_secret_tampering_and_garbage():
+    now = int(time.time())
+    assert not verify_signed_token(sign('other', now), 'secret')
+    assert not verify_signed_token(sign('secret', now).replace(f'{now}:', f'{now + 1}:'), 'secret')
+    assert not verify_signed_token('not-a-token', 'secret')
+    assert not verify_signed_token('', 'secret')
+    # Without a secret nothing is accepted
+    assert not verify_signed_token(sign('', now), '')
+
+def test_max_age_applies_to_both_tokens(backend, monkeypatch):
+    monkeypatch.setattr(lambda_function, 'SIGNED_TOKEN_MAX_AGE_SECONDS', 60)
+    monkeypatch.setattr(lambda_function, 'METRICS_SECRET', 'metrics')
+    monkeypatch.setattr(lambda_function, 'PROFILING_SECRET', 'profiling')
+    fresh = int(time.time()) - 30
+    stale = int(time.time()) - 90
+
+    assert get_metrics(sign('metrics', fresh)) == 200
+    assert get_metrics(sign('metrics', stale)) == 404
+    assert lambda_function.should_profile({'headers': {'X-Profile-Token': sign('profiling', fresh)}})
+    assert not lambda_function.should_profile({'headers': {'X-Profile-Token': sign('profiling', stale)}})
+
+def test_metrics_needs_a_token(backend, monkeypatch):
+    monkeypatch.setattr(lambda_function, 'METRICS_SECRET', 'metrics')
+    assert get_metrics(None) == 404
+    # A profiling token is not a metrics token
+    monkeypatch.setattr(lambda_function, 'PROFILING_SECRET', 'profiling')
+    assert get_metrics(sign('profiling', int(time.time()))) == 404
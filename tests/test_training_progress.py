@@ -0,0 +1,21 @@
+"""Training progress writes: module timestamps land in real columns"""
+
+import json
+
+import lambda_function
+
+def post(path, body):
+    response = lambda_function.lambda_handler({'httpMethod': 'POST', 'path': path, 'body': json.dumps(body)}, None)
+    return response['statusCode']
+
+def progress_row(backend, rider_id):
+    return next(row for row in backend.tables['training_progress'] if row['rider_id'] == rider_id)
+
+def test_module_started_writes_the_day_column(backend):
+    assert post('/module-started', {'rider_id': '67890', 'day': 'day2', 'timestamp': '2024-02-01T09:00:00Z'}) == 200
+    assert progress_row(backend, '67890')['module_started_day2'] == '2024-02-01T09:00:00Z'
+
+def test_unknown_day_column_is_an_error_not_a_silent_write(backend):
+    # The column would be module_started_1, which does not exist
+    assert post('/module-started', {'rider_id': '67890', 'day': '1'}) == 500
+    assert 'module_started_1' not in progress_row(backend, '67890')
@@ -0,0 +1,49 @@
+"""/tutorial-state input validation in single and bulk mode"""
+
+import json
+
+import pytest
+
+import lambda_function
+
+def post(body):
+    response = lambda_function.lambda_handler({'httpMethod': 'POST', 'path': '/tutorial-state', 'body': json.dumps(body)}, None)
+    return response['statusCode'], json.loads(response['body'])
+
+def stored_states(backend, rider_id):
+    row = next(row for row in backend.tables['training_progress'] if row['rider_id'] == rider_id)
+    return row['tutorial_state']
+
+@pytest.mark.parametrize('tutorial_id, is_done', [
+    (['delivery_flow'], True),
+    ({'id': 'delivery_flow'}, True),
+    (42, True),
+    ('', True),
+    ('delivery_flow', 'true'),
+    ('delivery_flow', 1),
+    ('delivery_flow', None),
+])
+def test_single_mode_rejects_invalid_state(backend, tutorial_id, is_done):
+    status, body = post({'rider_id': '12345', 'tutorial_id': tutorial_id, 'isDone': is_done})
+    assert status == 400
+    assert body['data'] is None
+
+def test_bulk_mode_reports_invalid_items_without_failing_the_batch(backend):
+    status, body = post({'rider_id': '12345', 'tutorials': [
+        {'tutorial_id': ['delivery_flow'], 'isDone': True},
+        {'tutorial_id': 'delivery_flow', 'isDone': 'yes'},
+        {'tutorial_id': 'pickup_flow', 'isDone': True},
+    ]})
+    assert status == 200
+    assert [result['updated'] for result in body['data']['results']] == [False, False, True]
+    assert stored_states(backend, '12345')['pickup_flow'] == {'id': 'pickup_flow', 'isDone': True}
+
+def test_bulk_mode_with_only_invalid_items_is_a_400(backend):
+    status, body = post({'rider_id': '12345', 'tutorials': [{'tutorial_id': ['a', 'b'], 'isDone': True}]})
+    assert status == 400
+    assert body['error'] == 'No valid tutorial states provided'
+
+def test_single_mode_writes_valid_state(backend):
+    status, body = post({'rider_id': '12345', 'tutorial_id': 'delivery_flow', 'isDone': True})
+    assert status == 200
+    assert stored_states(backend, '12345')['delivery_flow'] == {'id': 'delivery_flow', 'isDone': True}